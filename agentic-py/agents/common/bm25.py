@@ -0,0 +1,65 @@
+import math
+import re
+from collections import Counter
+from typing import List
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Frequent English words that carry no ranking signal
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be but by for from has have he her his i in is it its
+    of on or our she that the their them they this to was we were what when
+    where which who why will with you your about after all also any been can
+    did do does how into more new not than then there these those up
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stop words."""
+    return [
+        token for token in _TOKEN_RE.findall(text.lower()) if token not in STOP_WORDS
+    ]
+
+
+def idf(document_count: int, document_frequency: int) -> float:
+    # Lucene's variant, always positive
+    return math.log(
+        1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5)
+    )
+
+
+def term_score(
+    term_frequency: int, document_length: int, average_length: float, term_idf: float
+) -> float:
+    norm = K1 * (1 - B + B * document_length / (average_length or 1))
+    return term_idf * term_frequency * (K1 + 1) / (term_frequency + norm)
+
+
+def bm25_scores(query: str, documents: List[str]) -> List[float]:
+    """Score documents against the query, with statistics from the documents themselves."""
+    query_terms = set(tokenize(query))
+    if not documents or not query_terms:
+        return [0.0] * len(documents)
+
+    counts = [Counter(tokenize(document)) for document in documents]
+    lengths = [sum(count.values()) for count in counts]
+    average_length = sum(lengths) / len(lengths)
+    idfs = {
+        term: idf(len(documents), sum(1 for count in counts if term in count))
+        for term in query_terms
+    }
+
+    return [
+        sum(
+            term_score(count[term], length, average_length, idfs[term])
+            for term in query_terms
+            if term in count
+        )
+        for count, length in zip(counts, lengths)
+    ]
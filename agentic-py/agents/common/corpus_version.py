@@ -0,0 +1,63 @@
+"""Corpus version for caches that must not outlive an index change.
+
+Ingestion and retention bump a counter in the article ledger's meta table
+whenever chunks are added or removed. Retrieval only reads it, through a
+separate connection and without importing the ingestion code. Reads are
+cached for CORPUS_VERSION_TTL_SECONDS and run in a worker thread, so a
+lookup on the event loop rarely touches SQLite. Bumps made in this process
+are picked up immediately.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from agents.common.storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+ARTICLE_LEDGER_DB = "article_ledger.db"
+
+CORPUS_VERSION_TTL_SECONDS = float(os.getenv("CORPUS_VERSION_TTL_SECONDS", 10))
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+_version: Optional[int] = None
+_read_at = 0.0
+
+
+def read_corpus_version() -> int:
+    """Current version from the ledger, 0 before anything was ingested.
+
+    Blocking SQLite read, call it from a worker thread.
+    """
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = connect_sqlite(ARTICLE_LEDGER_DB)
+        try:
+            row = _conn.execute(
+                "SELECT value FROM meta WHERE key = 'corpus_version'"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # The ledger has not created its tables yet
+            return 0
+    return row[0] if row else 0
+
+
+async def get_corpus_version() -> int:
+    global _version, _read_at
+    if _version is None or time.monotonic() - _read_at > CORPUS_VERSION_TTL_SECONDS:
+        _version = await asyncio.to_thread(read_corpus_version)
+        _read_at = time.monotonic()
+    return _version
+
+
+def invalidate_corpus_version():
+    """Drop the cached version, called after a bump in this process."""
+    global _version
+    _version = None
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from agents.common.storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_DB = "embedding_cache.db"
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+# Approximate per-row overhead on top of the vector bytes (key, timestamp, b-tree)
+_ROW_OVERHEAD_BYTES = 64
+
+
+@dataclass
+class EmbeddingCacheConfig:
+    enabled: bool = True
+    max_size_mb: int = 512
+
+
+def _get_config_from_env() -> EmbeddingCacheConfig:
+    config = EmbeddingCacheConfig()
+    config.enabled = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    config.max_size_mb = int(os.getenv("EMBEDDING_CACHE_MAX_MB", config.max_size_mb))
+    return config
+
+
+class EmbeddingCache:
+    """On-disk LRU of embedding vectors keyed by (model, dimension, text hash)."""
+
+    def __init__(self, max_size_mb: int, filename: str = EMBEDDING_CACHE_DB):
+        self.max_size_bytes = max_size_mb * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used)"
+        )
+        self._size_bytes = self._conn.execute(
+            f"SELECT COALESCE(SUM(LENGTH(vector) + {_ROW_OVERHEAD_BYTES}), 0) FROM embeddings"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(model_name: str, dimension: int, text: str) -> bytes:
+        return hashlib.blake2b(
+            f"{model_name}\0{dimension}\0{text}".encode(), digest_size=16
+        ).digest()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, List[float]]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _QUERY_BATCH_SIZE):
+                batch = keys[i : i + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                for key, vector in rows:
+                    found[key] = array("f", vector).tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                        [time.time(), *batch],
+                    )
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+        return found
+
+    def put_many(self, items: Dict[bytes, List[float]]):
+        now = time.time()
+        rows = [(key, array("f", vector).tobytes(), now) for key, vector in items.items()]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._size_bytes += sum(
+                len(vector) + _ROW_OVERHEAD_BYTES for _, vector, _ in rows
+            )
+            if self._size_bytes > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self):
+        # Drop least recently used rows until 90% of the budget is left
+        row_bytes = self._conn.execute(
+            f"SELECT AVG(LENGTH(vector)) + {_ROW_OVERHEAD_BYTES} FROM embeddings"
+        ).fetchone()[0]
+        if not row_bytes:
+            return
+        excess_rows = int((self._size_bytes - 0.9 * self.max_size_bytes) / row_bytes) + 1
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+            )
+            """,
+            (excess_rows,),
+        )
+        self.evictions += excess_rows
+        self._size_bytes = self._conn.execute(
+            f"SELECT COALESCE(SUM(LENGTH(vector) + {_ROW_OVERHEAD_BYTES}), 0) FROM embeddings"
+        ).fetchone()[0]
+        logger.info(f"Evicted {excess_rows} embeddings from the cache")
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "evictions": self.evictions,
+            "size_bytes": self._size_bytes,
+            "max_size_bytes": self.max_size_bytes,
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends cache misses to the underlying model."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        dimension: int,
+        cache: EmbeddingCache,
+    ):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.dimension = dimension
+        self.cache = cache
+
+    def _key(self, text: str) -> bytes:
+        return EmbeddingCache.make_key(self.model_name, self.dimension, text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        vectors = self.cache.get_many(keys)
+
+        # Identical texts in one call are only embedded once
+        missing = {key: text for key, text in zip(keys, texts) if key not in vectors}
+        if missing:
+            embedded = self.embeddings.embed_documents(list(missing.values()))
+            # Round through float32 so hits and misses return identical values
+            new_vectors = {
+                key: array("f", vector).tolist()
+                for key, vector in zip(missing.keys(), embedded)
+            }
+            self.cache.put_many(new_vectors)
+            vectors.update(new_vectors)
+
+        return [vectors[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self.cache.get_many([key]).get(key)
+        if vector is None:
+            vector = array("f", self.embeddings.embed_query(text)).tolist()
+            self.cache.put_many({key: vector})
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await asyncio.to_thread(self.embed_documents, texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await asyncio.to_thread(self.embed_query, text)
+
+
+# Global cache instance shared by every embedding model
+_embedding_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the shared cache, or None when disabled via EMBEDDING_CACHE_ENABLED."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        config = _get_config_from_env()
+        if not config.enabled:
+            return None
+        _embedding_cache = EmbeddingCache(max_size_mb=config.max_size_mb)
+        logger.info(f"Embedding cache initialized ({config.max_size_mb} MB)")
+    return _embedding_cache
+
+
+def get_embedding_cache_stats() -> Dict[str, float]:
+    cache = get_embedding_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
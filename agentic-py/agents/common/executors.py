@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class ExecutorConfig:
+    mode: str = "thread"  # "thread" or "process"
+    max_workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    max_pending: int = 64  # tasks queued or running before callers wait
+    max_tasks_per_child: Optional[int] = None  # recycle process workers
+
+
+# Global executor shared by every CPU-bound stage
+_cpu_executor: Optional[Executor] = None
+_executor_config: Optional[ExecutorConfig] = None
+_pending_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_config_from_env() -> ExecutorConfig:
+    config = ExecutorConfig()
+    config.mode = os.getenv("CPU_EXECUTOR_MODE", config.mode).lower()
+    if config.mode not in ("thread", "process"):
+        raise ValueError(
+            f"CPU_EXECUTOR_MODE must be 'thread' or 'process', got {config.mode!r}"
+        )
+    config.max_workers = int(os.getenv("CPU_EXECUTOR_WORKERS", config.max_workers))
+    config.max_pending = int(os.getenv("CPU_EXECUTOR_MAX_PENDING", config.max_pending))
+    if os.getenv("CPU_EXECUTOR_MAX_TASKS_PER_CHILD"):
+        config.max_tasks_per_child = int(os.getenv("CPU_EXECUTOR_MAX_TASKS_PER_CHILD"))
+    return config
+
+
+def get_executor_config() -> ExecutorConfig:
+    global _executor_config
+    if _executor_config is None:
+        _executor_config = _get_config_from_env()
+    return _executor_config
+
+
+def get_cpu_executor() -> Executor:
+    global _cpu_executor
+    if _cpu_executor is None:
+        config = get_executor_config()
+        if config.mode == "process":
+            # Spawned workers don't inherit the server's threads and locks
+            _cpu_executor = ProcessPoolExecutor(
+                max_workers=config.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                max_tasks_per_child=config.max_tasks_per_child,
+            )
+        else:
+            _cpu_executor = ThreadPoolExecutor(
+                max_workers=config.max_workers, thread_name_prefix="cpu-bound"
+            )
+        logger.info(
+            f"CPU executor initialized in {config.mode} mode "
+            f"with {config.max_workers} workers"
+        )
+    return _cpu_executor
+
+
+def _get_pending_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    limit = _pending_limits.get(loop)
+    if limit is None:
+        limit = asyncio.Semaphore(get_executor_config().max_pending)
+        _pending_limits[loop] = limit
+    return limit
+
+
+async def run_cpu_bound(fn: Callable[..., T], *args) -> T:
+    """Run a CPU-bound function on the shared executor.
+
+    In process mode `fn` and its arguments must be picklable, i.e. module
+    level functions and plain data. Callers wait once `max_pending` tasks
+    are in flight so bursts can't queue unbounded work.
+    """
+    global _cpu_executor
+    async with _get_pending_limit():
+        executor = get_cpu_executor()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, fn, *args
+            )
+        except BrokenProcessPool:
+            # A worker died, start a fresh pool for the next caller
+            logger.error("CPU executor process pool broke, recreating it")
+            if _cpu_executor is executor:
+                _cpu_executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+
+def shutdown_cpu_executor():
+    global _cpu_executor
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False, cancel_futures=True)
+        _cpu_executor = None
+        logger.info("CPU executor shut down")
@@ -0,0 +1,384 @@
+import json
+import logging
+import os
+import threading
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+from agents.common.bm25 import B, K1, idf, tokenize
+from agents.common.local_vector_store import matches_filter
+from agents.common.storage import connect_sqlite
+
+logger = logging.getLogger(__name__)
+
+LEXICAL_INDEX_DB = "lexical_index.db"
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+# Scored candidates whose metadata is checked against the filter per round
+_FILTER_BATCH_SIZE = 64
+_MAX_FILTER_ROUNDS = 16
+
+
+@dataclass
+class LexicalIndexConfig:
+    enabled: bool = True
+    compact_dead_fraction: float = 0.2  # rewrite postings past this share of deleted docs
+
+
+def _get_config_from_env() -> LexicalIndexConfig:
+    config = LexicalIndexConfig()
+    config.enabled = os.getenv("HYBRID_RETRIEVAL_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    config.compact_dead_fraction = float(
+        os.getenv("LEXICAL_INDEX_COMPACT_FRACTION", config.compact_dead_fraction)
+    )
+    return config
+
+
+def encode_postings(pairs: Iterable[Tuple[int, int]], last_doc: int = 0) -> bytes:
+    """Varint-encode (doc_id gap, term frequency) pairs of increasing doc IDs."""
+    out = bytearray()
+    for doc_id, tf in pairs:
+        for value in (doc_id - last_doc, tf):
+            while value >= 0x80:
+                out.append((value & 0x7F) | 0x80)
+                value >>= 7
+            out.append(value)
+        last_doc = doc_id
+    return bytes(out)
+
+
+def decode_postings(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Doc IDs and term frequencies of an encoded posting list."""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    # Byte position within its varint gives the 7-bit shift
+    group = np.repeat(np.arange(len(starts)), ends - starts + 1)
+    shifts = (np.arange(len(raw)) - starts[group]) * 7
+    values = np.add.reduceat(
+        (raw & 0x7F).astype(np.int64) << shifts.astype(np.int64), starts
+    ).reshape(-1, 2)
+    return np.cumsum(values[:, 0]), values[:, 1]
+
+
+class LexicalIndex:
+    """BM25 inverted index over chunk text, stored in SQLite.
+
+    Each term's posting list is a delta-varint blob of (doc, tf) pairs, so a
+    posting costs two or three bytes. New documents get increasing doc IDs
+    and are appended to the blobs. Deleted documents are dropped from the
+    document table and masked at query time until compaction rewrites the
+    posting lists.
+    """
+
+    def __init__(self, config: LexicalIndexConfig, filename: str = LEXICAL_INDEX_DB):
+        self.config = config
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS docs (
+                -- Never reused, posting lists only ever append larger IDs
+                doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                chunk_id TEXT NOT NULL UNIQUE,
+                length INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT PRIMARY KEY,
+                df INTEGER NOT NULL,
+                last_doc INTEGER NOT NULL,
+                data BLOB NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._load()
+
+    def _load(self):
+        rows = self._conn.execute("SELECT doc_id, length FROM docs").fetchall()
+        max_doc = self._conn.execute("SELECT MAX(last_doc) FROM postings").fetchone()[0]
+        size = max([max_doc or 0, *(doc_id for doc_id, _ in rows)], default=0) + 1
+        self._lengths = np.zeros(size, dtype=np.float32)
+        self._alive = np.zeros(size, dtype=bool)
+        for doc_id, length in rows:
+            self._lengths[doc_id] = length
+            self._alive[doc_id] = True
+        # Deleted documents still referenced by posting lists
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'dead_documents'"
+        ).fetchone()
+        self._dead = row[0] if row else 0
+        logger.info(f"Loaded lexical index with {len(rows)} documents")
+
+    def _grow(self, size: int):
+        old_size = len(self._lengths)
+        if size > old_size:
+            capacity = max(size, 2 * old_size)
+            self._lengths = np.resize(self._lengths, capacity)
+            self._lengths[old_size:] = 0
+            self._alive = np.resize(self._alive, capacity)
+            self._alive[old_size:] = False
+
+    def _set_dead(self, dead: int):
+        self._dead = dead
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('dead_documents', ?)",
+            (dead,),
+        )
+
+    def add_documents(self, documents: List[Document]) -> int:
+        """Index chunks by their chunk_id, skipping ones already indexed."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+                added = 0
+                for document in documents:
+                    chunk_id = document.metadata.get("chunk_id") or document.id
+                    terms = Counter(tokenize(document.page_content))
+                    length = sum(terms.values())
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO docs (chunk_id, length, content, metadata) "
+                        "VALUES (?, ?, ?, ?)",
+                        (
+                            chunk_id,
+                            length,
+                            document.page_content,
+                            json.dumps(document.metadata, default=str),
+                        ),
+                    )
+                    if not cursor.rowcount:
+                        continue
+                    doc_id = cursor.lastrowid
+                    self._grow(doc_id + 1)
+                    self._lengths[doc_id] = length
+                    self._alive[doc_id] = True
+                    added += 1
+                    for term, tf in terms.items():
+                        postings[term].append((doc_id, tf))
+
+                self._append_postings(postings)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                self._load()
+                raise
+        logger.info(f"Indexed {added} chunks in the lexical index")
+        return added
+
+    def _append_postings(self, postings: Dict[str, List[Tuple[int, int]]]):
+        terms = list(postings)
+        existing = {}
+        for i in range(0, len(terms), _QUERY_BATCH_SIZE):
+            batch = terms[i : i + _QUERY_BATCH_SIZE]
+            for term, df, last_doc, data in self._conn.execute(
+                "SELECT term, df, last_doc, data FROM postings WHERE term IN "
+                f"({','.join('?' * len(batch))})",
+                batch,
+            ):
+                existing[term] = (df, last_doc, data)
+
+        rows = []
+        for term, pairs in postings.items():
+            df, last_doc, data = existing.get(term, (0, 0, b""))
+            rows.append(
+                (term, df + len(pairs), pairs[-1][0], data + encode_postings(pairs, last_doc))
+            )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO postings (term, df, last_doc, data) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+
+    def get_indexed_ids(self, chunk_ids: Iterable[str]) -> Set[str]:
+        chunk_ids = list(chunk_ids)
+        indexed = set()
+        with self._lock:
+            for i in range(0, len(chunk_ids), _QUERY_BATCH_SIZE):
+                batch = chunk_ids[i : i + _QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM docs WHERE chunk_id IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                indexed.update(chunk_id for (chunk_id,) in rows)
+        return indexed
+
+    def delete(self, chunk_ids: List[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for i in range(0, len(chunk_ids), _QUERY_BATCH_SIZE):
+                batch = chunk_ids[i : i + _QUERY_BATCH_SIZE]
+                placeholders = ",".join("?" * len(batch))
+                doc_ids = [
+                    row[0]
+                    for row in self._conn.execute(
+                        f"SELECT doc_id FROM docs WHERE chunk_id IN ({placeholders})", batch
+                    )
+                ]
+                self._conn.execute(
+                    f"DELETE FROM docs WHERE chunk_id IN ({placeholders})", batch
+                )
+                self._alive[doc_ids] = False
+                deleted += len(doc_ids)
+            self._set_dead(self._dead + deleted)
+        logger.info(f"Deleted {deleted} chunks from the lexical index")
+        return deleted
+
+    def dead_fraction(self) -> float:
+        total = self._dead + int(self._alive.sum())
+        return self._dead / total if total else 0.0
+
+    def compact(self):
+        """Rewrite posting lists without deleted documents."""
+        with self._lock:
+            alive = self._alive
+            self._conn.execute("BEGIN")
+            try:
+                rows = []
+                removed = []
+                for term, data in self._conn.execute("SELECT term, data FROM postings"):
+                    doc_ids, tfs = decode_postings(data)
+                    keep = alive[doc_ids]
+                    if keep.all():
+                        continue
+                    if not keep.any():
+                        removed.append((term,))
+                        continue
+                    doc_ids, tfs = doc_ids[keep], tfs[keep]
+                    rows.append(
+                        (
+                            len(doc_ids),
+                            int(doc_ids[-1]),
+                            encode_postings(zip(doc_ids.tolist(), tfs.tolist())),
+                            term,
+                        )
+                    )
+                self._conn.executemany(
+                    "UPDATE postings SET df = ?, last_doc = ?, data = ? WHERE term = ?", rows
+                )
+                self._conn.executemany("DELETE FROM postings WHERE term = ?", removed)
+                self._set_dead(0)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(
+            f"Compacted {len(rows)} posting lists, removed {len(removed)} empty terms"
+        )
+
+    def search(
+        self, query: str, k: int, filter: Optional[dict] = None
+    ) -> List[Tuple[Document, float]]:
+        terms = set(tokenize(query))
+        with self._lock:
+            alive = self._alive
+            lengths = self._lengths
+            document_count = int(alive.sum())
+            if not terms or not document_count:
+                return []
+            average_length = float(lengths[alive].mean())
+            # Posting list df still counts deleted documents until compaction
+            indexed_count = document_count + self._dead
+
+            scores = np.zeros(len(lengths), dtype=np.float32)
+            term_list = list(terms)
+            rows = self._conn.execute(
+                "SELECT df, data FROM postings WHERE term IN "
+                f"({','.join('?' * len(term_list))})",
+                term_list,
+            ).fetchall()
+            for df, data in rows:
+                doc_ids, tfs = decode_postings(data)
+                norm = K1 * (1 - B + B * lengths[doc_ids] / average_length)
+                scores[doc_ids] += idf(indexed_count, df) * tfs * (K1 + 1) / (tfs + norm)
+            scores[~alive] = 0
+
+            candidates = np.flatnonzero(scores > 0)
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            results = []
+            # Walk the ranking until k candidates pass the metadata filter
+            for start in range(0, len(candidates), _FILTER_BATCH_SIZE):
+                if len(results) >= k or start // _FILTER_BATCH_SIZE >= _MAX_FILTER_ROUNDS:
+                    break
+                batch = candidates[start : start + _FILTER_BATCH_SIZE].tolist()
+                records = {
+                    doc_id: (content, json.loads(metadata))
+                    for doc_id, content, metadata in self._conn.execute(
+                        "SELECT doc_id, content, metadata FROM docs WHERE doc_id IN "
+                        f"({','.join('?' * len(batch))})",
+                        batch,
+                    )
+                }
+                for doc_id in batch:
+                    if doc_id not in records:
+                        continue
+                    content, metadata = records[doc_id]
+                    if filter and not matches_filter(metadata, filter):
+                        continue
+                    results.append(
+                        (
+                            Document(
+                                id=metadata.get("chunk_id"),
+                                page_content=content,
+                                metadata=metadata,
+                            ),
+                            float(scores[doc_id]),
+                        )
+                    )
+                    if len(results) >= k:
+                        break
+            return results
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            terms, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM postings"
+            ).fetchone()
+        return {
+            "documents": int(self._alive.sum()),
+            "deleted_documents": self._dead,
+            "terms": terms,
+            "postings_bytes": size,
+        }
+
+
+# Global index instance
+_lexical_index: Optional[LexicalIndex] = None
+
+
+def get_lexical_index() -> Optional[LexicalIndex]:
+    """Return the shared index, or None when disabled via HYBRID_RETRIEVAL_ENABLED."""
+    global _lexical_index
+    if _lexical_index is None:
+        config = _get_config_from_env()
+        if not config.enabled:
+            return None
+        _lexical_index = LexicalIndex(config)
+    return _lexical_index
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_google_genai import ChatGoogleGenerativeAI
+from pydantic import PrivateAttr
+
+from agents.common.metrics import LLM_REQUEST_SECONDS, LLMTokenCallback
+
+logger = logging.getLogger(__name__)
+
+LLMKey = Tuple[str, float, Optional[int]]
+
+
+@dataclass
+class LLMRegistryConfig:
+    max_concurrency: int = 16  # in-flight requests per model
+    model_concurrency: Dict[str, int] = field(default_factory=dict)
+    transport: Optional[str] = None  # "grpc" (default) or "rest"
+    # (model, temperature) pairs created at startup
+    warmup: List[Tuple[str, float]] = field(
+        default_factory=lambda: [
+            ("gemini-2.5-flash-lite", temperature) for temperature in (0.0, 0.5, 0.7, 1.0)
+        ]
+    )
+
+
+def _parse_model_concurrency(value: str) -> Dict[str, int]:
+    """Parse "gemini-2.5-flash=4,gemini-2.5-flash-lite=32" into model -> cap."""
+    caps = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        model, _, cap = entry.partition("=")
+        caps[model.strip()] = int(cap)
+    return caps
+
+
+def _parse_warmup(value: str) -> List[Tuple[str, float]]:
+    """Parse "gemini-2.5-flash-lite@0.5,gemini-2.5-flash" into (model, temperature)."""
+    specs = []
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        model, _, temperature = entry.partition("@")
+        specs.append((model.strip(), float(temperature or 0.0)))
+    return specs
+
+
+def _get_config_from_env() -> LLMRegistryConfig:
+    config = LLMRegistryConfig()
+    config.max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", config.max_concurrency))
+    config.model_concurrency = _parse_model_concurrency(
+        os.getenv("LLM_MODEL_CONCURRENCY", "")
+    )
+    config.transport = os.getenv("LLM_TRANSPORT") or None
+    if os.getenv("LLM_WARMUP") is not None:
+        config.warmup = _parse_warmup(os.getenv("LLM_WARMUP"))
+    return config
+
+
+class _ModelLimiter:
+    """Concurrency cap and request statistics shared by every client of a model."""
+
+    def __init__(self, model_name: str, max_concurrency: int):
+        self.model_name = model_name
+        self.max_concurrency = max_concurrency
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.queued = 0  # requests that had to wait for a slot
+        self.wait_seconds = 0.0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._sync_limit = threading.BoundedSemaphore(max_concurrency)
+        self._async_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_async_limit(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limit = self._async_limits.get(loop)
+        if limit is None:
+            limit = asyncio.Semaphore(self.max_concurrency)
+            self._async_limits[loop] = limit
+        return limit
+
+    def _started(self, waited: float):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            if waited > 0.001:
+                self.queued += 1
+                self.wait_seconds += waited
+
+    def _finished(self, elapsed: float, failed: bool):
+        LLM_REQUEST_SECONDS.observe(elapsed, self.model_name)
+        with self._lock:
+            self.in_flight -= 1
+            self.busy_seconds += elapsed
+            if failed:
+                self.errors += 1
+
+    @asynccontextmanager
+    async def aslot(self):
+        start = time.perf_counter()
+        async with self._get_async_limit():
+            acquired = time.perf_counter()
+            self._started(acquired - start)
+            failed = True
+            try:
+                yield
+                failed = False
+            finally:
+                self._finished(time.perf_counter() - acquired, failed)
+
+    @contextmanager
+    def slot(self):
+        start = time.perf_counter()
+        with self._sync_limit:
+            acquired = time.perf_counter()
+            self._started(acquired - start)
+            failed = True
+            try:
+                yield
+                failed = False
+            finally:
+                self._finished(time.perf_counter() - acquired, failed)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "queued": self.queued,
+                "avg_wait_seconds": self.wait_seconds / self.requests if self.requests else 0,
+                "avg_request_seconds": self.busy_seconds / self.requests if self.requests else 0,
+            }
+
+
+class PooledChatGoogleGenerativeAI(ChatGoogleGenerativeAI):
+    """Long-lived Gemini client whose requests go through a per-model concurrency cap.
+
+    The gRPC channels are created once and reused, so requests share
+    persistent HTTP/2 connections instead of reconnecting per node call.
+    """
+
+    _limiter: Optional[_ModelLimiter] = PrivateAttr(default=None)
+    _client_loop: Any = PrivateAttr(default=None)
+
+    def _bind_loop(self):
+        # The async channel belongs to the loop it was created on, rebuild it
+        # when a new loop (e.g. another asyncio.run) starts using this client
+        loop = asyncio.get_running_loop()
+        if self._client_loop is not None and self._client_loop() is not loop:
+            self.async_client_running = None
+        self._client_loop = weakref.ref(loop)
+
+    def _generate(self, *args, **kwargs):
+        with self._limiter.slot():
+            return super()._generate(*args, **kwargs)
+
+    def _stream(self, *args, **kwargs):
+        with self._limiter.slot():
+            yield from super()._stream(*args, **kwargs)
+
+    async def _agenerate(self, *args, **kwargs):
+        self._bind_loop()
+        async with self._limiter.aslot():
+            return await super()._agenerate(*args, **kwargs)
+
+    async def _astream(self, *args, **kwargs):
+        self._bind_loop()
+        async with self._limiter.aslot():
+            async for chunk in super()._astream(*args, **kwargs):
+                yield chunk
+
+
+class LLMRegistry:
+    """Process-wide clients keyed by (model, temperature, max_tokens)."""
+
+    def __init__(self, config: LLMRegistryConfig):
+        self.config = config
+        self._clients: Dict[LLMKey, PooledChatGoogleGenerativeAI] = {}
+        self._limiters: Dict[str, _ModelLimiter] = {}
+        self._lock = threading.Lock()
+
+    def _get_limiter(self, model_name: str) -> _ModelLimiter:
+        limiter = self._limiters.get(model_name)
+        if limiter is None:
+            limiter = _ModelLimiter(
+                model_name,
+                self.config.model_concurrency.get(model_name, self.config.max_concurrency),
+            )
+            self._limiters[model_name] = limiter
+        return limiter
+
+    def get(
+        self, model_name: str, temperature: float = 0.0, max_tokens: Optional[int] = None
+    ) -> PooledChatGoogleGenerativeAI:
+        key = (model_name, float(temperature), max_tokens)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                kwargs: dict = {
+                    "model": model_name,
+                    "temperature": float(temperature),
+                    "callbacks": [LLMTokenCallback(model_name)],
+                }
+                if max_tokens is not None:
+                    kwargs["max_tokens"] = max_tokens
+                if self.config.transport:
+                    kwargs["transport"] = self.config.transport
+                client = PooledChatGoogleGenerativeAI(**kwargs)
+                client._limiter = self._get_limiter(model_name)
+                self._clients[key] = client
+                logger.info(
+                    f"Created LLM client {model_name} (temperature={temperature}, "
+                    f"max_tokens={max_tokens})"
+                )
+        return client
+
+    def warm_up(self):
+        """Create the configured clients and their channels ahead of the first chat."""
+        for model_name, temperature in self.config.warmup:
+            client = self.get(model_name, temperature)
+            try:
+                asyncio.get_running_loop()
+                client._bind_loop()
+                client.async_client  # builds the grpc_asyncio channel
+            except RuntimeError:
+                pass  # no running loop, the async channel is built on first use
+        logger.info(f"Warmed up {len(self.config.warmup)} LLM clients")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._clients),
+            "models": {
+                model_name: limiter.stats() for model_name, limiter in self._limiters.items()
+            },
+        }
+
+
+# Global registry instance
+_llm_registry: Optional[LLMRegistry] = None
+
+
+def get_llm_registry() -> LLMRegistry:
+    global _llm_registry
+    if _llm_registry is None:
+        _llm_registry = LLMRegistry(_get_config_from_env())
+    return _llm_registry
+
+
+def get_llm_pool_stats() -> Dict[str, Any]:
+    return get_llm_registry().stats()
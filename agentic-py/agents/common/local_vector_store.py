@@ -0,0 +1,638 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+from agents.common.storage import connect_sqlite, get_data_dir
+
+logger = logging.getLogger(__name__)
+
+LOCAL_VECTOR_STORE_DIR = "vector_store"
+
+_INITIAL_CAPACITY = 1024
+
+# Rows scored per matrix product, bounds the float32 copy of float16 blocks
+_SEARCH_BLOCK_ROWS = 65536
+
+# Filter masks are reused until the next write
+_MASK_CACHE_SIZE = 64
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+_MISSING = object()
+
+_RANGE_OPERATORS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+@dataclass
+class LocalVectorStoreConfig:
+    dtype: str = "float32"  # "float16" halves memory and disk use
+    ivf_min_vectors: int = 100_000  # build an IVF index past this size, 0 disables
+    ivf_nprobe: int = 32  # clusters scanned per query, trades latency for recall
+
+
+def _get_config_from_env() -> LocalVectorStoreConfig:
+    config = LocalVectorStoreConfig()
+    config.dtype = os.getenv("LOCAL_VECTOR_STORE_DTYPE", config.dtype).lower()
+    if config.dtype not in ("float32", "float16"):
+        raise ValueError(
+            f"LOCAL_VECTOR_STORE_DTYPE must be 'float32' or 'float16', got {config.dtype!r}"
+        )
+    config.ivf_min_vectors = int(
+        os.getenv("LOCAL_VECTOR_STORE_IVF_MIN_VECTORS", config.ivf_min_vectors)
+    )
+    config.ivf_nprobe = int(os.getenv("LOCAL_VECTOR_STORE_IVF_NPROBE", config.ivf_nprobe))
+    return config
+
+
+def _matches(value: Any, operator: str, operand: Any) -> bool:
+    # List fields match when any element does, like Pinecone
+    values = [] if value is _MISSING else value if isinstance(value, list) else [value]
+    if operator == "$eq":
+        return operand in values
+    if operator == "$ne":
+        return operand not in values
+    if operator == "$in":
+        return any(v in operand for v in values)
+    if operator == "$nin":
+        return not any(v in operand for v in values)
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_filter(metadata: dict, filter: dict) -> bool:
+    """Evaluate a Pinecone-style metadata filter against one record."""
+    for key, condition in filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, sub_filter) for sub_filter in condition):
+                return False
+        else:
+            value = metadata.get(key, _MISSING)
+            conditions = condition if isinstance(condition, dict) else {"$eq": condition}
+            for operator, operand in conditions.items():
+                if operator in _RANGE_OPERATORS:
+                    if not isinstance(value, (int, float)) or isinstance(value, bool):
+                        return False
+                    if not _RANGE_OPERATORS[operator](value, operand):
+                        return False
+                elif operator == "$exists":
+                    if (value is not _MISSING) != bool(operand):
+                        return False
+                elif not _matches(value, operator, operand):
+                    return False
+    return True
+
+
+class _IVFIndex:
+    """Inverted file index: k-means clusters, queries scan the nearest few."""
+
+    def __init__(self, vectors: np.ndarray, rows: np.ndarray, capacity: int):
+        n_lists = max(1, int(np.sqrt(len(rows))))
+        rng = np.random.default_rng(0)
+
+        # Spherical k-means on a sample is enough to place the centroids
+        sample_rows = rng.choice(rows, size=min(len(rows), 64 * n_lists), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_rows)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(10):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(n_lists):
+                members = sample[labels == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[i] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        self.centroids = centroids
+        self.trained_size = len(rows)
+        self.assignments = np.full(capacity, -1, dtype=np.int32)
+        self.assign(rows, vectors)
+
+    def assign(self, rows: np.ndarray, vectors: np.ndarray):
+        for start in range(0, len(rows), _SEARCH_BLOCK_ROWS):
+            block = rows[start : start + _SEARCH_BLOCK_ROWS]
+            block_vectors = np.asarray(vectors[block], dtype=np.float32)
+            self.assignments[block] = np.argmax(block_vectors @ self.centroids.T, axis=1)
+
+    def grow(self, capacity: int):
+        assignments = np.full(capacity, -1, dtype=np.int32)
+        assignments[: len(self.assignments)] = self.assignments
+        self.assignments = assignments
+
+    def candidates(self, query: np.ndarray, nprobe: int, size: int) -> np.ndarray:
+        nprobe = min(nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.flatnonzero(np.isin(self.assignments[:size], probes))
+
+
+class LocalVectorStore(VectorStore):
+    """In-process vector store backed by a memory-mapped matrix.
+
+    Vectors live in one contiguous float32 (or float16) matrix under the
+    data directory, texts and metadata in SQLite next to it, so a restart
+    reopens the index without re-embedding. Search is an exact NumPy top-k,
+    or scans the nearest IVF clusters once the store holds more than
+    `ivf_min_vectors`. Filters follow Pinecone's metadata filter syntax.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        name: str,
+        dimension: int,
+        metric: str = "cosine",
+        config: Optional[LocalVectorStoreConfig] = None,
+    ):
+        if metric not in ("cosine", "dotproduct"):
+            raise ValueError(f"Unsupported metric for the local vector store: {metric}")
+        self._embedding = embedding
+        self.name = name
+        self.dimension = dimension
+        self.metric = metric
+        self.config = config or _get_config_from_env()
+
+        self._lock = threading.RLock()
+        self._directory = get_data_dir() / LOCAL_VECTOR_STORE_DIR / name
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self._directory / "vectors.npy"
+        self._conn = connect_sqlite(f"{LOCAL_VECTOR_STORE_DIR}/{name}/records.db")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS records (
+                slot INTEGER PRIMARY KEY,
+                id TEXT NOT NULL UNIQUE,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            )
+            """
+        )
+
+        # Per slot: document id and metadata, None for free slots
+        self._ids: List[Optional[str]] = []
+        self._metadatas: List[Optional[dict]] = []
+        self._slots: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._columns: Dict[str, Tuple[np.ndarray, Optional[np.ndarray]]] = {}
+        self._mask_cache: Dict[str, np.ndarray] = {}
+        self._ivf: Optional[_IVFIndex] = None
+        self._load()
+
+    def _load(self):
+        if self._vectors_path.exists():
+            self._vectors = np.load(self._vectors_path, mmap_mode="r+")
+            if self._vectors.shape[1] != self.dimension:
+                raise ValueError(
+                    f"Local vector store {self.name} has dimension "
+                    f"{self._vectors.shape[1]}, expected {self.dimension}"
+                )
+            if self._vectors.dtype != np.dtype(self.config.dtype):
+                logger.warning(
+                    f"Local vector store {self.name} is stored as {self._vectors.dtype}, "
+                    f"ignoring dtype {self.config.dtype}"
+                )
+        else:
+            self._vectors = np.lib.format.open_memmap(
+                self._vectors_path,
+                mode="w+",
+                dtype=self.config.dtype,
+                shape=(_INITIAL_CAPACITY, self.dimension),
+            )
+        self._alive = np.zeros(len(self._vectors), dtype=bool)
+
+        for slot, id, metadata in self._conn.execute(
+            "SELECT slot, id, metadata FROM records ORDER BY slot"
+        ):
+            self._extend_slots(slot + 1)
+            self._ids[slot] = id
+            self._metadatas[slot] = json.loads(metadata)
+            self._slots[id] = slot
+            self._alive[slot] = True
+        self._free_slots = [slot for slot, id in enumerate(self._ids) if id is None]
+
+        logger.info(f"Loaded local vector store {self.name} with {len(self._slots)} vectors")
+        self._maybe_build_ivf()
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self._embedding
+
+    @property
+    def _size(self) -> int:
+        return len(self._ids)
+
+    def _extend_slots(self, size: int):
+        while len(self._ids) < size:
+            self._ids.append(None)
+            self._metadatas.append(None)
+
+    def _ensure_capacity(self, size: int):
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+
+        # Copy into a larger file, then swap it in; readers holding the old
+        # mapping keep a valid view until they drop it
+        tmp_path = self._vectors_path.with_suffix(".tmp.npy")
+        vectors = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=self._vectors.dtype, shape=(capacity, self.dimension)
+        )
+        vectors[: len(self._vectors)] = self._vectors
+        vectors.flush()
+        os.replace(tmp_path, self._vectors_path)
+        self._vectors = vectors
+
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: len(self._alive)] = self._alive
+        self._alive = alive
+        if self._ivf is not None:
+            self._ivf.grow(capacity)
+        logger.info(f"Grew local vector store {self.name} to {capacity} vectors")
+
+    def _prepare(self, embeddings: Sequence[Sequence[float]]) -> np.ndarray:
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(-1, self.dimension)
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1.0, norms)
+        return vectors
+
+    def _invalidate(self):
+        self._columns.clear()
+        self._mask_cache.clear()
+
+    def _maybe_build_ivf(self):
+        min_vectors = self.config.ivf_min_vectors
+        count = len(self._slots)
+        if not min_vectors or count < min_vectors:
+            return
+        # Retrain as the corpus doubles so clusters stay balanced
+        if self._ivf is not None and count < 2 * self._ivf.trained_size:
+            return
+        rows = np.flatnonzero(self._alive[: self._size])
+        self._ivf = _IVFIndex(self._vectors, rows, len(self._vectors))
+        logger.info(
+            f"Built IVF index for {self.name} with {len(self._ivf.centroids)} "
+            f"clusters over {count} vectors"
+        )
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        embeddings: Sequence[Sequence[float]],
+        metadatas: List[dict],
+        ids: List[str],
+    ) -> List[str]:
+        # Last occurrence wins for ids repeated in one call
+        latest = {id: i for i, id in enumerate(ids)}
+        order = sorted(latest.values())
+        vectors = self._prepare(embeddings)[order]
+
+        with self._lock:
+            slots = []
+            for i in order:
+                slot = self._slots.get(ids[i])
+                if slot is None:
+                    slot = self._free_slots.pop() if self._free_slots else self._size
+                    self._extend_slots(slot + 1)
+                slots.append(slot)
+            self._ensure_capacity(self._size)
+
+            slots = np.asarray(slots)
+            self._vectors[slots] = vectors
+            self._vectors.flush()
+
+            rows = [
+                (int(slot), ids[i], texts[i], json.dumps(metadatas[i]))
+                for slot, i in zip(slots, order)
+            ]
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO records (slot, id, text, metadata) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            for slot, i in zip(slots, order):
+                self._ids[slot] = ids[i]
+                self._metadatas[slot] = dict(metadatas[i])
+                self._slots[ids[i]] = int(slot)
+            self._alive[slots] = True
+            if self._ivf is not None:
+                self._ivf.assign(slots, self._vectors)
+            self._invalidate()
+            self._maybe_build_ivf()
+
+        return ids
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        if not texts:
+            return []
+        metadatas = list(metadatas) if metadatas else [{} for _ in texts]
+        ids = list(ids) if ids else [str(uuid.uuid4()) for _ in texts]
+        embeddings = self._embedding.embed_documents(texts)
+        return self.add_embeddings(texts, embeddings, metadatas, ids)
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        delete_all: Optional[bool] = None,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> None:
+        with self._lock:
+            if delete_all:
+                slots = list(self._slots.values())
+            elif ids is not None:
+                slots = [self._slots[id] for id in ids if id in self._slots]
+            elif filter is not None:
+                mask = self._alive[: self._size] & self._filter_mask(filter)
+                slots = np.flatnonzero(mask).tolist()
+            else:
+                raise ValueError("Either ids, delete_all, or filter must be provided.")
+
+            if not slots:
+                return None
+
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM records WHERE slot = ?", [(slot,) for slot in slots]
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            for slot in slots:
+                del self._slots[self._ids[slot]]
+                self._ids[slot] = None
+                self._metadatas[slot] = None
+            self._alive[slots] = False
+            self._free_slots.extend(slots)
+            self._invalidate()
+            logger.info(f"Deleted {len(slots)} vectors from local vector store {self.name}")
+        return None
+
+    def _column(self, field: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Field values per slot, plus a float view for range filters."""
+        column = self._columns.get(field)
+        if column is None:
+            values = np.empty(self._size, dtype=object)
+            for slot, metadata in enumerate(self._metadatas):
+                values[slot] = _MISSING if metadata is None else metadata.get(field, _MISSING)
+            numbers = np.array(
+                [
+                    v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                    for v in values
+                ],
+                dtype=np.float64,
+            )
+            column = (values, numbers)
+            self._columns[field] = column
+        return column
+
+    def _field_mask(self, field: str, operator: str, operand: Any) -> np.ndarray:
+        values, numbers = self._column(field)
+        if operator in _RANGE_OPERATORS:
+            with np.errstate(invalid="ignore"):
+                return _RANGE_OPERATORS[operator](numbers, operand)
+        if operator == "$exists":
+            present = np.fromiter(
+                (v is not _MISSING for v in values), dtype=bool, count=len(values)
+            )
+            return present if operand else ~present
+        if operator in ("$in", "$nin"):
+            operand = set(operand)
+        return np.fromiter(
+            (_matches(v, operator, operand) for v in values),
+            dtype=bool,
+            count=len(values),
+        )
+
+    def _filter_mask(self, filter: dict) -> np.ndarray:
+        mask = np.ones(self._size, dtype=bool)
+        for key, condition in filter.items():
+            if key == "$and":
+                for sub_filter in condition:
+                    mask &= self._filter_mask(sub_filter)
+            elif key == "$or":
+                any_mask = np.zeros(self._size, dtype=bool)
+                for sub_filter in condition:
+                    any_mask |= self._filter_mask(sub_filter)
+                mask &= any_mask
+            elif isinstance(condition, dict):
+                for operator, operand in condition.items():
+                    mask &= self._field_mask(key, operator, operand)
+            else:
+                mask &= self._field_mask(key, "$eq", condition)
+        return mask
+
+    def _cached_filter_mask(self, filter: dict) -> np.ndarray:
+        key = json.dumps(filter, sort_keys=True, default=str)
+        mask = self._mask_cache.get(key)
+        if mask is None:
+            mask = self._filter_mask(filter)
+            if len(self._mask_cache) >= _MASK_CACHE_SIZE:
+                self._mask_cache.pop(next(iter(self._mask_cache)))
+            self._mask_cache[key] = mask
+        return mask
+
+    def _score_rows(self, vectors: np.ndarray, rows: np.ndarray, query: np.ndarray):
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), _SEARCH_BLOCK_ROWS):
+            block = rows[start : start + _SEARCH_BLOCK_ROWS]
+            scores[start : start + len(block)] = (
+                np.asarray(vectors[block], dtype=np.float32) @ query
+            )
+        return scores
+
+    def _score_all(self, vectors: np.ndarray, size: int, query: np.ndarray):
+        # Contiguous blocks avoid gathering rows when nothing is filtered out
+        scores = np.empty(size, dtype=np.float32)
+        for start in range(0, size, _SEARCH_BLOCK_ROWS):
+            end = min(start + _SEARCH_BLOCK_ROWS, size)
+            scores[start:end] = np.asarray(vectors[start:end], dtype=np.float32) @ query
+        return scores
+
+    def _search(
+        self, embedding: Sequence[float], k: int, filter: Optional[dict]
+    ) -> List[Tuple[int, float]]:
+        query = self._prepare([embedding])[0]
+        with self._lock:
+            # Snapshot under the lock, score outside it
+            size = self._size
+            vectors = self._vectors
+            mask = self._alive[:size].copy()
+            if filter:
+                mask &= self._cached_filter_mask(filter)
+            candidates = None
+            if self._ivf is not None:
+                candidates = self._ivf.candidates(query, self.config.ivf_nprobe, size)
+
+        if candidates is not None:
+            rows = candidates[mask[candidates]]
+            # Selective filters can leave the probed clusters nearly empty
+            if len(rows) < k:
+                candidates = None
+        matching = int(mask.sum()) if candidates is None else len(rows)
+        if candidates is None:
+            if matching > size // 2:
+                # Mostly matching, score everything and mask out the rest
+                rows = None
+                scores = self._score_all(vectors, size, query)
+                scores[~mask] = -np.inf
+            else:
+                rows = np.flatnonzero(mask)
+        if rows is not None:
+            scores = self._score_rows(vectors, rows, query)
+
+        k = min(k, matching)
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        slots = top if rows is None else rows[top]
+        return [(int(slot), float(scores[i])) for slot, i in zip(slots, top)]
+
+    def _documents(self, slots: List[int]) -> Dict[int, Document]:
+        texts = {}
+        with self._lock:
+            for i in range(0, len(slots), _QUERY_BATCH_SIZE):
+                batch = slots[i : i + _QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT slot, id, text, metadata FROM records WHERE slot IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for slot, id, text, metadata in rows:
+                    texts[slot] = Document(
+                        id=id, page_content=text, metadata=json.loads(metadata)
+                    )
+        return texts
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        results = self._search(embedding, k, filter)
+        documents = self._documents([slot for slot, _ in results])
+        # Slots deleted after scoring are skipped
+        return [
+            (documents[slot], score) for slot, score in results if slot in documents
+        ]
+
+    def similarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        embedding = self._embedding.embed_query(query)
+        return self.similarity_search_by_vector_with_score(embedding, k, filter)
+
+    def similarity_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return [
+            doc
+            for doc, _ in self.similarity_search_by_vector_with_score(
+                embedding, k, filter
+            )
+        ]
+
+    def similarity_search(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Document]:
+        return [
+            doc for doc, _ in self.similarity_search_with_score(query, k, filter)
+        ]
+
+    async def asimilarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector_with_score, embedding, k, filter
+        )
+
+    async def asimilarity_search_with_score(
+        self,
+        query: str,
+        k: int = 4,
+        filter: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> List[Tuple[Document, float]]:
+        embedding = await self._embedding.aembed_query(query)
+        return await self.asimilarity_search_by_vector_with_score(embedding, k, filter)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        with self._lock:
+            slots = [self._slots[id] for id in ids if id in self._slots]
+        documents = self._documents(slots)
+        return [documents[slot] for slot in slots if slot in documents]
+
+    def get_vectors_by_ids(self, ids: Sequence[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            slots = {id: self._slots[id] for id in ids if id in self._slots}
+            vectors = np.asarray(self._vectors[list(slots.values())], dtype=np.float32)
+        return {id: vector.tolist() for id, vector in zip(slots, vectors)}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> "LocalVectorStore":
+        store = cls(embedding=embedding, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        return store
@@ -0,0 +1,275 @@
+"""In-process counters and histograms, rendered in the Prometheus text format.
+
+Recording is a dict lookup, a bisect and a few additions under a lock, so
+metrics stay on in the hot path. `render_metrics()` serves them from
+`/metrics` in app/main.py.
+"""
+
+import functools
+import inspect
+import math
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.embeddings import Embeddings
+from langchain_core.outputs import LLMResult
+
+METRIC_PREFIX = "agentic_"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                lines.append(
+                    f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+                )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = METRIC_PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[labels] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted(
+                (labels, list(counts), total[0])
+                for labels, (counts, total) in self._series.items()
+            )
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    self.labelnames + ("le",), labels + (_format_value(bound),)
+                )
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+NODE_SECONDS = Histogram(
+    "node_duration_seconds", "Wall time of a LangGraph node", ("graph", "node")
+)
+NODE_ERRORS = Counter(
+    "node_errors_total", "LangGraph node calls that raised", ("graph", "node")
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens by model and kind", ("model", "kind")
+)
+LLM_REQUEST_SECONDS = Histogram(
+    "llm_request_duration_seconds", "LLM request time after its concurrency slot", ("model",)
+)
+EMBEDDING_REQUESTS = Counter(
+    "embedding_requests_total", "Calls to the embedding provider", ("kind",)
+)
+EMBEDDING_TEXTS = Counter(
+    "embedding_texts_total", "Texts sent to the embedding provider", ("kind",)
+)
+EMBEDDING_SECONDS = Histogram(
+    "embedding_request_duration_seconds", "Embedding provider request time", ("kind",)
+)
+VECTOR_QUERY_SECONDS = Histogram(
+    "vector_query_duration_seconds", "Similarity search time per query", ("store",)
+)
+CHUNKS = Histogram(
+    "chunks", "Chunks per request at each stage", ("stage",), buckets=COUNT_BUCKETS
+)
+
+_METRICS = (
+    NODE_SECONDS,
+    NODE_ERRORS,
+    LLM_TOKENS,
+    LLM_REQUEST_SECONDS,
+    EMBEDDING_REQUESTS,
+    EMBEDDING_TEXTS,
+    EMBEDDING_SECONDS,
+    VECTOR_QUERY_SECONDS,
+    CHUNKS,
+)
+
+
+def timed_node(graph_name: str, node: Callable) -> Callable:
+    """Wrap a graph node so its wall time and errors are recorded under its function name."""
+    node_name = node.__name__
+
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await node(*args, **kwargs)
+            except Exception:
+                NODE_ERRORS.inc(graph_name, node_name)
+                raise
+            finally:
+                NODE_SECONDS.observe(time.perf_counter() - start, graph_name, node_name)
+
+        return async_wrapper
+
+    @functools.wraps(node)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return node(*args, **kwargs)
+        except Exception:
+            NODE_ERRORS.inc(graph_name, node_name)
+            raise
+        finally:
+            NODE_SECONDS.observe(time.perf_counter() - start, graph_name, node_name)
+
+    return wrapper
+
+
+class LLMTokenCallback(BaseCallbackHandler):
+    """Counts prompt and completion tokens from the usage metadata of each LLM run."""
+
+    run_inline = True  # no executor hop for a few counter increments
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    LLM_TOKENS.inc(
+                        self.model_name, "prompt", amount=usage.get("input_tokens", 0)
+                    )
+                    LLM_TOKENS.inc(
+                        self.model_name, "completion", amount=usage.get("output_tokens", 0)
+                    )
+
+
+class TimedEmbeddings(Embeddings):
+    """Embeddings wrapper that records calls, texts and latency of the provider."""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def _record(self, kind: str, texts: int, start: float):
+        EMBEDDING_REQUESTS.inc(kind)
+        EMBEDDING_TEXTS.inc(kind, amount=texts)
+        EMBEDDING_SECONDS.observe(time.perf_counter() - start, kind)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        self._record("documents", len(texts), start)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self._record("query", 1, start)
+        return vector
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        start = time.perf_counter()
+        vectors = await self.embeddings.aembed_documents(texts)
+        self._record("documents", len(texts), start)
+        return vectors
+
+    async def aembed_query(self, text: str) -> List[float]:
+        start = time.perf_counter()
+        vector = await self.embeddings.aembed_query(text)
+        self._record("query", 1, start)
+        return vector
+
+
+def _render_stats(
+    name: str, stats: Dict[str, Any], labels: Tuple[Tuple[str, str], ...] = ()
+) -> List[str]:
+    """Numeric entries of a component's stats() dict as untyped samples."""
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, dict):
+            # Nested per-item stats, e.g. {"models": {model_name: {...}}} -> model="..."
+            label_name = key[:-1] if key.endswith("s") else key
+            for item, item_stats in value.items():
+                if isinstance(item_stats, dict):
+                    lines.extend(
+                        _render_stats(name, item_stats, labels + ((label_name, item),))
+                    )
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        label_text = _format_labels(
+            [label for label, _ in labels], [item for _, item in labels]
+        )
+        lines.append(f"{METRIC_PREFIX}{name}_{key}{label_text} {_format_value(value)}")
+    return lines
+
+
+def render_metrics(component_stats: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """Prometheus text exposition of every metric plus the given components' stats."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.render())
+    for name, stats in (component_stats or {}).items():
+        lines.extend(_render_stats(name, stats))
+    return "\n".join(lines) + "\n"
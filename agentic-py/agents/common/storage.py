@@ -0,0 +1,69 @@
+import os
+import json
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+from typing import List
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR_ENV = "AGENT_DATA_DIR"
+DEFAULT_DATA_DIR = "data"
+
+_jsonl_lock = threading.Lock()
+
+
+def get_data_dir() -> Path:
+    data_dir = Path(os.getenv(DATA_DIR_ENV, DEFAULT_DATA_DIR))
+    data_dir.mkdir(parents=True, exist_ok=True)
+    return data_dir
+
+
+def connect_sqlite(filename: str) -> sqlite3.Connection:
+    path = get_data_dir() / filename
+    try:
+        # Callers serialize access themselves, connections are shared across threads
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        logger.debug(f"Opened SQLite database at {path}")
+        return conn
+    except sqlite3.Error as e:
+        logger.error(f"Failed to open SQLite database {path}: {e}")
+        raise RuntimeError(f"SQLite database initialization failed: {e}")
+
+
+def _rotated_path(path: Path) -> Path:
+    return path.with_name(path.name + ".1")
+
+
+def append_jsonl(filename: str, entry: dict, max_bytes: int):
+    """Append one JSON line, moving the file to `<filename>.1` past max_bytes.
+
+    Only one rotated file is kept, so a log never takes more than twice
+    max_bytes. Blocking file I/O, call it from a worker thread.
+    """
+    path = get_data_dir() / filename
+    line = json.dumps(entry) + "\n"
+    with _jsonl_lock:
+        if path.exists() and path.stat().st_size + len(line) > max_bytes:
+            os.replace(path, _rotated_path(path))
+        with open(path, "a") as f:
+            f.write(line)
+
+
+def read_jsonl(filename: str) -> List[dict]:
+    """Entries of a log written by append_jsonl, rotated ones first."""
+    path = get_data_dir() / filename
+    entries = []
+    for log_path in (_rotated_path(path), path):
+        if not log_path.exists():
+            continue
+        with open(log_path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return entries
@@ -0,0 +1,52 @@
+import asyncio
+
+import pytest
+
+from agents.common import corpus_version
+from agents.common.corpus_version import get_corpus_version, read_corpus_version
+from agents.common.storage import connect_sqlite
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(corpus_version, "_conn", None)
+    monkeypatch.setattr(corpus_version, "_version", None)
+
+
+def set_version(version: int):
+    conn = connect_sqlite(corpus_version.ARTICLE_LEDGER_DB)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+    )
+    conn.execute(
+        "INSERT INTO meta (key, value) VALUES ('corpus_version', ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (version,),
+    )
+    conn.close()
+
+
+def test_version_is_zero_before_ingestion():
+    assert read_corpus_version() == 0
+    set_version(3)
+    assert read_corpus_version() == 3
+
+
+def test_reads_are_cached_until_invalidated(monkeypatch):
+    monkeypatch.setattr(corpus_version, "CORPUS_VERSION_TTL_SECONDS", 60)
+    set_version(1)
+    assert asyncio.run(get_corpus_version()) == 1
+
+    set_version(2)
+    assert asyncio.run(get_corpus_version()) == 1
+    corpus_version.invalidate_corpus_version()
+    assert asyncio.run(get_corpus_version()) == 2
+
+
+def test_reads_expire_after_ttl(monkeypatch):
+    monkeypatch.setattr(corpus_version, "CORPUS_VERSION_TTL_SECONDS", 0)
+    set_version(1)
+    assert asyncio.run(get_corpus_version()) == 1
+    set_version(5)
+    assert asyncio.run(get_corpus_version()) == 5
@@ -0,0 +1,137 @@
+import random
+
+import pytest
+from langchain_core.documents import Document
+
+from agents.common.lexical_index import (
+    LexicalIndex,
+    LexicalIndexConfig,
+    decode_postings,
+    encode_postings,
+)
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_DATA_DIR", str(tmp_path))
+
+
+def chunk(chunk_id: str, text: str, **metadata) -> Document:
+    return Document(page_content=text, metadata={"chunk_id": chunk_id, **metadata})
+
+
+def search_ids(index: LexicalIndex, query: str, k: int = 10, filter=None):
+    return [doc.metadata["chunk_id"] for doc, _ in index.search(query, k, filter)]
+
+
+@pytest.mark.parametrize(
+    "pairs",
+    [
+        [],
+        [(1, 1)],
+        [(1, 3), (2, 1), (127, 1), (128, 127), (129, 128)],
+        [(5, 300), (16_384, 2), (2_000_000, 1), (2**40, 70_000)],
+    ],
+)
+def test_postings_round_trip(pairs):
+    doc_ids, tfs = decode_postings(encode_postings(pairs))
+    assert list(zip(doc_ids.tolist(), tfs.tolist())) == pairs
+
+
+def test_postings_round_trip_random():
+    rng = random.Random(0)
+    doc_id, pairs = 0, []
+    for _ in range(5000):
+        doc_id += rng.choice([1, 2, 100, 20_000])
+        pairs.append((doc_id, rng.randint(1, 500)))
+    doc_ids, tfs = decode_postings(encode_postings(pairs))
+    assert doc_ids.tolist() == [d for d, _ in pairs]
+    assert tfs.tolist() == [tf for _, tf in pairs]
+
+
+def test_appended_postings_decode_as_one_list():
+    first = [(1, 2), (40, 1)]
+    second = [(41, 5), (1000, 3)]
+    data = encode_postings(first) + encode_postings(second, last_doc=40)
+    doc_ids, tfs = decode_postings(data)
+    assert list(zip(doc_ids.tolist(), tfs.tolist())) == first + second
+
+
+def test_small_gaps_take_two_bytes_per_posting():
+    assert len(encode_postings([(i, 1) for i in range(1, 101)])) == 200
+
+
+def test_search_ranks_and_filters():
+    index = LexicalIndex(LexicalIndexConfig())
+    index.add_documents(
+        [
+            chunk("a", "election results in the capital", category="politics"),
+            chunk("b", "election election turnout record", category="politics"),
+            chunk("c", "football results and league table", category="sports"),
+        ]
+    )
+    assert search_ids(index, "election") == ["b", "a"]
+    assert set(search_ids(index, "results")) == {"a", "c"}
+    assert search_ids(index, "results", filter={"category": "sports"}) == ["c"]
+    assert search_ids(index, "the and of") == []
+
+
+def test_add_skips_indexed_chunks():
+    index = LexicalIndex(LexicalIndexConfig())
+    assert index.add_documents([chunk("a", "alpha"), chunk("b", "beta")]) == 2
+    assert index.add_documents([chunk("a", "alpha"), chunk("c", "gamma")]) == 1
+    assert index.get_indexed_ids(["a", "b", "c", "d"]) == {"a", "b", "c"}
+
+
+def test_delete_masks_until_compaction():
+    index = LexicalIndex(LexicalIndexConfig())
+    index.add_documents(
+        [chunk(f"c{i}", f"shared term{i}") for i in range(10)] + [chunk("solo", "unique")]
+    )
+    postings_bytes = index.stats()["postings_bytes"]
+
+    assert index.delete(["c0", "c1", "c2", "solo", "missing"]) == 4
+    assert index.dead_fraction() == pytest.approx(4 / 11)
+    assert set(search_ids(index, "shared")) == {f"c{i}" for i in range(3, 10)}
+    assert search_ids(index, "unique") == []
+    # Deleted documents are only masked, posting lists are unchanged
+    assert index.stats()["postings_bytes"] == postings_bytes
+
+    index.compact()
+    stats = index.stats()
+    assert stats["deleted_documents"] == 0
+    assert stats["postings_bytes"] < postings_bytes
+    assert index.dead_fraction() == 0
+    assert set(search_ids(index, "shared")) == {f"c{i}" for i in range(3, 10)}
+    # Terms of deleted documents only are dropped
+    assert stats["terms"] == 1 + 7
+    df, data = index._conn.execute(
+        "SELECT df, data FROM postings WHERE term = 'shared'"
+    ).fetchone()
+    doc_ids, _ = decode_postings(data)
+    assert df == len(doc_ids) == 7
+
+
+def test_appends_after_compaction_keep_increasing_ids():
+    index = LexicalIndex(LexicalIndexConfig())
+    index.add_documents([chunk("a", "news one"), chunk("b", "news two")])
+    index.delete(["b"])
+    index.compact()
+    index.add_documents([chunk("c", "news three")])
+    doc_ids, _ = decode_postings(
+        index._conn.execute("SELECT data FROM postings WHERE term = 'news'").fetchone()[0]
+    )
+    assert doc_ids.tolist() == sorted(doc_ids.tolist())
+    assert set(search_ids(index, "news")) == {"a", "c"}
+
+
+def test_reload_keeps_documents_and_deletions():
+    index = LexicalIndex(LexicalIndexConfig())
+    index.add_documents([chunk("a", "storm warning"), chunk("b", "storm damage")])
+    index.delete(["a"])
+
+    reloaded = LexicalIndex(LexicalIndexConfig())
+    assert search_ids(reloaded, "storm") == ["b"]
+    assert reloaded.stats()["deleted_documents"] == 1
+    reloaded.add_documents([chunk("c", "storm over")])
+    assert set(search_ids(reloaded, "storm")) == {"b", "c"}
@@ -0,0 +1,182 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from agents.common.local_vector_store import LocalVectorStore, LocalVectorStoreConfig
+
+DIMENSION = 16
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_DATA_DIR", str(tmp_path))
+
+
+def make_store(**config) -> LocalVectorStore:
+    return LocalVectorStore(
+        DeterministicFakeEmbedding(size=DIMENSION),
+        name="test",
+        dimension=DIMENSION,
+        config=LocalVectorStoreConfig(**config),
+    )
+
+
+def unit(i: int) -> list:
+    vector = np.zeros(DIMENSION)
+    vector[i % DIMENSION] = 1.0
+    return vector.tolist()
+
+
+def add_records(store: LocalVectorStore, count: int):
+    store.add_embeddings(
+        texts=[f"text {i}" for i in range(count)],
+        embeddings=[unit(i) for i in range(count)],
+        metadatas=[
+            {
+                "category": "sports" if i % 2 else "politics",
+                "published_ts": 1000 + i,
+                "authors": ["a", "b"] if i % 3 == 0 else ["c"],
+            }
+            for i in range(count)
+        ],
+        ids=[f"id{i}" for i in range(count)],
+    )
+
+
+def search_ids(store: LocalVectorStore, embedding: list, k: int = 10, filter=None):
+    return [
+        doc.id
+        for doc, _ in store.similarity_search_by_vector_with_score(embedding, k, filter)
+    ]
+
+
+def test_search_ranks_by_similarity():
+    store = make_store()
+    add_records(store, 4)
+    results = store.similarity_search_by_vector_with_score(unit(2), k=2)
+    assert results[0][0].id == "id2"
+    assert results[0][1] == pytest.approx(1.0)
+    assert results[0][0].page_content == "text 2"
+    assert len(results) == 2
+
+
+@pytest.mark.parametrize(
+    "filter, expected",
+    [
+        ({"category": "sports"}, {"id1", "id3", "id5"}),
+        ({"category": {"$ne": "sports"}}, {"id0", "id2", "id4"}),
+        ({"published_ts": {"$gte": 1002, "$lt": 1005}}, {"id2", "id3", "id4"}),
+        ({"authors": {"$eq": "a"}}, {"id0", "id3"}),
+        ({"authors": {"$in": ["b", "x"]}}, {"id0", "id3"}),
+        ({"authors": {"$nin": ["c"]}}, {"id0", "id3"}),
+        ({"missing": {"$exists": False}}, {f"id{i}" for i in range(6)}),
+        (
+            {"$and": [{"category": "sports"}, {"published_ts": {"$gt": 1001}}]},
+            {"id3", "id5"},
+        ),
+        ({"$or": [{"category": "sports"}, {"published_ts": 1000}]}, {"id0", "id1", "id3", "id5"}),
+    ],
+)
+def test_filters(filter, expected):
+    store = make_store()
+    add_records(store, 6)
+    assert set(search_ids(store, unit(0), filter=filter)) == expected
+
+
+def test_filter_mask_refreshes_after_writes():
+    store = make_store()
+    add_records(store, 4)
+    assert set(search_ids(store, unit(0), filter={"category": "sports"})) == {"id1", "id3"}
+    store.add_embeddings(["late"], [unit(9)], [{"category": "sports"}], ["late"])
+    assert "late" in search_ids(store, unit(0), filter={"category": "sports"})
+
+
+def test_delete_by_ids_and_filter():
+    store = make_store()
+    add_records(store, 6)
+
+    store.delete(ids=["id0", "unknown"])
+    assert len(store) == 5
+    assert "id0" not in search_ids(store, unit(0))
+    assert store.get_by_ids(["id0"]) == []
+
+    store.delete(filter={"category": "sports"})
+    assert set(search_ids(store, unit(0))) == {"id2", "id4"}
+
+    store.delete(delete_all=True)
+    assert len(store) == 0
+    assert search_ids(store, unit(0)) == []
+
+
+def test_delete_requires_a_selector():
+    store = make_store()
+    with pytest.raises(ValueError):
+        store.delete()
+
+
+def test_freed_slots_are_reused():
+    store = make_store()
+    add_records(store, 3)
+    store.delete(ids=["id1"])
+    store.add_embeddings(["new"], [unit(5)], [{}], ["new"])
+    assert store._slots["new"] == 1
+    assert search_ids(store, unit(5), k=1) == ["new"]
+
+
+def test_upsert_replaces_vector_and_metadata():
+    store = make_store()
+    add_records(store, 3)
+    store.add_embeddings(["moved"], [unit(7)], [{"category": "world"}], ["id0"])
+    assert len(store) == 3
+    [document] = store.get_by_ids(["id0"])
+    assert document.page_content == "moved"
+    assert document.metadata == {"category": "world"}
+    assert search_ids(store, unit(7), k=1) == ["id0"]
+
+
+def test_reload_from_disk():
+    store = make_store()
+    add_records(store, 6)
+    store.delete(ids=["id2"])
+
+    reloaded = make_store()
+    assert len(reloaded) == 5
+    assert search_ids(reloaded, unit(3), k=1) == ["id3"]
+    assert "id2" not in search_ids(reloaded, unit(2))
+    assert set(search_ids(reloaded, unit(0), filter={"category": "politics"})) == {
+        "id0",
+        "id4",
+    }
+    [document] = reloaded.get_by_ids(["id5"])
+    assert document.metadata["published_ts"] == 1005
+
+
+def test_reload_after_growing_past_initial_capacity():
+    store = make_store()
+    add_records(store, 1500)
+    assert len(store._vectors) >= 1500
+
+    reloaded = make_store()
+    assert len(reloaded) == 1500
+    assert search_ids(reloaded, unit(1499), k=1, filter={"published_ts": 2499}) == [
+        "id1499"
+    ]
+
+
+def test_reload_rejects_other_dimension():
+    make_store()
+    with pytest.raises(ValueError):
+        LocalVectorStore(
+            DeterministicFakeEmbedding(size=8),
+            name="test",
+            dimension=8,
+            config=LocalVectorStoreConfig(),
+        )
+
+
+def test_ivf_search_keeps_filtered_recall():
+    store = make_store(ivf_min_vectors=50, ivf_nprobe=1)
+    add_records(store, 200)
+    assert store._ivf is not None
+    # A selective filter falls back to the exact scan when probed clusters miss
+    assert search_ids(store, unit(0), k=5, filter={"published_ts": 1150}) == ["id150"]
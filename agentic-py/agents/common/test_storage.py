@@ -0,0 +1,32 @@
+import pytest
+
+from agents.common.storage import append_jsonl, get_data_dir, read_jsonl
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_DATA_DIR", str(tmp_path))
+
+
+def test_append_and_read_in_order():
+    for i in range(3):
+        append_jsonl("log.jsonl", {"i": i}, max_bytes=10_000)
+    assert [entry["i"] for entry in read_jsonl("log.jsonl")] == [0, 1, 2]
+
+
+def test_rotation_bounds_disk_use():
+    for i in range(200):
+        append_jsonl("log.jsonl", {"i": i, "query": "x" * 20}, max_bytes=500)
+    files = sorted(path.name for path in get_data_dir().iterdir())
+    assert files == ["log.jsonl", "log.jsonl.1"]
+    assert all(path.stat().st_size <= 500 for path in get_data_dir().iterdir())
+
+    entries = [entry["i"] for entry in read_jsonl("log.jsonl")]
+    # Only the two newest files are kept, oldest entries first
+    assert entries == list(range(200 - len(entries), 200))
+
+
+def test_read_skips_missing_and_corrupt_lines():
+    assert read_jsonl("missing.jsonl") == []
+    (get_data_dir() / "log.jsonl").write_text('{"i": 1}\nnot json\n{"i": 2}\n')
+    assert read_jsonl("log.jsonl") == [{"i": 1}, {"i": 2}]
@@ -0,0 +1,77 @@
+import asyncio
+from typing import List
+
+from langchain_core.documents import Document
+from pinecone.exceptions import PineconeApiException
+
+from agents.common.vector_store import VectorStoreConfig, _add_batch
+
+
+class FakeStore:
+    """Records add_documents calls and fails them as told."""
+
+    def __init__(self, fail):
+        self.fail = fail
+        self.calls: List[List[str]] = []
+
+    def add_documents(self, documents, ids=None):
+        self.calls.append(ids)
+        error = self.fail(ids)
+        if error is not None:
+            raise error
+        return ids
+
+
+def docs(count: int) -> List[Document]:
+    return [
+        Document(page_content=f"chunk {i}", metadata={"chunk_id": f"c{i}"})
+        for i in range(count)
+    ]
+
+
+def add(store: FakeStore, batch: List[Document], retries: int = 2):
+    config = VectorStoreConfig(index_name="test", retry_delay=0)
+    return asyncio.run(
+        _add_batch(store, batch, config, asyncio.Semaphore(4), retries)
+    )
+
+
+def test_rejected_document_is_isolated():
+    store = FakeStore(
+        lambda ids: PineconeApiException(status=400) if "c5" in ids else None
+    )
+    added, failed = add(store, docs(8))
+    assert sorted(added) == [f"c{i}" for i in range(8) if i != 5]
+    assert [doc.metadata["chunk_id"] for doc in failed] == ["c5"]
+
+
+def test_validation_error_is_split():
+    store = FakeStore(lambda ids: ValueError("dimension") if "c0" in ids else None)
+    added, failed = add(store, docs(2))
+    assert added == ["c1"] and len(failed) == 1
+
+
+def test_outage_fails_whole_batch_without_splitting():
+    store = FakeStore(lambda ids: ConnectionError("unreachable"))
+    added, failed = add(store, docs(8), retries=2)
+    assert added == [] and len(failed) == 8
+    assert len(store.calls) == 3
+
+
+def test_rate_limit_and_auth_errors_are_not_split():
+    for status in (429, 401, 503):
+        store = FakeStore(lambda ids: PineconeApiException(status=status))
+        added, failed = add(store, docs(4), retries=1)
+        assert added == [] and len(failed) == 4
+        assert all(len(ids) == 4 for ids in store.calls)
+
+
+def test_transient_error_is_retried():
+    attempts = []
+
+    def fail(ids):
+        attempts.append(ids)
+        return ConnectionError("blip") if len(attempts) == 1 else None
+
+    added, failed = add(FakeStore(fail), docs(3))
+    assert added == ["c0", "c1", "c2"] and failed == []
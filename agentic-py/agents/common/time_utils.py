@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+
+def to_epoch_seconds(value: Union[datetime, str, None]) -> Optional[int]:
+    """Epoch seconds of a datetime or ISO 8601 string, None if missing or invalid.
+
+    Naive values (news-please dates, bare "YYYY-MM-DD") are taken as UTC.
+    """
+    if not value:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
@@ -2,14 +2,40 @@ from pinecone import Pinecone
 from langchain_community.embeddings import JinaEmbeddings
 from langchain_pinecone import PineconeVectorStore
 import os
+import asyncio
+import json
 import logging
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+import random
+from typing import Optional, Dict, Any, Iterator, List, Tuple
+from dataclasses import dataclass, field, replace
 from langchain_core.vectorstores import VectorStore
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from agents.common.embedding_cache import (
+    CachedEmbeddings,
+    get_embedding_cache,
+    get_embedding_cache_stats,
+)
+from agents.common.local_vector_store import LocalVectorStore
+from agents.common.metrics import VECTOR_QUERY_SECONDS, TimedEmbeddings
 import time
 
 logger = logging.getLogger(__name__)
 
+# Keeps Pinecone fetch requests (IDs go in the query string) well under URL limits
+_FETCH_BATCH_SIZE = 100
+
+
+@dataclass(frozen=True)
+class ShardConfig:
+    index_name: str
+    namespace: Optional[str] = None
+    text_key: str = "text"  # Pinecone metadata field holding the chunk text
+
+    @property
+    def key(self) -> str:
+        return f"{self.index_name}/{self.namespace}" if self.namespace else self.index_name
+
 
 @dataclass
 class VectorStoreConfig:
@@ -19,23 +45,94 @@ class VectorStoreConfig:
     embedding_model: str = "jina-embeddings-v3"
     max_retries: int = 3
     retry_delay: float = 1.0
+    # "pinecone" or "local" (in-process, persisted under AGENT_DATA_DIR)
+    backend: str = field(
+        default_factory=lambda: os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
+    )
+    # Write path: each batch is one embedding request followed by its upsert
+    batch_token_budget: int = 20000
+    max_batch_documents: int = 100
+    max_concurrent_batches: int = 4
+    # Category value -> shard; unmapped categories use index_name's default namespace
+    shards: Dict[str, ShardConfig] = field(default_factory=dict)
+    shard_timeout: float = 5.0  # seconds per shard when searching all of them
+
+    @property
+    def default_shard(self) -> ShardConfig:
+        return ShardConfig(index_name=self.index_name)
+
+    def get_shard(self, category: Optional[str]) -> ShardConfig:
+        return self.shards.get(category, self.default_shard)
+
+    def get_all_shards(self) -> List[ShardConfig]:
+        return list(dict.fromkeys([self.default_shard, *self.shards.values()]))
+
+    @property
+    def target_key(self) -> str:
+        """Identifies where and how vectors are written, for the ingestion ledger."""
+        shards = ",".join(
+            f"{category}={shard.key}" for category, shard in sorted(self.shards.items())
+        )
+        return (
+            f"{self.backend}:{self.embedding_model}:{self.dimension}:"
+            f"{self.default_shard.key}:{shards}"
+        )
 
 
 # Global cache for vector store instances
 _vector_store_cache: Dict[str, VectorStore] = {}
 _pinecone_client: Optional[Pinecone] = None
+_vector_store_config: Optional[VectorStoreConfig] = None
+
 
+def _generate_cache_key(backend: str, shard: ShardConfig) -> str:
+    return f"{backend}:{shard.key}"
 
-def _generate_cache_key(index_name: str) -> str:
-    return index_name
+
+def _parse_shards(value: str) -> Dict[str, ShardConfig]:
+    """Parse "sports=news-sports,tech=news/tech" into category -> shard."""
+    shards = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        category, _, target = entry.partition("=")
+        index_name, _, namespace = target.strip().partition("/")
+        if not category.strip() or not index_name:
+            raise ValueError(f"Invalid VECTOR_STORE_SHARDS entry: {entry!r}")
+        shards[category.strip()] = ShardConfig(index_name, namespace or None)
+    return shards
 
 
 def _get_config_from_env() -> VectorStoreConfig:
     index_name = os.getenv("PINECONE_INDEX")
+    backend = os.getenv("VECTOR_STORE_BACKEND", "pinecone").lower()
     if not index_name:
-        raise ValueError("PINECONE_INDEX environment variable is required")
-
-    return VectorStoreConfig(index_name=index_name)
+        if backend != "local":
+            raise ValueError("PINECONE_INDEX environment variable is required")
+        index_name = "news"
+
+    config = VectorStoreConfig(index_name=index_name, backend=backend)
+    config.batch_token_budget = int(
+        os.getenv("VECTOR_STORE_BATCH_TOKENS", config.batch_token_budget)
+    )
+    config.max_batch_documents = int(
+        os.getenv("VECTOR_STORE_BATCH_DOCUMENTS", config.max_batch_documents)
+    )
+    config.max_concurrent_batches = int(
+        os.getenv("VECTOR_STORE_CONCURRENCY", config.max_concurrent_batches)
+    )
+    config.shards = _parse_shards(os.getenv("VECTOR_STORE_SHARDS", ""))
+    config.shard_timeout = float(
+        os.getenv("VECTOR_STORE_SHARD_TIMEOUT", config.shard_timeout)
+    )
+    return config
+
+
+def get_vector_store_config() -> VectorStoreConfig:
+    global _vector_store_config
+    if _vector_store_config is None:
+        _vector_store_config = _get_config_from_env()
+    return _vector_store_config
 
 
 def _get_pinecone_client() -> Pinecone:
@@ -102,42 +199,65 @@ def _setup_pinecone_index(config: VectorStoreConfig) -> Any:
         raise RuntimeError(f"Pinecone index setup failed: {e}")
 
 
-def _create_embedding_model(model_name: str) -> JinaEmbeddings:
+def _create_embedding_model(model_name: str, dimension: int) -> Embeddings:
     try:
-        embedding = JinaEmbeddings(model_name=model_name)
+        embedding = TimedEmbeddings(JinaEmbeddings(model_name=model_name))
         logger.debug(f"Embedding model {model_name} initialized successfully")
+
+        # Serve previously embedded texts from the on-disk cache
+        cache = get_embedding_cache()
+        if cache is not None:
+            return CachedEmbeddings(embedding, model_name, dimension, cache)
         return embedding
     except Exception as e:
         logger.error(f"Failed to initialize embedding model {model_name}: {e}")
         raise RuntimeError(f"Embedding model initialization failed: {e}")
 
 
-def get_vector_store(config: Optional[VectorStoreConfig] = None) -> VectorStore:
+def get_vector_store(
+    config: Optional[VectorStoreConfig] = None, shard: Optional[ShardConfig] = None
+) -> VectorStore:
     global _vector_store_cache
 
     try:
         # Create config from environment if not provided
         if config is None:
             config = _get_config_from_env()
+        if shard is None:
+            shard = config.default_shard
 
-        # Generate cache key based on index name
-        cache_key = _generate_cache_key(config.index_name)
+        # Generate cache key based on backend, index and namespace
+        cache_key = _generate_cache_key(config.backend, shard)
 
         # Use cached instance if available
         if cache_key in _vector_store_cache:
             logger.debug(f"Returning cached vector store instance for key: {cache_key}")
             return _vector_store_cache[cache_key]
 
-        logger.info(f"Initializing vector store with index: {config.index_name}")
-
-        # Setup Pinecone index
-        index = _setup_pinecone_index(config)
+        logger.info(f"Initializing {config.backend} vector store with shard: {shard.key}")
 
         # Create embedding model
-        embedding = _create_embedding_model(config.embedding_model)
+        embedding = _create_embedding_model(config.embedding_model, config.dimension)
 
         # Create vector store
-        vector_store = PineconeVectorStore(index=index, embedding=embedding)
+        if config.backend == "local":
+            # Local stores have no namespaces, each shard is its own store
+            vector_store = LocalVectorStore(
+                embedding=embedding,
+                name=shard.key.replace("/", "__"),
+                dimension=config.dimension,
+                metric=config.metric,
+            )
+        elif config.backend == "pinecone":
+            index = _setup_pinecone_index(replace(config, index_name=shard.index_name))
+            vector_store = PineconeVectorStore(
+                index=index,
+                embedding=embedding,
+                namespace=shard.namespace,
+                text_key=shard.text_key,
+            )
+        else:
+            raise ValueError(f"Unknown vector store backend: {config.backend}")
 
         # Cache the instance
         _vector_store_cache[cache_key] = vector_store
@@ -151,10 +271,119 @@ def get_vector_store(config: Optional[VectorStoreConfig] = None) -> VectorStore:
         raise RuntimeError(f"Vector store creation failed: {e}")
 
 
-def add_documents_to_vector_store(
+def _estimate_tokens(document) -> int:
+    # Chunks carry an exact count from the splitter, ~4 characters per token otherwise
+    token_count = document.metadata.get("token_count")
+    if token_count:
+        return token_count
+    return len(document.page_content) // 4 + 1
+
+
+def _make_batches(
+    documents: list, token_budget: int, max_documents: int
+) -> List[list]:
+    """Group documents into batches bounded by total tokens and document count."""
+    batches = []
+    batch = []
+    batch_tokens = 0
+    for document in documents:
+        tokens = _estimate_tokens(document)
+        if batch and (
+            batch_tokens + tokens > token_budget or len(batch) >= max_documents
+        ):
+            batches.append(batch)
+            batch = []
+            batch_tokens = 0
+        batch.append(document)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+# Client errors that every half of a batch would hit again
+_NON_DOCUMENT_STATUSES = {401, 403, 404, 408, 429}
+
+
+def _is_document_error(e: Exception) -> bool:
+    """Whether the batch content was rejected (4xx, validation), so splitting can help.
+
+    Outages, rate limits and auth errors fail every smaller batch the same way.
+    """
+    status = getattr(e, "status", None) or getattr(
+        getattr(e, "response", None), "status_code", None
+    )
+    if isinstance(status, int):
+        return 400 <= status < 500 and status not in _NON_DOCUMENT_STATUSES
+    # A non-JSON reply is a gateway or outage page, not a bad document
+    return isinstance(e, (ValueError, TypeError)) and not isinstance(
+        e, json.JSONDecodeError
+    )
+
+
+async def _add_batch(
+    vector_store: VectorStore,
+    batch: list,
+    config: VectorStoreConfig,
+    limit: asyncio.Semaphore,
+    retries: int,
+) -> Tuple[List[str], list]:
+    """Embed and upsert one batch, returns (added ids, failed documents).
+
+    Other errors are retried with jittered exponential backoff and then
+    fail the whole batch. A batch rejected for its content is split in
+    halves instead, so a single bad document doesn't fail its neighbours.
+    """
+    # Explicit IDs make upserts idempotent, retries overwrite in place
+    ids = [doc.metadata.get("chunk_id") or doc.id for doc in batch]
+    for attempt in range(retries + 1):
+        try:
+            async with limit:
+                if all(ids):
+                    return (
+                        await asyncio.to_thread(
+                            vector_store.add_documents, batch, ids=ids
+                        ),
+                        [],
+                    )
+                return await asyncio.to_thread(vector_store.add_documents, batch), []
+        except Exception as e:
+            if _is_document_error(e):
+                logger.warning(f"Batch of {len(batch)} documents was rejected: {e}")
+                break
+            if attempt == retries:
+                logger.error(
+                    f"Failed to add batch of {len(batch)} documents "
+                    f"after {attempt + 1} attempts: {e}"
+                )
+                return [], batch
+            # Full jitter keeps concurrent batches from retrying in lockstep
+            delay = random.uniform(0, config.retry_delay * 2**attempt)
+            logger.warning(
+                f"Failed to add batch of {len(batch)} documents, "
+                f"retrying in {delay:.1f}s: {e}"
+            )
+            await asyncio.sleep(delay)
+
+    if len(batch) == 1:
+        return [], batch
+
+    # Halves get a single attempt each, a transient error fails only that half
+    middle = len(batch) // 2
+    results = await asyncio.gather(
+        _add_batch(vector_store, batch[:middle], config, limit, retries=0),
+        _add_batch(vector_store, batch[middle:], config, limit, retries=0),
+    )
+    return (
+        [id for added, _ in results for id in added],
+        [doc for _, failed in results for doc in failed],
+    )
+
+
+async def aadd_documents_to_vector_store(
     documents: list,
     config: Optional[VectorStoreConfig] = None,
-    batch_size: int = 100,
+    batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     if not documents:
         raise ValueError("Documents list cannot be empty")
@@ -164,33 +393,64 @@ def add_documents_to_vector_store(
         if config is None:
             config = _get_config_from_env()
 
-        vector_store = get_vector_store(config)
-
-        logger.info(f"Adding {len(documents)} documents to vector store")
-
-        # Process documents in batches
-        total_added = 0
-        failed_docs = []
-
-        for i in range(0, len(documents), batch_size):
-            batch = documents[i : i + batch_size]
-            try:
-                vector_store.add_documents(batch)
-                total_added += len(batch)
-                logger.info(f"Added batch {i//batch_size + 1}: {len(batch)} documents")
-            except Exception as e:
-                logger.error(f"Failed to add batch {i//batch_size + 1}: {e}")
-                failed_docs.extend(batch)
+        # Route every document to its category's shard
+        documents_by_shard: Dict[ShardConfig, list] = {}
+        for document in documents:
+            shard = config.get_shard(document.metadata.get("category"))
+            documents_by_shard.setdefault(shard, []).append(document)
+
+        shard_batches = [
+            (get_vector_store(config, shard), batch)
+            for shard, shard_documents in documents_by_shard.items()
+            for batch in _make_batches(
+                shard_documents,
+                config.batch_token_budget,
+                batch_size or config.max_batch_documents,
+            )
+        ]
+        logger.info(
+            f"Adding {len(documents)} documents to vector store "
+            f"in {len(shard_batches)} batches across {len(documents_by_shard)} shards"
+        )
+
+        start_time = time.perf_counter()
+        limit = asyncio.Semaphore(config.max_concurrent_batches)
+        results = await asyncio.gather(
+            *[
+                _add_batch(vector_store, batch, config, limit, config.max_retries)
+                for vector_store, batch in shard_batches
+            ]
+        )
+        elapsed = time.perf_counter() - start_time
+
+        added_ids = [id for added, _ in results for id in added]
+        failed_docs = [doc for _, failed in results for doc in failed]
+        total_added = len(documents) - len(failed_docs)
 
         result = {
             "total_documents": len(documents),
             "successfully_added": total_added,
             "failed_documents": len(failed_docs),
             "success_rate": total_added / len(documents) if documents else 0,
+            "added_ids": added_ids,
+            "failed_ids": [
+                doc.metadata.get("chunk_id") or doc.id for doc in failed_docs
+            ],
+            "batches": len(shard_batches),
+            "elapsed_seconds": round(elapsed, 3),
+            "chunks_per_sec": round(total_added / elapsed, 1) if elapsed else 0,
             "index_name": config.index_name,
+            "shards": {
+                shard.key: len(shard_documents)
+                for shard, shard_documents in documents_by_shard.items()
+            },
+            "embedding_cache": get_embedding_cache_stats(),
         }
 
-        logger.info(f"Document addition completed: {result}")
+        logger.info(
+            f"Document addition completed: {total_added}/{len(documents)} added "
+            f"in {elapsed:.1f}s ({result['chunks_per_sec']} chunks/sec)"
+        )
         return result
 
     except Exception as e:
@@ -198,6 +458,188 @@ def add_documents_to_vector_store(
         raise RuntimeError(f"Document addition failed: {e}")
 
 
+async def asimilarity_search_by_vector(
+    vector_store: VectorStore,
+    embedding: List[float],
+    k: int,
+    filter: Optional[dict] = None,
+) -> List[Tuple[Any, float]]:
+    """Vector search that doesn't block the event loop.
+
+    Runs the sync search in a worker thread: the sync Pinecone client keeps
+    pooled keep-alive connections, while its asyncio client opens a new
+    session per call unless the store is used as a context manager.
+    """
+    start = time.perf_counter()
+    results = await asyncio.to_thread(
+        vector_store.similarity_search_by_vector_with_score,
+        embedding,
+        k=k,
+        filter=filter,
+    )
+    VECTOR_QUERY_SECONDS.observe(
+        time.perf_counter() - start, type(vector_store).__name__
+    )
+    return results
+
+
+async def asearch_shards(
+    embedding: List[float],
+    k: int,
+    config: Optional[VectorStoreConfig] = None,
+    filter: Optional[dict] = None,
+) -> List[Tuple[Any, float]]:
+    """Search every shard concurrently and merge the top-k by score.
+
+    Shards that error or miss `shard_timeout` are skipped so one slow index
+    doesn't stall the query.
+    """
+    if config is None:
+        config = get_vector_store_config()
+    shards = config.get_all_shards()
+
+    shard_results = await asyncio.gather(
+        *[
+            asyncio.wait_for(
+                asimilarity_search_by_vector(
+                    get_vector_store(config, shard), embedding, k, filter
+                ),
+                timeout=config.shard_timeout,
+            )
+            for shard in shards
+        ],
+        return_exceptions=True,
+    )
+
+    results = []
+    for shard, shard_result in zip(shards, shard_results):
+        if isinstance(shard_result, asyncio.TimeoutError):
+            logger.warning(f"Shard {shard.key} timed out after {config.shard_timeout}s")
+        elif isinstance(shard_result, Exception):
+            logger.error(f"Failed to search shard {shard.key}: {shard_result}")
+        else:
+            results.extend(shard_result)
+
+    return sorted(results, key=lambda result: result[1], reverse=True)[:k]
+
+
+def delete_from_vector_store(
+    chunks: Dict[str, Optional[str]], config: Optional[VectorStoreConfig] = None
+) -> Dict[str, Any]:
+    """Delete chunk IDs (mapped to their category) from their shards."""
+    if config is None:
+        config = get_vector_store_config()
+
+    ids_by_shard: Dict[ShardConfig, List[str]] = {}
+    for chunk_id, category in chunks.items():
+        ids_by_shard.setdefault(config.get_shard(category), []).append(chunk_id)
+
+    deleted_ids = []
+    failed_ids = []
+    for shard, ids in ids_by_shard.items():
+        try:
+            get_vector_store(config, shard).delete(ids=ids)
+            deleted_ids.extend(ids)
+            logger.info(f"Deleted {len(ids)} vectors from shard {shard.key}")
+        except Exception as e:
+            logger.error(f"Failed to delete {len(ids)} vectors from shard {shard.key}: {e}")
+            failed_ids.extend(ids)
+
+    return {
+        "deleted_ids": deleted_ids,
+        "failed_ids": failed_ids,
+        "shards": {shard.key: len(ids) for shard, ids in ids_by_shard.items()},
+    }
+
+
+def _fetch_pinecone(
+    vector_store: PineconeVectorStore, shard: ShardConfig, ids: List[str]
+) -> Iterator[Tuple[str, Any]]:
+    """Stored records of IDs, batched; langchain-pinecone has no get_by_ids."""
+    for i in range(0, len(ids), _FETCH_BATCH_SIZE):
+        response = vector_store.index.fetch(
+            ids=ids[i : i + _FETCH_BATCH_SIZE], namespace=shard.namespace
+        )
+        yield from response.vectors.items()
+
+
+def _fetch_documents(
+    vector_store: VectorStore, shard: ShardConfig, ids: List[str]
+) -> List[Document]:
+    if isinstance(vector_store, PineconeVectorStore):
+        documents = []
+        for id, record in _fetch_pinecone(vector_store, shard, ids):
+            metadata = dict(record.metadata or {})
+            text = metadata.pop(shard.text_key, None)
+            if text is not None:
+                documents.append(Document(id=id, page_content=text, metadata=metadata))
+        return documents
+    return vector_store.get_by_ids(ids)
+
+
+def get_documents_from_vector_store(
+    chunks: Dict[str, Optional[str]], config: Optional[VectorStoreConfig] = None
+) -> List[Document]:
+    """Stored documents of chunk IDs (mapped to their category); missing IDs are skipped."""
+    if config is None:
+        config = get_vector_store_config()
+
+    ids_by_shard: Dict[ShardConfig, List[str]] = {}
+    for chunk_id, category in chunks.items():
+        ids_by_shard.setdefault(config.get_shard(category), []).append(chunk_id)
+
+    documents = []
+    for shard, ids in ids_by_shard.items():
+        documents.extend(_fetch_documents(get_vector_store(config, shard), shard, ids))
+    return documents
+
+
+def _fetch_vectors(
+    vector_store: VectorStore, shard: ShardConfig, ids: List[str]
+) -> Dict[str, List[float]]:
+    if isinstance(vector_store, PineconeVectorStore):
+        return {
+            id: list(record.values)
+            for id, record in _fetch_pinecone(vector_store, shard, ids)
+            if record.values
+        }
+    if isinstance(vector_store, LocalVectorStore):
+        return vector_store.get_vectors_by_ids(ids)
+    return {}
+
+
+async def aget_vectors_from_vector_store(
+    chunks: Dict[str, Optional[str]], config: Optional[VectorStoreConfig] = None
+) -> Dict[str, List[float]]:
+    """Stored vectors of chunk IDs (mapped to their category), shards fetched concurrently."""
+    if config is None:
+        config = get_vector_store_config()
+
+    ids_by_shard: Dict[ShardConfig, List[str]] = {}
+    for chunk_id, category in chunks.items():
+        ids_by_shard.setdefault(config.get_shard(category), []).append(chunk_id)
+
+    shard_vectors = await asyncio.gather(
+        *[
+            asyncio.to_thread(_fetch_vectors, get_vector_store(config, shard), shard, ids)
+            for shard, ids in ids_by_shard.items()
+        ]
+    )
+    vectors = {}
+    for shard_vector in shard_vectors:
+        vectors.update(shard_vector)
+    return vectors
+
+
+def add_documents_to_vector_store(
+    documents: list,
+    config: Optional[VectorStoreConfig] = None,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Sync wrapper around `aadd_documents_to_vector_store` for scripts."""
+    return asyncio.run(aadd_documents_to_vector_store(documents, config, batch_size))
+
+
 def clear_vector_store_cache(cache_key: Optional[str] = None):
     global _vector_store_cache, _pinecone_client
 
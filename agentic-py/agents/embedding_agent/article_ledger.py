@@ -0,0 +1,326 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from agents.common.corpus_version import ARTICLE_LEDGER_DB, invalidate_corpus_version
+from agents.common.storage import connect_sqlite
+from agents.common.time_utils import to_epoch_seconds
+from agents.common.url_utils import url_hash
+from agents.common.vector_store import get_vector_store_config
+from agents.embedding_agent.state import SeenArticle
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_QUERY_BATCH_SIZE = 500
+
+# Marker for articles recorded without a modification time
+_UNKNOWN_MODIFIED = 0.0
+
+
+class ArticleLedger:
+    """Durable record of already ingested article URLs and their chunks.
+
+    Each URL is stored as a 64-bit hash of its canonical form, which is the
+    table's rowid key, so lookups stay a single B-tree probe even with
+    millions of rows and each row costs a few dozen bytes on disk. Chunk
+    IDs are content-addressed, so a known chunk ID means its vector is
+    already stored and up to date in the vector store target the ledger
+    was recorded against (see `use_target`).
+    """
+
+    def __init__(self, filename: str = ARTICLE_LEDGER_DB):
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS articles (
+                url_hash INTEGER PRIMARY KEY,
+                modified_ts REAL NOT NULL,
+                seen_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                chunk_id TEXT PRIMARY KEY,
+                article_id TEXT NOT NULL,
+                category TEXT,
+                ingested_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS chunks_article_id ON chunks (article_id)"
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        self._migrate()
+
+    def _migrate(self):
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(chunks)")}
+        if "published_ts" not in columns:
+            # Rows recorded before this column age from their ingestion time
+            self._conn.execute("ALTER TABLE chunks ADD COLUMN published_ts REAL")
+            logger.info("Added published_ts column to the chunk ledger")
+
+    def use_target(self, target_key: str):
+        """Forget every article and chunk when the vector store target changed.
+
+        What the ledger records only holds for the store it was written to;
+        after switching backend, index, shards or embedding model everything
+        must be ingested again.
+        """
+        target = int.from_bytes(
+            hashlib.blake2b(target_key.encode(), digest_size=7).digest(), "big"
+        )
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'target'"
+            ).fetchone()
+            if row is not None and row[0] != target:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.execute("DELETE FROM articles")
+                    self._conn.execute("DELETE FROM chunks")
+                    self._conn.execute(
+                        """
+                        INSERT INTO meta (key, value) VALUES ('corpus_version', 1)
+                        ON CONFLICT(key) DO UPDATE SET value = value + 1
+                        """
+                    )
+                    self._conn.execute(
+                        "UPDATE meta SET value = ? WHERE key = 'target'", (target,)
+                    )
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                invalidate_corpus_version()
+                logger.warning(
+                    f"Vector store target changed to {target_key}, reset the article ledger"
+                )
+            elif row is None:
+                # Ledgers from before targets were tracked belong to the current one
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES ('target', ?)", (target,)
+                )
+
+    def get_modified(self, urls: Iterable[str]) -> Dict[str, float]:
+        """Return the recorded modification time of every known URL."""
+        keys: Dict[int, List[str]] = {}
+        for url in urls:
+            keys.setdefault(url_hash(url), []).append(url)
+
+        known = {}
+        hashes = list(keys)
+        with self._lock:
+            for i in range(0, len(hashes), _QUERY_BATCH_SIZE):
+                batch = hashes[i : i + _QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    "SELECT url_hash, modified_ts FROM articles WHERE url_hash IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, modified_ts in rows:
+                    for url in keys[key]:
+                        known[url] = modified_ts
+        return known
+
+    def record(self, seen_articles: List[SeenArticle]):
+        now = time.time()
+        rows = [
+            (url_hash(url), seen.modified_ts or _UNKNOWN_MODIFIED, now)
+            for seen in seen_articles
+            for url in seen.urls
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO articles (url_hash, modified_ts, seen_at)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT(url_hash) DO UPDATE SET
+                        modified_ts = MAX(modified_ts, excluded.modified_ts),
+                        seen_at = excluded.seen_at
+                    """,
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Recorded {len(seen_articles)} articles in the ledger")
+
+    def get_known_chunk_ids(self, chunk_ids: Iterable[str]) -> Set[str]:
+        chunk_ids = list(chunk_ids)
+        known = set()
+        with self._lock:
+            for i in range(0, len(chunk_ids), _QUERY_BATCH_SIZE):
+                batch = chunk_ids[i : i + _QUERY_BATCH_SIZE]
+                rows = self._conn.execute(
+                    "SELECT chunk_id FROM chunks WHERE chunk_id IN "
+                    f"({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                known.update(chunk_id for (chunk_id,) in rows)
+        return known
+
+    def record_chunks(self, metadatas: List[dict]):
+        """Record the chunks stored for a run; known chunks get their timestamp refreshed."""
+        now = time.time()
+        rows = [
+            (
+                metadata["chunk_id"],
+                metadata["article_id"],
+                metadata.get("category"),
+                now,
+                metadata.get("published_ts")
+                or to_epoch_seconds(metadata.get("published_date")),
+            )
+            for metadata in metadatas
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    """
+                    INSERT INTO chunks (chunk_id, article_id, category, ingested_at, published_ts)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(chunk_id) DO UPDATE SET
+                        category = COALESCE(excluded.category, category),
+                        ingested_at = excluded.ingested_at,
+                        published_ts = COALESCE(excluded.published_ts, published_ts)
+                    """,
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Recorded {len(rows)} chunks in the ledger")
+
+    def get_chunks_after(
+        self, chunk_id: str, limit: int
+    ) -> List[Tuple[str, Optional[str]]]:
+        """Next page of recorded chunks by ID, as (chunk_id, category)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT chunk_id, category FROM chunks WHERE chunk_id > ? "
+                "ORDER BY chunk_id LIMIT ?",
+                (chunk_id, limit),
+            ).fetchall()
+
+    def get_expired_chunks(
+        self, cutoffs: Dict[str, Optional[float]], default_cutoff: Optional[float]
+    ) -> List[Tuple[str, Optional[str]]]:
+        """Chunks published before their category's cutoff, as (chunk_id, category).
+
+        A None cutoff keeps the category forever; categories missing from
+        `cutoffs` use `default_cutoff`.
+        """
+        # Chunks without a publish date age from their last ingestion
+        published = "COALESCE(published_ts, ingested_at)"
+        expired = []
+        with self._lock:
+            for category, cutoff in cutoffs.items():
+                if cutoff is None:
+                    continue
+                expired.extend(
+                    self._conn.execute(
+                        f"SELECT chunk_id, category FROM chunks WHERE category = ? AND {published} < ?",
+                        (category, cutoff),
+                    ).fetchall()
+                )
+            if default_cutoff is not None:
+                placeholders = ",".join("?" * len(cutoffs))
+                expired.extend(
+                    self._conn.execute(
+                        f"""
+                        SELECT chunk_id, category FROM chunks
+                        WHERE (category IS NULL OR category NOT IN ({placeholders}))
+                            AND {published} < ?
+                        """,
+                        [*cutoffs, default_cutoff],
+                    ).fetchall()
+                )
+        return expired
+
+    def get_superseded_chunks(self) -> List[Tuple[str, Optional[str]]]:
+        """Chunks left over from earlier versions of re-ingested articles.
+
+        Every ingestion records an article's full chunk set with one
+        timestamp, so chunks older than the article's latest run are gone
+        from its current text.
+        """
+        with self._lock:
+            return self._conn.execute(
+                """
+                SELECT chunks.chunk_id, chunks.category FROM chunks
+                JOIN (
+                    SELECT article_id, MAX(ingested_at) AS latest
+                    FROM chunks GROUP BY article_id
+                ) AS articles ON chunks.article_id = articles.article_id
+                WHERE chunks.ingested_at < articles.latest
+                """
+            ).fetchall()
+
+    def delete_chunks(self, chunk_ids: List[str]):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "DELETE FROM chunks WHERE chunk_id = ?",
+                    [(chunk_id,) for chunk_id in chunk_ids],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Deleted {len(chunk_ids)} chunks from the ledger")
+
+    def get_corpus_version(self) -> int:
+        """Counter bumped whenever chunks are added to or removed from the index."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'corpus_version'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    def bump_corpus_version(self) -> int:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO meta (key, value) VALUES ('corpus_version', 1)
+                ON CONFLICT(key) DO UPDATE SET value = value + 1
+                """
+            )
+            version = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'corpus_version'"
+            ).fetchone()[0]
+        invalidate_corpus_version()
+        logger.info(f"Corpus version bumped to {version}")
+        return version
+
+
+# Global ledger instance
+_article_ledger: Optional[ArticleLedger] = None
+
+
+def get_article_ledger() -> ArticleLedger:
+    global _article_ledger
+    if _article_ledger is None:
+        ledger = ArticleLedger()
+        ledger.use_target(get_vector_store_config().target_key)
+        _article_ledger = ledger
+    return _article_ledger
@@ -0,0 +1,82 @@
+import json
+import logging
+import threading
+import time
+from typing import Optional
+
+from agents.common.storage import connect_sqlite
+from agents.embedding_agent.state import FeedState
+
+logger = logging.getLogger(__name__)
+
+FEED_STATE_DB = "feed_state.db"
+
+
+class FeedStateStore:
+    """Per-feed HTTP validators and last seen entry IDs, persisted in SQLite."""
+
+    def __init__(self, filename: str = FEED_STATE_DB):
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(filename)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS feed_state (
+                feed_url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                entry_ids TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+
+    def get(self, feed_url: str) -> Optional[FeedState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, entry_ids FROM feed_state WHERE feed_url = ?",
+                (feed_url,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        etag, last_modified, entry_ids = row
+        return FeedState(
+            feed_url=feed_url,
+            etag=etag,
+            last_modified=last_modified,
+            entry_ids=json.loads(entry_ids),
+        )
+
+    def save(self, feed_state: FeedState):
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO feed_state (feed_url, etag, last_modified, entry_ids, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(feed_url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    entry_ids = excluded.entry_ids,
+                    updated_at = excluded.updated_at
+                """,
+                (
+                    feed_state.feed_url,
+                    feed_state.etag,
+                    feed_state.last_modified,
+                    json.dumps(feed_state.entry_ids),
+                    time.time(),
+                ),
+            )
+        logger.debug(f"Saved feed state for {feed_state.feed_url}")
+
+
+# Global store instance
+_feed_state_store: Optional[FeedStateStore] = None
+
+
+def get_feed_state_store() -> FeedStateStore:
+    global _feed_state_store
+    if _feed_state_store is None:
+        _feed_state_store = FeedStateStore()
+    return _feed_state_store
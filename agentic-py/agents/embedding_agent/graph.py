@@ -1,4 +1,5 @@
 import asyncio
+from typing import Literal
 from langgraph.graph import START, END, StateGraph
 from agents.embedding_agent.state import (
     EmbeddingAgentState,
@@ -8,6 +9,17 @@ from agents.embedding_agent.state import (
 )
 from agents.embedding_agent.nodes.extract_articles.node import extract_articles
 from agents.embedding_agent.nodes.embed_articles.node import embed_articles
+from agents.embedding_agent.ingestion_lock import get_ingestion_lock
+from agents.common.metrics import timed_node
+
+
+def route_extracted_articles(
+    state: EmbeddingAgentState,
+) -> Literal["embed_articles", "__end__"]:
+    # Unchanged feeds stop here, before anything is chunked or embedded
+    if not state.articles:
+        return END
+    return "embed_articles"
 
 
 def create_graph():
@@ -17,11 +29,11 @@ def create_graph():
         output_schema=OutputState,
     )
 
-    graph.add_node("extract_articles", extract_articles)
-    graph.add_node("embed_articles", embed_articles)
+    graph.add_node("extract_articles", timed_node("embedding", extract_articles))
+    graph.add_node("embed_articles", timed_node("embedding", embed_articles))
 
     graph.add_edge(START, "extract_articles")
-    graph.add_edge("extract_articles", "embed_articles")
+    graph.add_conditional_edges("extract_articles", route_extracted_articles)
     graph.add_edge("embed_articles", END)
 
     return graph
@@ -33,13 +45,15 @@ def compile_graph():
 
 
 def run_graph(state: InputState):
-    graph = compile_graph()
-    return graph.invoke(state)
+    # extract_articles is async, so the sync entrypoint drives its own loop
+    return asyncio.run(run_async_graph(state))
 
 
 async def run_async_graph(state: InputState):
     graph = compile_graph()
-    return await graph.ainvoke(state)
+    # Retention doesn't delete chunks while this run stores them
+    async with get_ingestion_lock().ingesting():
+        return await graph.ainvoke(state)
 
 
 async def test_graph():
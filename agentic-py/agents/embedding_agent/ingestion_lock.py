@@ -0,0 +1,73 @@
+"""Keeps retention from deleting chunks while ingestion is storing them.
+
+Ingestion runs hold the lock shared, any number at once. Retention takes
+it exclusively and skips its run while any ingestion is in progress;
+ingestion started during a retention run waits for it to finish. The
+scheduler, the embed API and the debug entrypoints all run ingestion and
+retention in one process, so an in-process lock covers them.
+"""
+
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class IngestionLock:
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._ingestions = 0
+        self._retaining = False
+
+    def _acquire_ingestion(self):
+        with self._condition:
+            if self._retaining:
+                logger.info("Waiting for the retention run to finish")
+            while self._retaining:
+                self._condition.wait()
+            self._ingestions += 1
+
+    def _release_ingestion(self):
+        with self._condition:
+            self._ingestions -= 1
+            self._condition.notify_all()
+
+    @asynccontextmanager
+    async def ingesting(self) -> AsyncIterator[None]:
+        with self._condition:
+            # Uncontended: take it without a worker thread
+            acquired = not self._retaining
+            if acquired:
+                self._ingestions += 1
+        if not acquired:
+            await asyncio.to_thread(self._acquire_ingestion)
+        try:
+            yield
+        finally:
+            self._release_ingestion()
+
+    @contextmanager
+    def retaining(self) -> Iterator[bool]:
+        """Yield whether the lock was taken; False while ingestion is running."""
+        with self._condition:
+            acquired = not self._retaining and self._ingestions == 0
+            if acquired:
+                self._retaining = True
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with self._condition:
+                    self._retaining = False
+                    self._condition.notify_all()
+
+
+# Global lock instance shared by ingestion and retention
+_ingestion_lock = IngestionLock()
+
+
+def get_ingestion_lock() -> IngestionLock:
+    return _ingestion_lock
@@ -0,0 +1,65 @@
+import logging
+import time
+from typing import Any, Dict
+
+from agents.common.lexical_index import get_lexical_index
+from agents.common.vector_store import get_documents_from_vector_store
+from agents.embedding_agent.article_ledger import get_article_ledger
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def run_lexical_backfill(batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Add chunks recorded in the ledger but missing from the lexical index.
+
+    Covers chunks ingested before hybrid retrieval was enabled; their text
+    is read back from the vector store.
+    """
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        return {"enabled": False}
+
+    start_time = time.perf_counter()
+    ledger = get_article_ledger()
+    scanned = added = unavailable = 0
+    last_chunk_id = ""
+    while True:
+        rows = ledger.get_chunks_after(last_chunk_id, batch_size)
+        if not rows:
+            break
+        last_chunk_id = rows[-1][0]
+        scanned += len(rows)
+
+        indexed = lexical_index.get_indexed_ids(chunk_id for chunk_id, _ in rows)
+        missing = {
+            chunk_id: category for chunk_id, category in rows if chunk_id not in indexed
+        }
+        if not missing:
+            continue
+        documents = get_documents_from_vector_store(missing)
+        unavailable += len(missing) - len(documents)
+        added += lexical_index.add_documents(documents)
+
+    if added:
+        # Retrieval results change, invalidate cached answers
+        ledger.bump_corpus_version()
+
+    result = {
+        "scanned_chunks": scanned,
+        "indexed_chunks": added,
+        "unavailable_chunks": unavailable,
+        "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+    }
+    logger.info(f"Lexical backfill completed: {result}")
+    return result
+
+
+# Run once after enabling hybrid retrieval on an existing corpus
+if __name__ == "__main__":
+    import dotenv
+
+    dotenv.load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    print(run_lexical_backfill())
@@ -0,0 +1,94 @@
+"""Compare TokenOffsetSplitter with the previous RecursiveCharacterTextSplitter setup.
+
+Run with: python -m agents.embedding_agent.nodes.embed_articles.benchmark
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Callable, List
+
+from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from agents.embedding_agent.nodes.embed_articles.config import EmbeddingConfig
+from agents.embedding_agent.nodes.embed_articles.splitter import TokenOffsetSplitter
+from agents.embedding_agent.nodes.embed_articles.utils import (
+    get_token_count,
+    get_tokenizer,
+)
+
+WORDS = (
+    "the government said on monday that officials had agreed a new plan to "
+    "reduce emissions while critics warned the cost of living crisis would "
+    "deepen as inflation rose again and markets fell sharply after the "
+    "central bank announced its latest decision on interest rates"
+).split()
+
+
+def make_article(n_paragraphs: int, rng: random.Random) -> str:
+    paragraphs = []
+    for _ in range(n_paragraphs):
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30))).capitalize()
+            + "."
+            for _ in range(rng.randint(2, 7))
+        ]
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def run(name: str, split: Callable[[List[Document]], List[Document]], documents):
+    timings = []
+    for document in documents:
+        start = time.perf_counter()
+        chunks = split([document])
+        timings.append(time.perf_counter() - start)
+
+    chunks = split(documents)
+    sizes = [get_token_count(chunk.page_content) for chunk in chunks]
+    print(
+        f"{name:<28} "
+        f"mean {statistics.mean(timings) * 1000:8.2f} ms/article  "
+        f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:8.2f} ms  "
+        f"chunks {len(chunks):5d}  "
+        f"tokens/chunk mean {statistics.mean(sizes):6.1f} max {max(sizes):5d}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20)
+    parser.add_argument("--paragraphs", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    documents = [
+        Document(page_content=make_article(args.paragraphs, rng), metadata={})
+        for _ in range(args.articles)
+    ]
+    total_tokens = sum(get_token_count(doc.page_content) for doc in documents)
+    print(
+        f"{args.articles} articles, {total_tokens / args.articles:.0f} tokens/article"
+    )
+
+    config = EmbeddingConfig()
+    recursive = RecursiveCharacterTextSplitter(
+        chunk_size=config.chunk_size,
+        chunk_overlap=config.chunk_overlap,
+        length_function=get_token_count,
+    )
+    token_offset = TokenOffsetSplitter(
+        chunk_size=config.chunk_size,
+        chunk_overlap=config.chunk_overlap,
+        encoding=get_tokenizer(),
+    )
+
+    run("RecursiveCharacterTextSplitter", recursive.split_documents, documents)
+    run("TokenOffsetSplitter", token_offset.split_documents, documents)
+
+
+if __name__ == "__main__":
+    main()
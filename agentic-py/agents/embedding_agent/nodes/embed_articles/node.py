@@ -1,16 +1,19 @@
 from agents.embedding_agent.state import EmbeddingAgentState
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+import asyncio
 import dotenv
 import logging
+from typing import List, Optional
+from langchain_core.documents import Document
 from agents.embedding_agent.nodes.extract_articles.node import extract_articles
-from agents.embedding_agent.nodes.embed_articles.utils import (
-    get_token_count,
-    convert_to_documents,
-    enhance_chunks,
-)
+from agents.embedding_agent.nodes.embed_articles.utils import chunk_articles
 from agents.embedding_agent.nodes.embed_articles.config import EmbeddingConfig
+from agents.embedding_agent.feed_state import get_feed_state_store
+from agents.embedding_agent.article_ledger import get_article_ledger
+from agents.common.executors import run_cpu_bound
+from agents.common.lexical_index import LexicalIndex, get_lexical_index
+from agents.common.metrics import CHUNKS
 from agents.common.vector_store import (
-    add_documents_to_vector_store,
+    aadd_documents_to_vector_store,
     _get_config_from_env,
 )
 
@@ -20,42 +23,108 @@ logger = logging.getLogger(__name__)
 dotenv.load_dotenv()
 
 
-def embed_articles(state: EmbeddingAgentState) -> EmbeddingAgentState:
+def _add_unindexed(lexical_index: LexicalIndex, chunks: List[Document]) -> int:
+    indexed = lexical_index.get_indexed_ids(chunk.metadata["chunk_id"] for chunk in chunks)
+    return lexical_index.add_documents(
+        [chunk for chunk in chunks if chunk.metadata["chunk_id"] not in indexed]
+    )
+
+
+async def index_lexically(chunks: List[Document]) -> Optional[int]:
+    """Add stored chunks missing from the BM25 index used by hybrid retrieval.
+
+    Returns the number of chunks added, or None if indexing failed.
+    """
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        return 0
+    try:
+        return await asyncio.to_thread(_add_unindexed, lexical_index, chunks)
+    except Exception as e:
+        logger.error(f"Failed to add chunks to the lexical index: {e}")
+        return None
+
+
+async def embed_articles(state: EmbeddingAgentState) -> EmbeddingAgentState:
     # Use default embedding config for chunking parameters
     embedding_config = EmbeddingConfig()
 
     logger.info(f"Processing {len(state.articles)} articles for embedding")
 
     try:
-        # Convert articles to Document objects
-        documents = convert_to_documents(state.articles, state.category)
-
-        # Split documents into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=embedding_config.chunk_size,
-            chunk_overlap=embedding_config.chunk_overlap,
-            length_function=get_token_count,
+        # Tokenizing and splitting is CPU-bound, one executor task per article
+        chunked_articles = await asyncio.gather(
+            *[
+                run_cpu_bound(
+                    chunk_articles, [article], state.category, embedding_config
+                )
+                for article in state.articles
+            ]
         )
-        chunks = text_splitter.split_documents(documents)
+        enhanced_chunks = [chunk for chunks in chunked_articles for chunk in chunks]
 
-        # Enhance chunks
-        enhanced_chunks = enhance_chunks(chunks, state.articles)
+        # Chunk IDs are content-addressed, known IDs are already stored as-is
+        ledger = get_article_ledger()
+        known_chunk_ids = ledger.get_known_chunk_ids(
+            chunk.metadata["chunk_id"] for chunk in enhanced_chunks
+        )
+        new_chunks = [
+            chunk
+            for chunk in enhanced_chunks
+            if chunk.metadata["chunk_id"] not in known_chunk_ids
+        ]
+        logger.info(
+            f"Skipping {len(enhanced_chunks) - len(new_chunks)} unchanged chunks"
+        )
+        CHUNKS.observe(len(enhanced_chunks), "chunked")
+        CHUNKS.observe(len(new_chunks), "embedded")
+        # Known chunks are in the vector store, the lexical index may still miss them
+        stored_chunks = [
+            chunk
+            for chunk in enhanced_chunks
+            if chunk.metadata["chunk_id"] in known_chunk_ids
+        ]
 
         # Add chunks to vector store with category support
 
         vector_store_config = _get_config_from_env()
         try:
-            result = add_documents_to_vector_store(
-                enhanced_chunks, config=vector_store_config
-            )
-            logger.info(
-                f"Successfully added {result['successfully_added']} documents to vector store"
-            )
-
-            if result["failed_documents"] > 0:
+            failed_documents = 0
+            vectors_added = 0
+            if new_chunks:
+                result = await aadd_documents_to_vector_store(
+                    new_chunks, config=vector_store_config
+                )
+                logger.info(
+                    f"Successfully added {result['successfully_added']} documents to vector store "
+                    f"({result['chunks_per_sec']} chunks/sec)"
+                )
+                failed_documents = result["failed_documents"]
+                vectors_added = result["successfully_added"]
+                added_ids = set(result["added_ids"])
+                stored_chunks.extend(
+                    chunk for chunk in new_chunks if chunk.metadata["chunk_id"] in added_ids
+                )
+
+            lexically_added = await index_lexically(stored_chunks)
+            if vectors_added or lexically_added:
+                # Invalidates answers cached against the previous corpus
+                ledger.bump_corpus_version()
+
+            if failed_documents > 0:
                 logger.warning(
-                    f"Failed to add {result['failed_documents']} documents to vector store"
+                    f"Failed to add {failed_documents} documents to vector store"
                 )
+            elif lexically_added is None:
+                # Not recorded, so the next run retries the articles; their
+                # vectors are upserted again from the embedding cache
+                logger.warning("Not recording articles missing from the lexical index")
+            else:
+                # Only remember the feed and its articles once everything is stored
+                ledger.record_chunks([chunk.metadata for chunk in enhanced_chunks])
+                ledger.record(state.seen_articles)
+                if state.feed_state is not None:
+                    get_feed_state_store().save(state.feed_state)
         except Exception as e:
             logger.error(f"Failed to add documents to vector store: {e}")
             raise RuntimeError(f"Vector store operation failed: {e}")
@@ -76,10 +145,10 @@ if __name__ == "__main__":
             rss_feed_url="https://www.bbc.com/news/rss.xml",
             num_articles=1,
         )
-        state = extract_articles(state)
+        state = asyncio.run(extract_articles(state))
 
         if state.articles:
-            state = embed_articles(state)
+            state = asyncio.run(embed_articles(state))
 
             print(f"Articles processed and embedded")
         else:
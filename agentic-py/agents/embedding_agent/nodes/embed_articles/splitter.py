@@ -0,0 +1,166 @@
+import re
+import logging
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import List, Optional, Tuple
+
+import tiktoken
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Boundaries are matched on the UTF-8 bytes, each match end is where a new
+# paragraph / sentence starts
+PARAGRAPH_BOUNDARY = re.compile(rb"\n[ \t\r]*\n")
+SENTENCE_BOUNDARY = re.compile(
+    rb"(?:[.!?]|\xe2\x80\xa6)(?:[\"')\]]|\xe2\x80[\x99\x9d])*\s+|\n"
+)
+WHITESPACE = (b" ", b"\n")
+
+
+class TokenOffsetSplitter:
+    """Token-aware splitter that tokenizes each text exactly once.
+
+    Split points are chosen on token indices, snapped to the last paragraph,
+    sentence or word boundary that fits in `chunk_size` tokens, and overlaps
+    start on a sentence (or word) boundary up to `chunk_overlap` tokens back
+    (scaled down for chunks shorter than `chunk_size`). Chunk lengths are
+    exact token counts, without re-encoding candidate substrings the way a
+    `length_function` does.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int,
+        chunk_overlap: int,
+        encoding: tiktoken.Encoding,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError(
+                f"chunk_overlap ({chunk_overlap}) must be smaller than chunk_size ({chunk_size})"
+            )
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.encoding = encoding
+
+    @staticmethod
+    def _boundaries(
+        pattern: re.Pattern, data: bytes, offsets: List[int]
+    ) -> List[int]:
+        # Index of the token containing each boundary byte, since tokens
+        # usually carry their leading space (" The")
+        return sorted(
+            {bisect_right(offsets, match.end()) - 1 for match in pattern.finditer(data)}
+        )
+
+    @staticmethod
+    def _last_before(boundaries: List[int], low: int, high: int) -> Optional[int]:
+        """Largest boundary in (low, high]."""
+        i = bisect_right(boundaries, high) - 1
+        if i >= 0 and boundaries[i] > low:
+            return boundaries[i]
+        return None
+
+    @staticmethod
+    def _first_after(boundaries: List[int], low: int, high: int) -> Optional[int]:
+        """Smallest boundary in [low, high)."""
+        i = bisect_left(boundaries, low)
+        if i < len(boundaries) and boundaries[i] < high:
+            return boundaries[i]
+        return None
+
+    @staticmethod
+    def _last_word_before(
+        data: bytes, offsets: List[int], low: int, high: int
+    ) -> Optional[int]:
+        position = max(data.rfind(ws, offsets[low + 1], offsets[high]) for ws in WHITESPACE)
+        if position < 0:
+            return None
+        token = bisect_right(offsets, position) - 1
+        return token if token > low else None
+
+    @staticmethod
+    def _first_word_after(
+        data: bytes, offsets: List[int], low: int, high: int
+    ) -> Optional[int]:
+        positions = [data.find(ws, offsets[low], offsets[high]) for ws in WHITESPACE]
+        positions = [position for position in positions if position >= 0]
+        if not positions:
+            return None
+        token = bisect_right(offsets, min(positions)) - 1
+        return token if low <= token < high else None
+
+    def _split_tokens(self, text: str, tokens: List[int]) -> List[Tuple[str, int]]:
+        n_tokens = len(tokens)
+        if n_tokens == 0:
+            return []
+
+        # Byte offset of every token boundary; offsets[n_tokens] is the end of text
+        data = text.encode("utf-8")
+        offsets = [0, *accumulate(map(len, self.encoding.decode_tokens_bytes(tokens)))]
+        paragraphs = self._boundaries(PARAGRAPH_BOUNDARY, data, offsets)
+        sentences = self._boundaries(SENTENCE_BOUNDARY, data, offsets)
+
+        chunks = []
+        start = 0
+        while start < n_tokens:
+            limit = start + self.chunk_size
+            if limit >= n_tokens:
+                end = n_tokens
+            else:
+                # Prefer the coarsest boundary that keeps the chunk at least half full
+                half_full = start + self.chunk_size // 2
+                end = (
+                    self._last_before(paragraphs, half_full, limit)
+                    or self._last_before(sentences, half_full, limit)
+                    or self._last_word_before(data, offsets, start, limit)
+                    or limit
+                )
+
+            # Token edges can split a multi-byte character, drop the fragment
+            content = (
+                data[offsets[start] : offsets[end]]
+                .decode("utf-8", errors="ignore")
+                .strip()
+            )
+            if content:
+                chunks.append((content, end - start))
+
+            if end == n_tokens:
+                break
+
+            # Overlap scales with the chunk actually emitted, so short chunks
+            # cut at a paragraph don't make the window crawl forward
+            overlap = (end - start) * self.chunk_overlap // self.chunk_size
+            overlap_start = max(end - overlap, start + 1)
+
+            # Start the overlap on a sentence (or word) boundary
+            start = (
+                self._first_after(sentences, overlap_start, end)
+                or self._first_word_after(data, offsets, overlap_start, end)
+                or overlap_start
+            )
+
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        tokens = self.encoding.encode_ordinary(text)
+        return [content for content, _ in self._split_tokens(text, tokens)]
+
+    def split_documents(self, documents: List[Document]) -> List[Document]:
+        texts = [doc.page_content for doc in documents]
+        # One encode call for the whole batch
+        batch_tokens = self.encoding.encode_ordinary_batch(texts)
+
+        chunks = []
+        for doc, text, tokens in zip(documents, texts, batch_tokens):
+            for content, token_count in self._split_tokens(text, tokens):
+                chunks.append(
+                    Document(
+                        page_content=content,
+                        metadata={**doc.metadata, "token_count": token_count},
+                    )
+                )
+
+        logger.debug(f"Split {len(documents)} documents into {len(chunks)} chunks")
+        return chunks
@@ -0,0 +1,107 @@
+import pytest
+import tiktoken
+from langchain_core.documents import Document
+
+from agents.embedding_agent.nodes.embed_articles.splitter import TokenOffsetSplitter
+
+
+@pytest.fixture(scope="module")
+def encoding() -> tiktoken.Encoding:
+    # Byte-level BPE with a few merges, so tests don't download cl100k_base
+    ranks = {bytes([i]): i for i in range(256)}
+    for merge in (b"th", b" t", b" th", b"he", b" the", b"in", b"er", b"an", b" a"):
+        ranks[merge] = len(ranks)
+    return tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r" ?\w+| ?[^\w\s]+|\s+",
+        mergeable_ranks=ranks,
+        special_tokens={},
+    )
+
+
+PROSE = " ".join(
+    f"Sentence {i} is about the weather in another town." for i in range(60)
+)
+PARAGRAPHS = "\n\n".join(
+    " ".join(f"Paragraph {p} has the sentence {s}." for s in range(4)) for p in range(20)
+)
+
+
+def split(encoding, text, chunk_size=120, chunk_overlap=20):
+    splitter = TokenOffsetSplitter(chunk_size, chunk_overlap, encoding)
+    return splitter.split_documents([Document(page_content=text, metadata={"id": 1})])
+
+
+@pytest.mark.parametrize("text", [PROSE, PARAGRAPHS])
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(40, 0), (120, 20), (300, 100)])
+def test_chunks_fit_chunk_size(encoding, text, chunk_size, chunk_overlap):
+    chunks = split(encoding, text, chunk_size, chunk_overlap)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert 0 < chunk.metadata["token_count"] <= chunk_size
+        assert len(encoding.encode_ordinary(chunk.page_content)) <= chunk_size
+        assert chunk.metadata["id"] == 1
+    # Boundaries are only taken when the chunk stays at least half full
+    for chunk in chunks[:-1]:
+        assert chunk.metadata["token_count"] >= chunk_size // 2
+
+
+def test_chunks_cover_text_in_order(encoding):
+    chunks = split(encoding, PROSE, chunk_size=60, chunk_overlap=15)
+    assert PROSE.startswith(chunks[0].page_content)
+    start, end = 0, len(chunks[0].page_content)
+    for chunk in chunks[1:]:
+        found = PROSE.find(chunk.page_content, start + 1)
+        # Each chunk moves forward and starts inside the previous one
+        assert start < found < end
+        start, end = found, found + len(chunk.page_content)
+    assert end == len(PROSE)
+
+
+def test_overlap_starts_on_sentence(encoding):
+    # The overlap window spans more than one sentence
+    chunks = split(encoding, PROSE, chunk_size=200, chunk_overlap=100)
+    for chunk in chunks[1:]:
+        assert chunk.page_content.startswith("Sentence")
+
+
+def test_splits_on_paragraphs(encoding):
+    chunks = split(encoding, PARAGRAPHS, chunk_size=120, chunk_overlap=0)
+    for chunk in chunks:
+        assert chunk.page_content.startswith("Paragraph")
+        assert chunk.page_content.endswith(".")
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "x" * 5000,  # no boundaries at all
+        "\n\n" * 500,  # only whitespace
+        "é" * 3000,  # tokens split multi-byte characters
+        "word " * 2000,
+    ],
+)
+def test_terminates_without_boundaries(encoding, text):
+    tokens = encoding.encode_ordinary(text)
+    chunks = TokenOffsetSplitter(50, 49, encoding).split_text(text)
+    assert len(chunks) <= len(tokens)
+    for chunk in chunks:
+        assert chunk and chunk == chunk.strip()
+        assert len(encoding.encode_ordinary(chunk)) <= 50
+
+
+def test_multibyte_fragments_are_dropped(encoding):
+    for chunk in TokenOffsetSplitter(7, 2, encoding).split_text("é" * 100):
+        assert set(chunk) == {"é"}
+
+
+def test_short_and_empty_text(encoding):
+    splitter = TokenOffsetSplitter(100, 10, encoding)
+    assert splitter.split_text("") == []
+    assert splitter.split_text("   ") == []
+    assert splitter.split_text("A short text.") == ["A short text."]
+
+
+def test_overlap_must_be_smaller_than_chunk_size(encoding):
+    with pytest.raises(ValueError):
+        TokenOffsetSplitter(100, 100, encoding)
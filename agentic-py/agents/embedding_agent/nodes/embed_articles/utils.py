@@ -1,9 +1,14 @@
 from typing import Optional
 import tiktoken
 import logging
-import uuid
+import hashlib
 from agents.embedding_agent.state import Article, Category
+from agents.common.url_utils import canonicalize_url
+from agents.common.time_utils import to_epoch_seconds
+from agents.embedding_agent.nodes.embed_articles.config import EmbeddingConfig
+from agents.embedding_agent.nodes.embed_articles.splitter import TokenOffsetSplitter
 from langchain_core.documents import Document
+from langchain_text_splitters import RecursiveCharacterTextSplitter
 from typing import List
 from datetime import datetime
 
@@ -43,6 +48,19 @@ def get_token_count(text: str) -> int:
         return fallback_count
 
 
+def _short_hash(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+def generate_article_id(url: str) -> str:
+    return f"art_{_short_hash(canonicalize_url(url))}"
+
+
+def generate_chunk_id(article_id: str, chunk_index: int, content: str) -> str:
+    # Same article, position and text always map to the same vector ID
+    return f"cnk_{_short_hash(f'{article_id}:{chunk_index}:{_short_hash(content)}')}"
+
+
 def convert_to_documents(articles: List[Article], category: Category) -> List[Document]:
     documents = []
     for i, article in enumerate(articles):
@@ -51,14 +69,19 @@ def convert_to_documents(articles: List[Article], category: Category) -> List[Do
                 logger.warning(f"Skipping article {i}: missing content or title")
                 continue
 
-            # Generate unique article ID
-            article_id = f"art_{uuid.uuid4().hex[:8]}"
+            # Derive article ID from the canonical URL
+            article_id = generate_article_id(article.url)
 
             document = Document(
                 page_content=article.content,
                 metadata={
                     **sanitize_metadata(
-                        {**article.metadata, "published_date": article.published_date}
+                        {
+                            **article.metadata,
+                            "published_date": article.published_date,
+                            # Numeric copy for range filters
+                            "published_ts": to_epoch_seconds(article.published_date),
+                        }
                     ),
                     "title": article.title,
                     "description": article.description,
@@ -89,26 +112,37 @@ def sanitize_metadata(metadata: dict) -> dict:
     return clean
 
 
+def _with_chunk_id(chunk: Document, content: str, chunk_index: int) -> Document:
+    metadata = chunk.metadata.copy()
+    metadata["chunk_index"] = chunk_index
+    metadata["chunk_id"] = generate_chunk_id(
+        metadata.get("article_id", ""), chunk_index, content
+    )
+    return Document(id=metadata["chunk_id"], page_content=content, metadata=metadata)
+
+
 def enhance_chunks(chunks: List[Document], articles: List[Article]) -> List[Document]:
     url_to_article = {article.url: article for article in articles}
 
     enhanced_chunks = []
+    # Chunks of an article come out of the splitter in order
+    chunk_counts = {}
+    header_token_counts = {}
 
     for chunk in chunks:
+        article_id = chunk.metadata.get("article_id", "")
+        chunk_index = chunk_counts.get(article_id, 0)
+        chunk_counts[article_id] = chunk_index + 1
+
         try:
             chunk_url = chunk.metadata.get("url")
 
             if not chunk_url:
                 logger.warning(f"Chunk missing URL in metadata, skipping enhancement")
                 # Add chunk ID even for skipped chunks
-                chunk_id = f"cnk_{uuid.uuid4().hex[:8]}"
-                skip_metadata = chunk.metadata.copy()
-                skip_metadata["chunk_id"] = chunk_id
-
-                skip_chunk = Document(
-                    page_content=chunk.page_content, metadata=skip_metadata
+                enhanced_chunks.append(
+                    _with_chunk_id(chunk, chunk.page_content, chunk_index)
                 )
-                enhanced_chunks.append(skip_chunk)
                 continue
 
             # Find the corresponding article
@@ -119,14 +153,9 @@ def enhance_chunks(chunks: List[Document], articles: List[Article]) -> List[Docu
                     f"No article found for URL: {chunk_url}, skipping enhancement"
                 )
                 # Add chunk ID even for skipped chunks
-                chunk_id = f"cnk_{uuid.uuid4().hex[:8]}"
-                skip_metadata = chunk.metadata.copy()
-                skip_metadata["chunk_id"] = chunk_id
-
-                skip_chunk = Document(
-                    page_content=chunk.page_content, metadata=skip_metadata
+                enhanced_chunks.append(
+                    _with_chunk_id(chunk, chunk.page_content, chunk_index)
                 )
-                enhanced_chunks.append(skip_chunk)
                 continue
 
             # Create enhanced page content
@@ -143,36 +172,56 @@ def enhance_chunks(chunks: List[Document], articles: List[Article]) -> List[Docu
             # Add separator and original content
             if enhanced_content_parts:
                 enhanced_content_parts.append("__Content__:")
-                enhanced_content = (
-                    "\n\n".join(enhanced_content_parts) + "\n\n" + chunk.page_content
-                )
+                header = "\n\n".join(enhanced_content_parts) + "\n\n"
+                enhanced_content = header + chunk.page_content
             else:
+                header = ""
                 enhanced_content = chunk.page_content
 
-            # Generate unique chunk ID
-            chunk_id = f"cnk_{uuid.uuid4().hex[:8]}"
-
-            # Create enhanced chunk with chunk ID in metadata
-            enhanced_metadata = chunk.metadata.copy()
-            enhanced_metadata["chunk_id"] = chunk_id
-
-            enhanced_chunk = Document(
-                page_content=enhanced_content, metadata=enhanced_metadata
-            )
-
+            # Create enhanced chunk with content-addressed chunk ID in metadata
+            enhanced_chunk = _with_chunk_id(chunk, enhanced_content, chunk_index)
+            if header and "token_count" in enhanced_chunk.metadata:
+                if chunk_url not in header_token_counts:
+                    header_token_counts[chunk_url] = get_token_count(header)
+                enhanced_chunk.metadata["token_count"] += header_token_counts[chunk_url]
             enhanced_chunks.append(enhanced_chunk)
 
         except Exception as e:
             logger.error(f"Error enhancing chunk: {e}")
             # If enhancement fails, keep the original chunk but add chunk ID
-            chunk_id = f"cnk_{uuid.uuid4().hex[:8]}"
-            fallback_metadata = chunk.metadata.copy()
-            fallback_metadata["chunk_id"] = chunk_id
-
-            fallback_chunk = Document(
-                page_content=chunk.page_content, metadata=fallback_metadata
+            enhanced_chunks.append(
+                _with_chunk_id(chunk, chunk.page_content, chunk_index)
             )
-            enhanced_chunks.append(fallback_chunk)
 
     logger.info(f"Enhanced {len(enhanced_chunks)} chunks with article metadata")
     return enhanced_chunks
+
+
+def chunk_articles(
+    articles: List[Article], category: Category, embedding_config: EmbeddingConfig
+) -> List[Document]:
+    """Convert, split and enhance articles into chunks ready for the vector store.
+
+    Module level and free of shared state so it can run in a worker process.
+    """
+    # Convert articles to Document objects
+    documents = convert_to_documents(articles, category)
+
+    # Split documents into chunks, tokenizing each article once
+    try:
+        text_splitter = TokenOffsetSplitter(
+            chunk_size=embedding_config.chunk_size,
+            chunk_overlap=embedding_config.chunk_overlap,
+            encoding=get_tokenizer(),
+        )
+    except RuntimeError:
+        logger.warning("Tokenizer unavailable, falling back to approximate splitting")
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=embedding_config.chunk_size,
+            chunk_overlap=embedding_config.chunk_overlap,
+            length_function=get_token_count,
+        )
+    chunks = text_splitter.split_documents(documents)
+
+    # Enhance chunks
+    return enhance_chunks(chunks, articles)
@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class FetchConfig:
+    max_concurrency: int = 16  # global cap on in-flight page downloads
+    max_per_domain: int = 4  # cap per source domain, to stay polite
+    request_timeout: float = 20.0
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+    user_agent: str = (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    )
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from agents.embedding_agent.nodes.extract_articles.config import FetchConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FetchResult:
+    url: str
+    final_url: str
+    status: int
+    body: bytes
+    encoding: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        return self.status == 304
+
+
+class ArticleFetcher:
+    """Async page downloader with a shared keep-alive pool and bounded concurrency.
+
+    One fetcher lives per event loop; every feed processed on that loop shares
+    its connection pool, its global limit and its per-domain limits.
+    """
+
+    def __init__(self, config: FetchConfig):
+        self.config = config
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._global_limit = asyncio.Semaphore(config.max_concurrency)
+        self._domain_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.config.max_concurrency,
+                limit_per_host=self.config.max_per_domain,
+                keepalive_timeout=self.config.keepalive_timeout,
+                ttl_dns_cache=self.config.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.config.request_timeout),
+                headers={"User-Agent": self.config.user_agent},
+            )
+            logger.debug("Article fetcher session initialized")
+        return self._session
+
+    def _get_domain_limit(self, url: str) -> asyncio.Semaphore:
+        domain = (urlsplit(url).hostname or "").lower()
+        if domain not in self._domain_limits:
+            self._domain_limits[domain] = asyncio.Semaphore(
+                self.config.max_per_domain
+            )
+        return self._domain_limits[domain]
+
+    async def fetch(
+        self, url: str, headers: Optional[Dict[str, str]] = None
+    ) -> Optional[FetchResult]:
+        """Download a URL; a 304 is returned as an empty result for conditional requests."""
+        async with self._global_limit, self._get_domain_limit(url):
+            try:
+                session = self._get_session()
+                async with session.get(
+                    url, headers=headers, allow_redirects=True
+                ) as response:
+                    if response.status not in (200, 304):
+                        logger.warning(f"Fetching {url} returned {response.status}")
+                        return None
+
+                    body = await response.read() if response.status == 200 else b""
+                    return FetchResult(
+                        url=url,
+                        final_url=str(response.url),
+                        status=response.status,
+                        body=body,
+                        encoding=response.charset,
+                        etag=response.headers.get("ETag"),
+                        last_modified=response.headers.get("Last-Modified"),
+                    )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"Failed to fetch {url}: {e!r}")
+                return None
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+# One fetcher per event loop, since sessions and semaphores are loop-bound
+_fetchers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ArticleFetcher]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_fetcher(config: Optional[FetchConfig] = None) -> ArticleFetcher:
+    loop = asyncio.get_running_loop()
+    fetcher = _fetchers.get(loop)
+    if fetcher is None:
+        fetcher = ArticleFetcher(config or FetchConfig())
+        _fetchers[loop] = fetcher
+    return fetcher
+
+
+async def close_fetcher():
+    fetcher = _fetchers.pop(asyncio.get_running_loop(), None)
+    if fetcher is not None:
+        await fetcher.close()
+        logger.info("Article fetcher session closed")
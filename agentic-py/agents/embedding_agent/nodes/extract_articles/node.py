@@ -1,66 +1,152 @@
-from agents.embedding_agent.state import EmbeddingAgentState, Article
-from newsplease import NewsPlease
+from agents.embedding_agent.state import (
+    EmbeddingAgentState,
+    Article,
+    FeedState,
+    SeenArticle,
+)
+from agents.embedding_agent.feed_state import get_feed_state_store
+from agents.embedding_agent.article_ledger import get_article_ledger
+from agents.common.url_utils import canonicalize_url
+from agents.common.executors import run_cpu_bound
+from agents.embedding_agent.nodes.extract_articles.fetcher import (
+    FetchResult,
+    get_fetcher,
+)
+from agents.embedding_agent.nodes.extract_articles.utils import (
+    extract_article,
+    get_article_modified_ts,
+    get_conditional_headers,
+    get_entry_id,
+    get_entry_modified_ts,
+    is_up_to_date,
+)
+import asyncio
 import feedparser
-from typing import Optional, List, TypedDict
-from datetime import datetime
-
-
-class NewsPleaseArticle(TypedDict):
-    authors: Optional[List[str]]
-    date_download: Optional[datetime]
-    date_modify: Optional[datetime]
-    date_publish: Optional[datetime]
-    description: Optional[str]
-    filename: Optional[str]
-    image_url: Optional[str]
-    language: Optional[str]
-    localpath: Optional[str]
-    source_domain: Optional[str]
-    maintext: Optional[str]
-    title: Optional[str]
-    title_page: Optional[str]
-    title_rss: Optional[str]
-    url: Optional[str]
-
-
-def extract_articles(state: EmbeddingAgentState):
+from typing import Optional
+
+
+async def _fetch_and_extract(url: str) -> Optional[Article]:
+    result: Optional[FetchResult] = await get_fetcher().fetch(url)
+    if result is None:
+        return None
+
+    # Extraction is CPU-bound, keep it off the event loop
+    return await run_cpu_bound(
+        extract_article, result.body, result.final_url, result.encoding
+    )
+
+
+async def extract_articles(state: EmbeddingAgentState):
     print("Extracting articles...")
     rss_feed_url = state.rss_feed_url
     num_articles = state.num_articles
+    state.articles = []
 
-    feed = feedparser.parse(rss_feed_url)
+    feed_state_store = get_feed_state_store()
+    previous_feed_state = feed_state_store.get(rss_feed_url)
 
-    urls = []
-    for entry in feed.entries:
-        urls.append(entry.link)
+    response = await get_fetcher().fetch(
+        rss_feed_url, headers=get_conditional_headers(previous_feed_state)
+    )
+    if response is None:
+        print(f"Failed to fetch feed {rss_feed_url}")
+        return state
+
+    if response.not_modified:
+        print(f"Feed not modified since last run: {rss_feed_url}")
+        return state
+
+    feed = await asyncio.to_thread(
+        feedparser.parse,
+        response.body,
+        response_headers={"content-location": response.final_url},
+    )
+
+    entries = [entry for entry in feed.entries if entry.get("link")][:num_articles]
+    feed_state = FeedState(
+        feed_url=rss_feed_url,
+        etag=response.etag,
+        last_modified=response.last_modified,
+        entry_ids=[get_entry_id(entry) for entry in entries],
+    )
+
+    if (
+        previous_feed_state is not None
+        and previous_feed_state.entry_ids == feed_state.entry_ids
+    ):
+        # Nothing new to embed, only refresh the validators
+        print(f"Feed entries unchanged since last run: {rss_feed_url}")
+        feed_state_store.save(feed_state)
+        return state
+
+    # Skip entries whose article is already embedded and unchanged since
+    ledger = get_article_ledger()
+    recorded = ledger.get_modified(entry.link for entry in entries)
+    new_entries = [
+        entry
+        for entry in entries
+        if not is_up_to_date(recorded.get(entry.link), get_entry_modified_ts(entry))
+    ]
+    print(f"Skipping {len(entries) - len(new_entries)} already ingested articles")
+
+    if not new_entries:
+        feed_state_store.save(feed_state)
+        return state
+
+    # Download every page concurrently; limits are enforced by the shared fetcher
+    results = await asyncio.gather(
+        *[_fetch_and_extract(entry.link) for entry in new_entries]
+    )
+
+    extracted = [
+        (entry, article)
+        for entry, article in zip(new_entries, results)
+        if article is not None
+    ]
+    # Feed links often redirect or carry tracking params, check the canonical URL too
+    recorded = ledger.get_modified(article.url for _, article in extracted)
 
     articles = []
-    for url in urls[:num_articles]:
-        article: NewsPleaseArticle = NewsPlease.from_url(url)
-        articles.append(
-            Article(
-                title=article.title,
-                description=article.description,
-                content=article.maintext,
-                published_date=article.date_publish,
-                url=article.url,
-                source=article.source_domain,
-                metadata={
-                    "authors": article.authors,
-                    "date_download": article.date_download,
-                    "date_modify": article.date_modify,
-                    "filename": article.filename,
-                    "image_url": article.image_url,
-                    "language": article.language,
-                    "localpath": article.localpath,
-                    "title_page": article.title_page,
-                    "title_rss": article.title_rss,
-                },
-            )
+    seen_articles = []
+    aliases = []
+    canonical_urls = set()
+    for entry, article in extracted:
+        modified_ts = max(
+            filter(
+                None, [get_entry_modified_ts(entry), get_article_modified_ts(article)]
+            ),
+            default=None,
         )
+        seen = SeenArticle(urls=[entry.link, article.url], modified_ts=modified_ts)
+
+        if is_up_to_date(recorded.get(article.url), modified_ts):
+            aliases.append(seen)
+            continue
+
+        canonical_url = canonicalize_url(article.url)
+        if canonical_url in canonical_urls:
+            # Same story as an earlier entry of this run, which isn't stored yet,
+            # so its links are recorded along with it by embed_articles
+            seen_articles.append(seen)
+            continue
+
+        canonical_urls.add(canonical_url)
+        articles.append(article)
+        seen_articles.append(seen)
+
+    if aliases:
+        # Already stored and unchanged, remember the feed links right away
+        ledger.record(aliases)
+
+    if not articles and len(extracted) == len(new_entries):
+        feed_state_store.save(feed_state)
+        return state
 
     print(f"Extracted {len(articles)} articles")
     state.articles = articles
+    # Persisted by embed_articles once the articles are safely in the vector store
+    state.feed_state = feed_state
+    state.seen_articles = seen_articles
     return state
 
 
@@ -68,4 +154,4 @@ if __name__ == "__main__":
     state = EmbeddingAgentState(
         rss_feed_url="https://www.bbc.com/news/rss.xml", num_articles=50
     )
-    state = extract_articles(state)
+    state = asyncio.run(extract_articles(state))
@@ -0,0 +1,106 @@
+import calendar
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, TypedDict
+
+from newsplease import NewsPlease
+
+from agents.embedding_agent.state import Article, FeedState
+
+logger = logging.getLogger(__name__)
+
+
+class NewsPleaseArticle(TypedDict):
+    authors: Optional[List[str]]
+    date_download: Optional[datetime]
+    date_modify: Optional[datetime]
+    date_publish: Optional[datetime]
+    description: Optional[str]
+    filename: Optional[str]
+    image_url: Optional[str]
+    language: Optional[str]
+    localpath: Optional[str]
+    source_domain: Optional[str]
+    maintext: Optional[str]
+    title: Optional[str]
+    title_page: Optional[str]
+    title_rss: Optional[str]
+    url: Optional[str]
+
+
+def get_conditional_headers(feed_state: Optional[FeedState]) -> Dict[str, str]:
+    headers = {}
+    if feed_state is None:
+        return headers
+    if feed_state.etag:
+        headers["If-None-Match"] = feed_state.etag
+    if feed_state.last_modified:
+        headers["If-Modified-Since"] = feed_state.last_modified
+    return headers
+
+
+def get_entry_id(entry) -> Optional[str]:
+    return entry.get("id") or entry.get("link")
+
+
+def get_entry_modified_ts(entry) -> Optional[float]:
+    parsed = entry.get("updated_parsed") or entry.get("published_parsed")
+    return float(calendar.timegm(parsed)) if parsed else None
+
+
+def get_article_modified_ts(article: Article) -> Optional[float]:
+    date_modify = article.metadata.get("date_modify") or article.published_date
+    return date_modify.timestamp() if isinstance(date_modify, datetime) else None
+
+
+def is_up_to_date(recorded_ts: Optional[float], modified_ts: Optional[float]) -> bool:
+    """Whether a ledger entry still covers an article with the given modification time."""
+    if recorded_ts is None:
+        return False
+    return modified_ts is None or modified_ts <= recorded_ts
+
+
+def decode_html(body: bytes, encoding: Optional[str] = None) -> str:
+    try:
+        return body.decode(encoding or "utf-8", errors="replace")
+    except LookupError:
+        # Unknown charset advertised by the server
+        return body.decode("utf-8", errors="replace")
+
+
+def extract_article(
+    body: bytes, url: str, encoding: Optional[str] = None
+) -> Optional[Article]:
+    """Run news-please extraction over an already downloaded page."""
+    try:
+        article: NewsPleaseArticle = NewsPlease.from_html(
+            decode_html(body, encoding),
+            url=url,
+            download_date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        if not article:
+            logger.warning(f"No article extracted from {url}")
+            return None
+
+        return Article(
+            title=article.title,
+            description=article.description,
+            content=article.maintext,
+            published_date=article.date_publish,
+            url=article.url,
+            source=article.source_domain,
+            metadata={
+                "authors": article.authors,
+                "date_download": article.date_download,
+                "date_modify": article.date_modify,
+                "filename": article.filename,
+                "image_url": article.image_url,
+                "language": article.language,
+                "localpath": article.localpath,
+                "title_page": article.title_page,
+                "title_rss": article.title_rss,
+            },
+        )
+    except Exception as e:
+        logger.warning(f"Failed to extract article from {url}: {e}")
+        return None
@@ -0,0 +1,133 @@
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agents.common.lexical_index import get_lexical_index
+from agents.common.vector_store import delete_from_vector_store
+from agents.embedding_agent.article_ledger import get_article_ledger
+from agents.embedding_agent.ingestion_lock import get_ingestion_lock
+
+logger = logging.getLogger(__name__)
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+@dataclass
+class RetentionConfig:
+    default_ttl_days: float = 0  # 0 keeps chunks forever
+    category_ttl_days: Dict[str, float] = field(default_factory=dict)
+    compact_superseded: bool = True
+    dry_run: bool = False  # report what would be deleted without deleting it
+
+
+def _parse_ttls(value: str) -> Dict[str, float]:
+    """Parse "sports=7,news=14" into category -> TTL in days."""
+    ttls = {}
+    for entry in value.split(","):
+        if not entry.strip():
+            continue
+        category, _, days = entry.partition("=")
+        ttls[category.strip()] = float(days)
+    return ttls
+
+
+def _get_config_from_env() -> RetentionConfig:
+    config = RetentionConfig()
+    config.default_ttl_days = float(
+        os.getenv("RETENTION_DEFAULT_TTL_DAYS", config.default_ttl_days)
+    )
+    config.category_ttl_days = _parse_ttls(os.getenv("RETENTION_TTL_DAYS", ""))
+    config.compact_superseded = os.getenv(
+        "RETENTION_COMPACT_SUPERSEDED", "true"
+    ).lower() in ("1", "true", "yes")
+    config.dry_run = os.getenv("RETENTION_DRY_RUN", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    return config
+
+
+def _cutoff(ttl_days: float, now: float) -> Optional[float]:
+    return now - ttl_days * SECONDS_PER_DAY if ttl_days > 0 else None
+
+
+def _delete_from_lexical_index(chunk_ids: List[str]) -> int:
+    lexical_index = get_lexical_index()
+    if lexical_index is None or not chunk_ids:
+        return 0
+    deleted = lexical_index.delete(chunk_ids)
+    if lexical_index.dead_fraction() > lexical_index.config.compact_dead_fraction:
+        lexical_index.compact()
+    return deleted
+
+
+def run_retention(config: Optional[RetentionConfig] = None) -> Dict[str, Any]:
+    """Delete expired and superseded chunks from the vector store and the ledger.
+
+    Skipped while ingestion is running, the next scheduled run catches up.
+    """
+    if config is None:
+        config = _get_config_from_env()
+
+    with get_ingestion_lock().retaining() as acquired:
+        if not acquired:
+            logger.info("Ingestion is running, skipping retention")
+            return {"skipped": "ingestion running"}
+        return _run_retention(config)
+
+
+def _run_retention(config: RetentionConfig) -> Dict[str, Any]:
+    start_time = time.perf_counter()
+    now = time.time()
+    ledger = get_article_ledger()
+
+    expired = ledger.get_expired_chunks(
+        {
+            category: _cutoff(ttl_days, now)
+            for category, ttl_days in config.category_ttl_days.items()
+        },
+        _cutoff(config.default_ttl_days, now),
+    )
+    superseded = ledger.get_superseded_chunks() if config.compact_superseded else []
+
+    # A superseded chunk can be expired as well
+    chunks = dict(expired)
+    chunks.update(superseded)
+    logger.info(
+        f"Retention found {len(expired)} expired and {len(superseded)} superseded chunks"
+    )
+
+    deleted = {"deleted_ids": [], "failed_ids": [], "shards": {}}
+    lexical_deleted = 0
+    if chunks and not config.dry_run:
+        deleted = delete_from_vector_store(chunks)
+        # Failed deletes stay in the ledger and are retried next run
+        ledger.delete_chunks(deleted["deleted_ids"])
+        if deleted["deleted_ids"]:
+            ledger.bump_corpus_version()
+        lexical_deleted = _delete_from_lexical_index(deleted["deleted_ids"])
+
+    result = {
+        "expired_chunks": len(expired),
+        "superseded_chunks": len(superseded),
+        "reclaimed_vectors": len(deleted["deleted_ids"]),
+        "failed_vectors": len(deleted["failed_ids"]),
+        "lexical_deleted": lexical_deleted,
+        "shards": deleted["shards"],
+        "dry_run": config.dry_run,
+        "elapsed_seconds": round(time.perf_counter() - start_time, 3),
+    }
+    logger.info(f"Retention completed: {result}")
+    return result
+
+
+# Debug and test the job
+if __name__ == "__main__":
+    import dotenv
+
+    dotenv.load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    print(run_retention())
@@ -56,5 +56,33 @@ class OutputState(BaseModel):
     articles: List[Article] = Field(description="The articles to embed", default=[])
 
 
+class FeedState(BaseModel):
+    feed_url: str = Field(description="The URL of the RSS feed")
+    etag: Optional[str] = Field(description="The ETag of the last response", default=None)
+    last_modified: Optional[str] = Field(
+        description="The Last-Modified header of the last response", default=None
+    )
+    entry_ids: List[str] = Field(
+        description="The IDs of the feed entries seen on the last run", default=[]
+    )
+
+
+class SeenArticle(BaseModel):
+    urls: List[str] = Field(
+        description="The feed link and canonical URL the article is known by"
+    )
+    modified_ts: Optional[float] = Field(
+        description="The last modification time of the article (epoch seconds)",
+        default=None,
+    )
+
+
 class EmbeddingAgentState(InputState, OutputState):
-    pass
+    feed_state: Optional[FeedState] = Field(
+        description="Feed state to persist once the articles are embedded",
+        default=None,
+    )
+    seen_articles: List[SeenArticle] = Field(
+        description="Ledger entries to persist once the articles are embedded",
+        default=[],
+    )
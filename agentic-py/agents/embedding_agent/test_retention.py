@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.embedding_agent import retention
+from agents.embedding_agent.article_ledger import ArticleLedger
+from agents.embedding_agent.ingestion_lock import IngestionLock
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("AGENT_DATA_DIR", str(tmp_path))
+
+
+def chunk(chunk_id: str, category: str, published_ts: float) -> dict:
+    return {
+        "chunk_id": chunk_id,
+        "article_id": "art",
+        "category": category,
+        "published_ts": published_ts,
+    }
+
+
+def test_recategorised_chunk_uses_new_category_ttl():
+    ledger = ArticleLedger()
+    old = time.time() - 10 * retention.SECONDS_PER_DAY
+    ledger.record_chunks([chunk("c1", "news", old)])
+    ledger.record_chunks([chunk("c1", "sports", old)])
+    # Only sports chunks expire, so the row must carry the new category
+    expired = ledger.get_expired_chunks(
+        {"sports": time.time() - 7 * retention.SECONDS_PER_DAY}, None
+    )
+    assert expired == [("c1", "sports")]
+
+
+def test_retention_is_off_until_configured(monkeypatch):
+    for name in ("RETENTION_DEFAULT_TTL_DAYS", "RETENTION_TTL_DAYS", "RETENTION_DRY_RUN"):
+        monkeypatch.delenv(name, raising=False)
+    config = retention._get_config_from_env()
+    assert config.default_ttl_days == 0
+    assert config.category_ttl_days == {}
+    assert retention._cutoff(config.default_ttl_days, time.time()) is None
+
+
+def test_retention_skips_while_ingesting(monkeypatch):
+    lock = IngestionLock()
+    monkeypatch.setattr(retention, "get_ingestion_lock", lambda: lock)
+    monkeypatch.setattr(
+        retention, "_run_retention", lambda config: {"reclaimed_vectors": 0}
+    )
+
+    async def main():
+        async with lock.ingesting():
+            assert retention.run_retention(retention.RetentionConfig()) == {
+                "skipped": "ingestion running"
+            }
+        assert retention.run_retention(retention.RetentionConfig()) == {
+            "reclaimed_vectors": 0
+        }
+
+    asyncio.run(main())
+
+
+def test_ingestion_waits_for_retention():
+    lock = IngestionLock()
+    events = []
+    release = threading.Event()
+
+    def retain():
+        with lock.retaining() as acquired:
+            assert acquired
+            events.append("retention started")
+            release.wait()
+            events.append("retention finished")
+
+    async def main():
+        thread = threading.Thread(target=retain)
+        thread.start()
+        while not events:
+            await asyncio.sleep(0.01)
+
+        async def ingest():
+            async with lock.ingesting():
+                events.append("ingestion")
+
+        task = asyncio.create_task(ingest())
+        await asyncio.sleep(0.05)
+        assert events == ["retention started"]
+        release.set()
+        await task
+        thread.join()
+
+    asyncio.run(main())
+    assert events == ["retention started", "retention finished", "ingestion"]
@@ -0,0 +1,237 @@
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.common.corpus_version import get_corpus_version
+from agents.retrieval_agent.state import InputState
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
+    get_retrieval_vector_store,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AnswerCacheConfig:
+    enabled: bool = True
+    similarity_threshold: float = 0.95  # cosine similarity of the query embeddings
+    ttl_seconds: float = 6 * 60 * 60
+    max_entries: int = 1000
+
+
+def _get_config_from_env() -> AnswerCacheConfig:
+    config = AnswerCacheConfig()
+    config.enabled = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    config.similarity_threshold = float(
+        os.getenv("ANSWER_CACHE_THRESHOLD", config.similarity_threshold)
+    )
+    config.ttl_seconds = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", config.ttl_seconds))
+    config.max_entries = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", config.max_entries))
+    return config
+
+
+@dataclass
+class CachedAnswer:
+    query: str  # normalized, for exact matches before embedding
+    embedding: np.ndarray  # unit length
+    response: str
+    citations: List[Dict[str, Any]]
+    created_at: float
+    elapsed_seconds: float  # time the original graph run took
+
+
+class AnswerCache:
+    """In-memory semantic cache of final answers per category and filter set.
+
+    Only researched answers are stored. A query asked before verbatim is
+    answered without embedding it. Otherwise a lookup returns the most
+    similar cached answer above the threshold, and the query embedding is
+    passed on to the graph so research doesn't embed it again. Entries are
+    dropped wholesale when the corpus version changes, i.e. after an
+    ingestion or retention run, which is checked at most every
+    CORPUS_VERSION_TTL_SECONDS.
+    """
+
+    def __init__(self, config: AnswerCacheConfig):
+        self.config = config
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.invalidations = 0
+        self.time_saved_seconds = 0.0
+        self._entries: "OrderedDict[int, Tuple[str, CachedAnswer]]" = OrderedDict()
+        self._next_id = 0
+        self._corpus_version: Optional[int] = None
+
+    @staticmethod
+    def make_key(state: InputState) -> str:
+        category = getattr(state.category, "value", state.category)
+        return f"{category}\0{json.dumps(state.filters, sort_keys=True)}"
+
+    async def _check_corpus_version(self):
+        version = await get_corpus_version()
+        if version != self._corpus_version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(
+                    f"Corpus version changed to {version}, "
+                    f"dropping {len(self._entries)} cached answers"
+                )
+            self._entries.clear()
+            self._corpus_version = version
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    async def embed(self, state: InputState) -> List[float]:
+        embeddings = get_retrieval_vector_store(state.category).embeddings
+        return await embeddings.aembed_query(state.query)
+
+    def _live_entries(self, key: str):
+        now = time.time()
+        for entry_id, (entry_key, entry) in list(self._entries.items()):
+            if now - entry.created_at > self.config.ttl_seconds:
+                del self._entries[entry_id]
+            elif entry_key == key:
+                yield entry_id, entry
+
+    def _hit(self, entry_id: int) -> CachedAnswer:
+        self._entries.move_to_end(entry_id)
+        entry = self._entries[entry_id][1]
+        self.hits += 1
+        self.time_saved_seconds += entry.elapsed_seconds
+        return entry
+
+    async def lookup_exact(self, key: str, query: str) -> Optional[CachedAnswer]:
+        """Cached answer to the same query text, without counting a miss."""
+        await self._check_corpus_version()
+        query = self.normalize_query(query)
+        for entry_id, entry in self._live_entries(key):
+            if entry.query == query:
+                logger.info("Answer cache hit (exact query)")
+                return self._hit(entry_id)
+        return None
+
+    async def lookup(self, key: str, embedding: List[float]) -> Optional[CachedAnswer]:
+        await self._check_corpus_version()
+        embedding = self._unit(embedding)
+
+        best_id, best_score = None, self.config.similarity_threshold
+        for entry_id, entry in self._live_entries(key):
+            score = float(entry.embedding @ embedding)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            self.misses += 1
+            return None
+
+        logger.info(f"Answer cache hit (similarity {best_score:.3f})")
+        return self._hit(best_id)
+
+    async def store(
+        self,
+        key: str,
+        query: str,
+        embedding: List[float],
+        response: str,
+        citations: List[Dict[str, Any]],
+        elapsed_seconds: float,
+    ):
+        await self._check_corpus_version()
+        self._entries[self._next_id] = (
+            key,
+            CachedAnswer(
+                query=self.normalize_query(query),
+                embedding=self._unit(embedding),
+                response=response,
+                citations=citations,
+                created_at=time.time(),
+                elapsed_seconds=elapsed_seconds,
+            ),
+        )
+        self._next_id += 1
+        while len(self._entries) > self.config.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "time_saved_seconds": round(self.time_saved_seconds, 3),
+            "entries": len(self._entries),
+            "invalidations": self.invalidations,
+            "corpus_version": self._corpus_version,
+        }
+
+
+def replay_cached_answer(entry: CachedAnswer):
+    """The event stream stream_graph would produce for the cached answer."""
+    events = [
+        {
+            "event": "start",
+            "data": {
+                "message": "Starting retrieval agent graph...",
+                "timestamp": time.time(),
+            },
+        },
+        {
+            "event": "response_chunk",
+            "data": {"chunk": entry.response, "timestamp": time.time()},
+        },
+        {
+            "event": "response_complete",
+            "data": {"response": entry.response, "timestamp": time.time()},
+        },
+        {
+            "event": "complete",
+            "data": {
+                "message": "Retrieval agent graph completed",
+                "timestamp": time.time(),
+                "response": entry.response,
+                "citations": entry.citations,
+                "answered_by": "construct_response",
+                "cached": True,
+            },
+        },
+    ]
+    return events
+
+
+# Global cache instance
+_answer_cache: Optional[AnswerCache] = None
+
+
+def get_answer_cache() -> Optional[AnswerCache]:
+    """Return the shared cache, or None when disabled via ANSWER_CACHE_ENABLED."""
+    global _answer_cache
+    if _answer_cache is None:
+        config = _get_config_from_env()
+        if not config.enabled:
+            return None
+        _answer_cache = AnswerCache(config)
+    return _answer_cache
+
+
+def get_answer_cache_stats() -> Dict[str, float]:
+    cache = get_answer_cache()
+    return cache.stats() if cache is not None else {"enabled": False}
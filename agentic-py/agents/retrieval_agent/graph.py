@@ -13,6 +13,9 @@ from agents.retrieval_agent.nodes.construct_response.node import construct_respo
 from agents.retrieval_agent.nodes.analyze_and_route_query.node import (
     analyze_and_route_query,
 )
+from agents.retrieval_agent.answer_cache import get_answer_cache, replay_cached_answer
+from agents.retrieval_agent.single_flight import coalesced_stream
+from agents.common.metrics import timed_node
 
 STREAMING_NODES = [
     "general_conversation",
@@ -43,11 +46,13 @@ def create_graph() -> StateGraph:
         input_schema=InputState,
         output_schema=OutputState,
     )
-    graph.add_node("analyze_and_route_query", analyze_and_route_query)
-    graph.add_node("general_conversation", general_conversation)
-    graph.add_node("ask_more_info", ask_more_info)
-    graph.add_node("conduct_research", conduct_research)
-    graph.add_node("construct_response", construct_response)
+    graph.add_node(
+        "analyze_and_route_query", timed_node("retrieval", analyze_and_route_query)
+    )
+    graph.add_node("general_conversation", timed_node("retrieval", general_conversation))
+    graph.add_node("ask_more_info", timed_node("retrieval", ask_more_info))
+    graph.add_node("conduct_research", timed_node("retrieval", conduct_research))
+    graph.add_node("construct_response", timed_node("retrieval", construct_response))
 
     graph.add_edge(START, "analyze_and_route_query")
     graph.add_conditional_edges("analyze_and_route_query", route_query)
@@ -68,7 +73,7 @@ graph = compile_graph()
 
 
 def run_graph(state: InputState):
-    return graph.invoke(state)
+    return asyncio.run(run_async_graph(state))
 
 
 async def run_async_graph(state: InputState):
@@ -76,6 +81,66 @@ async def run_async_graph(state: InputState):
 
 
 async def stream_graph(state: InputState):
+    cache = get_answer_cache()
+    if cache is None or state.chat_history:
+        # Follow-up answers depend on the conversation, not just the query
+        if cache is not None:
+            cache.bypassed += 1
+        async for event in coalesced_stream(state, _stream_graph):
+            yield event
+        return
+
+    key = cache.make_key(state)
+    entry = await cache.lookup_exact(key, state.query)
+    if entry is not None:
+        for event in replay_cached_answer(entry):
+            yield event
+        return
+
+    try:
+        embedding = await cache.embed(state)
+    except Exception as e:
+        logger.error(f"Error embedding query for the answer cache: {str(e)}")
+        cache.bypassed += 1
+        async for event in coalesced_stream(state, _stream_graph):
+            yield event
+        return
+
+    entry = await cache.lookup(key, embedding)
+    if entry is not None:
+        for event in replay_cached_answer(entry):
+            yield event
+        return
+
+    # Research reuses the embedding instead of embedding the query again
+    state = state.model_copy(update={"query_embedding": embedding})
+
+    async def stream_and_store(state: InputState):
+        # Runs once per coalesced flight, so each answer is stored once
+        start_time = time.perf_counter()
+        async for event in _stream_graph(state):
+            yield event
+            # Conversation and clarification replies don't depend on the corpus
+            # and take one LLM call, only researched answers are worth caching
+            if (
+                event["event"] == "complete"
+                and event["data"]["response"]
+                and event["data"]["answered_by"] == "construct_response"
+            ):
+                await cache.store(
+                    key,
+                    state.query,
+                    embedding,
+                    event["data"]["response"],
+                    event["data"]["citations"],
+                    time.perf_counter() - start_time,
+                )
+
+    async for event in coalesced_stream(state, stream_and_store):
+        yield event
+
+
+async def _stream_graph(state: InputState):
     try:
         yield {
             "event": "start",
@@ -89,6 +154,7 @@ async def stream_graph(state: InputState):
         step_count = 0
         citations = []
         full_response = ""
+        answered_by = ""
 
         async for event in events:
             step_count += 1
@@ -113,6 +179,7 @@ async def stream_graph(state: InputState):
                 elif kind == "on_chat_model_end":
                     complete_response = event["data"]["output"].content
                     full_response = complete_response
+                    answered_by = langgraph_node
                     yield {
                         "event": "response_complete",
                         "data": {
@@ -144,6 +211,7 @@ async def stream_graph(state: InputState):
                 "timestamp": time.time(),
                 "response": full_response,
                 "citations": citations,
+                "answered_by": answered_by,
             },
         }
 
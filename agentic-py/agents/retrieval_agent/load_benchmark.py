@@ -0,0 +1,125 @@
+"""Concurrency load test for the retrieval agent.
+
+Runs the same chat query at increasing concurrency levels and reports
+throughput, latency and time to first chunk per level. The concurrency
+ceiling is the level after which throughput stops growing. Every request
+sends the same query, so run with ANSWER_CACHE_ENABLED=false and
+SINGLE_FLIGHT_ENABLED=false to measure the full pipeline rather than cache
+hits and coalesced runs.
+
+In-process (drives stream_graph on one event loop):
+    python -m agents.retrieval_agent.load_benchmark --concurrency 1,8,32,128
+
+Against a running server, e.g. to compare two deployments:
+    python -m agents.retrieval_agent.load_benchmark --url http://localhost:8000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.graph import stream_graph
+from agents.retrieval_agent.state import InputState
+
+DEFAULT_QUERY = "What are the latest developments in the global economy?"
+
+
+async def run_in_process(query: str) -> Tuple[float, Optional[float], bool]:
+    start = time.perf_counter()
+    first_chunk = None
+    ok = True
+    state = InputState(query=query, chat_history=[], category=Category.OTHER)
+    async for event in stream_graph(state):
+        if event["event"] == "response_chunk" and first_chunk is None:
+            first_chunk = time.perf_counter() - start
+        elif event["event"] == "error":
+            ok = False
+    return time.perf_counter() - start, first_chunk, ok
+
+
+async def run_http(
+    session: aiohttp.ClientSession, url: str, query: str
+) -> Tuple[float, Optional[float], bool]:
+    start = time.perf_counter()
+    first_chunk = None
+    ok = True
+    payload = {"query": query, "chat_history": [], "category": "other"}
+    async with session.post(f"{url}/chat/stream", json=payload) as response:
+        ok = response.status == 200
+        async for line in response.content:
+            if not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[len(b"data: ") :])
+            if event["event"] == "response_chunk" and first_chunk is None:
+                first_chunk = time.perf_counter() - start
+            elif event["event"] == "error":
+                ok = False
+    return time.perf_counter() - start, first_chunk, ok
+
+
+def percentile(values: List[float], q: float) -> float:
+    return sorted(values)[max(0, int(len(values) * q) - 1)]
+
+
+async def run_level(args, concurrency: int, session) -> float:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with limit:
+            if args.url:
+                return await run_http(session, args.url, args.query)
+            return await run_in_process(args.query)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[one() for _ in range(max(args.requests, concurrency))],
+        return_exceptions=True,
+    )
+    elapsed = time.perf_counter() - start
+
+    completed = [r for r in results if not isinstance(r, BaseException) and r[2]]
+    latencies = [r[0] for r in completed]
+    first_chunks = [r[1] for r in completed if r[1] is not None]
+    throughput = len(completed) / elapsed
+
+    print(
+        f"concurrency {concurrency:4d}  "
+        f"ok {len(completed):4d}/{len(results):<4d}  "
+        f"{throughput:7.2f} req/s  "
+        f"p50 {statistics.median(latencies) if latencies else float('nan'):6.2f}s  "
+        f"p95 {percentile(latencies, 0.95) if latencies else float('nan'):6.2f}s  "
+        f"ttft p50 {statistics.median(first_chunks) if first_chunks else float('nan'):6.2f}s"
+    )
+    return throughput
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--query", default=DEFAULT_QUERY)
+    parser.add_argument("--concurrency", default="1,4,16,64")
+    parser.add_argument("--requests", type=int, default=16, help="Requests per level")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        throughputs = [await run_level(args, level, session) for level in levels]
+
+    # Last level before one that adds less than 10% throughput
+    ceiling = levels[-1]
+    for i in range(1, len(levels)):
+        if throughputs[i] < throughputs[i - 1] * 1.1:
+            ceiling = levels[i - 1]
+            break
+    print(f"Concurrency ceiling: ~{ceiling} (throughput grows <10% beyond it)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,8 @@
 from agents.retrieval_agent.state import RetrievalAgentState
+import asyncio
 import logging
+import os
+import time
 from agents.retrieval_agent.utils.utils import get_llm, format_chat_history
 from agents.retrieval_agent.nodes.analyze_and_route_query.schemas import (
     RoutingDecisionOutputType,
@@ -7,34 +10,95 @@ from agents.retrieval_agent.nodes.analyze_and_route_query.schemas import (
 from agents.retrieval_agent.nodes.analyze_and_route_query.prompts import (
     ANALYZE_AND_ROUTE_QUERY_PROMPT,
 )
+from agents.retrieval_agent.nodes.analyze_and_route_query.router import (
+    log_routing_decision,
+    route_locally,
+)
+from agents.retrieval_agent.nodes.conduct_research.node import research_documents
 from langchain_core.messages import ChatMessage
 
 logger = logging.getLogger(__name__)
 
 
-def analyze_and_route_query(state: RetrievalAgentState) -> RetrievalAgentState:
-    logger.info("Analyzing and routing query")
+# Start research alongside routing instead of after it; the research is
+# cancelled if the query is routed anywhere else
+SPECULATIVE_RESEARCH = os.getenv("SPECULATIVE_RESEARCH", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+NON_RESEARCH_ROUTES = ("general_conversation", "ask_more_info")
+
+
+async def _resolve_speculative_research(
+    state: RetrievalAgentState, research: asyncio.Task
+):
+    if state.routing_decision in NON_RESEARCH_ROUTES:
+        research.cancel()
+        logger.info(f"Cancelled speculative research, routed to {state.routing_decision}")
+        return
+
     try:
-        llm = get_llm(model_name="gemini-2.5-flash-lite")
-        structured_llm = llm.with_structured_output(RoutingDecisionOutputType)
+        state.retrieved_documents = await research
+        state.research_completed = True
+    except Exception as e:
+        # conduct_research runs the research again
+        logger.error(f"Error in speculative research: {str(e)}")
 
-        formatted_chat_history = format_chat_history(state.chat_history)
 
-        routing_prompt = ANALYZE_AND_ROUTE_QUERY_PROMPT.format(
-            user_message=state.query, chat_history=formatted_chat_history
+async def analyze_and_route_query(state: RetrievalAgentState) -> RetrievalAgentState:
+    logger.info("Analyzing and routing query")
+
+    prediction = route_locally(state.query, bool(state.chat_history))
+    if prediction is not None:
+        state.routing_decision = prediction.label
+        state.routing_reasoning = (
+            f"Local router decision (confidence {prediction.confidence:.2f})"
         )
+        logger.info(f"Routed locally to {prediction.label}")
+        return state
 
-        routing_response = structured_llm.invoke(routing_prompt)
+    research = (
+        asyncio.create_task(research_documents(state)) if SPECULATIVE_RESEARCH else None
+    )
+    try:
+        try:
+            llm = get_llm(model_name="gemini-2.5-flash-lite")
+            structured_llm = llm.with_structured_output(RoutingDecisionOutputType)
 
-        state.routing_decision = routing_response.routing_decision
-        state.routing_reasoning = routing_response.routing_reasoning
+            formatted_chat_history = format_chat_history(state.chat_history)
 
-        return state
+            routing_prompt = ANALYZE_AND_ROUTE_QUERY_PROMPT.format(
+                user_message=state.query, chat_history=formatted_chat_history
+            )
+
+            start_time = time.perf_counter()
+            routing_response = await structured_llm.ainvoke(routing_prompt)
+            await asyncio.to_thread(
+                log_routing_decision,
+                state.query,
+                bool(state.chat_history),
+                routing_response.routing_decision,
+                (time.perf_counter() - start_time) * 1000,
+            )
+
+            state.routing_decision = routing_response.routing_decision
+            state.routing_reasoning = routing_response.routing_reasoning
+
+        except Exception as e:
+            logger.error(f"Error in query analysis and routing: {str(e)}")
+
+        if research is not None:
+            await _resolve_speculative_research(state, research)
 
-    except Exception as e:
-        logger.error(f"Error in query analysis and routing: {str(e)}")
         return state
 
+    finally:
+        # The request was cancelled (e.g. the client disconnected)
+        if research is not None and not research.done():
+            research.cancel()
+
 
 if __name__ == "__main__":
     state = RetrievalAgentState(
@@ -49,4 +113,4 @@ if __name__ == "__main__":
         answer="The capital of France is Paris.",
         citations=[],
     )
-    print(analyze_and_route_query(state))
+    print(asyncio.run(analyze_and_route_query(state)))
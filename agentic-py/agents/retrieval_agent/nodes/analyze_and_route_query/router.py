@@ -0,0 +1,380 @@
+"""Local pre-router that decides obvious queries without the routing LLM call.
+
+Queries are turned into hashed word and character n-gram vectors and
+compared with one centroid per routing label. The router only decides when
+the best label beats the runner-up by `min_confidence`; everything else
+goes to the LLM, whose decisions can be logged so the centroids can be
+retrained from real traffic. The log stores raw user queries, so it is
+opt-in (ROUTING_LOG_ENABLED=true) and rotated at ROUTING_LOG_MAX_BYTES.
+
+The router is off by default (LOCAL_ROUTER_ENABLED=false). Until it is
+enabled it only runs in shadow: with the routing log on, its prediction
+is logged next to every LLM decision and never used. Enable it once it
+has been trained from the routing log and the report shows acceptable
+accuracy at the configured margin. Without held-out logged decisions the report uses the hand-labelled
+queries in router_eval.jsonl.
+
+Train from the routing log and report accuracy, coverage and latency:
+    python -m agents.retrieval_agent.nodes.analyze_and_route_query.router train
+    python -m agents.retrieval_agent.nodes.analyze_and_route_query.router report
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import time
+import zlib
+from pathlib import Path
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import dotenv
+
+from agents.common.storage import append_jsonl, get_data_dir, read_jsonl
+
+dotenv.load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ROUTER_MODEL_FILE = "router_model.json"
+ROUTING_LOG_FILE = "routing_log.jsonl"
+EVAL_EXAMPLES_FILE = Path(__file__).parent / "router_eval.jsonl"
+
+LABELS = ("conduct_research", "general_conversation", "ask_more_info")
+
+_NUM_FEATURES = 1 << 18
+_WORD_RE = re.compile(r"\w+")
+
+# Seed examples used until a model has been trained from logged decisions
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    ("hi", "general_conversation"),
+    ("hello", "general_conversation"),
+    ("hey there", "general_conversation"),
+    ("good morning", "general_conversation"),
+    ("thanks", "general_conversation"),
+    ("thank you so much", "general_conversation"),
+    ("how are you?", "general_conversation"),
+    ("who are you?", "general_conversation"),
+    ("what can you do?", "general_conversation"),
+    ("bye", "general_conversation"),
+    ("see you later", "general_conversation"),
+    ("nice, thanks for the help", "general_conversation"),
+    ("ok cool", "general_conversation"),
+    ("lol", "general_conversation"),
+    ("asdfgh", "ask_more_info"),
+    ("qwerty uiop", "ask_more_info"),
+    ("???", "ask_more_info"),
+    ("...", "ask_more_info"),
+    ("the", "ask_more_info"),
+    ("of and", "ask_more_info"),
+    ("xkcd zzzz jjjj", "ask_more_info"),
+    ("hjkl;", "ask_more_info"),
+    ("What are the latest developments in the global economy?", "conduct_research"),
+    ("What happened in the election results yesterday?", "conduct_research"),
+    ("latest news on the war in Ukraine", "conduct_research"),
+    ("Who won the Champions League match last night?", "conduct_research"),
+    ("What did the central bank decide on interest rates?", "conduct_research"),
+    ("Tell me about the new smartphone launch", "conduct_research"),
+    ("Any updates on the climate summit?", "conduct_research"),
+    ("Why are oil prices rising this week?", "conduct_research"),
+    ("What is the government doing about inflation?", "conduct_research"),
+    ("news about the stock market today", "conduct_research"),
+    ("What are people saying about the transfer window signings?", "conduct_research"),
+    ("Summarize the recent court ruling on the arrest warrant", "conduct_research"),
+    ("How did the markets react to the jobs report?", "conduct_research"),
+    ("What's going on with the tech layoffs?", "conduct_research"),
+]
+
+
+@dataclass
+class RouterConfig:
+    enabled: bool = False  # shadow only until trained from the routing log
+    min_confidence: float = 0.1  # score margin between the best and second label
+    log_decisions: bool = False  # append LLM routing decisions (raw queries) for retraining
+    log_max_bytes: int = 10_000_000  # the log is rotated once past this size
+
+
+def _get_config_from_env() -> RouterConfig:
+    config = RouterConfig()
+    config.enabled = os.getenv("LOCAL_ROUTER_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    config.min_confidence = float(
+        os.getenv("LOCAL_ROUTER_MIN_CONFIDENCE", config.min_confidence)
+    )
+    config.log_decisions = os.getenv("ROUTING_LOG_ENABLED", "false").lower() in (
+        "1",
+        "true",
+        "yes",
+    )
+    config.log_max_bytes = int(os.getenv("ROUTING_LOG_MAX_BYTES", config.log_max_bytes))
+    return config
+
+
+@dataclass
+class RoutingPrediction:
+    label: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+def _hash(feature: str) -> int:
+    return zlib.crc32(feature.encode()) % _NUM_FEATURES
+
+
+def featurize(text: str) -> Dict[int, float]:
+    """L2-normalized hashed word unigrams, word bigrams and character trigrams."""
+    text = text.lower().strip()
+    words = _WORD_RE.findall(text)
+    features: Dict[int, float] = defaultdict(float)
+    for word in words:
+        features[_hash(f"w:{word}")] += 1.0
+    for first, second in zip(words, words[1:]):
+        features[_hash(f"b:{first} {second}")] += 1.0
+    padded = f" {text} "
+    for i in range(len(padded) - 2):
+        features[_hash(f"c:{padded[i : i + 3]}")] += 0.5
+    # Punctuation-only or empty input only has these features
+    features[_hash(f"n:{min(len(words), 8)}")] += 1.0
+
+    norm = math.sqrt(sum(weight * weight for weight in features.values()))
+    return {feature: weight / norm for feature, weight in features.items()}
+
+
+class LocalRouter:
+    """Nearest-centroid classifier over the routing labels."""
+
+    def __init__(self, centroids: Dict[str, Dict[int, float]]):
+        self.centroids = centroids
+
+    @classmethod
+    def train(cls, examples: List[Tuple[str, str]]) -> "LocalRouter":
+        sums: Dict[str, Dict[int, float]] = {label: defaultdict(float) for label in LABELS}
+        for text, label in examples:
+            for feature, weight in featurize(text).items():
+                sums[label][feature] += weight
+
+        centroids = {}
+        for label, weights in sums.items():
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            if norm:
+                centroids[label] = {
+                    feature: weight / norm for feature, weight in weights.items()
+                }
+        return cls(centroids)
+
+    def predict(self, text: str) -> RoutingPrediction:
+        features = featurize(text)
+        scores = {
+            label: sum(
+                weight * centroid.get(feature, 0.0) for feature, weight in features.items()
+            )
+            for label, centroid in self.centroids.items()
+        }
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return RoutingPrediction(
+            label=ranked[0][0], confidence=ranked[0][1] - runner_up, scores=scores
+        )
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.centroids, f)
+
+    @classmethod
+    def load(cls, path) -> "LocalRouter":
+        with open(path) as f:
+            centroids = json.load(f)
+        return cls(
+            {
+                label: {int(feature): weight for feature, weight in weights.items()}
+                for label, weights in centroids.items()
+            }
+        )
+
+
+# Global router instance
+_local_router: Optional[LocalRouter] = None
+_router_config: Optional[RouterConfig] = None
+
+
+def get_router_config() -> RouterConfig:
+    global _router_config
+    if _router_config is None:
+        _router_config = _get_config_from_env()
+    return _router_config
+
+
+def get_local_router() -> LocalRouter:
+    global _local_router
+    if _local_router is None:
+        path = get_data_dir() / ROUTER_MODEL_FILE
+        if path.exists():
+            _local_router = LocalRouter.load(path)
+            logger.info(f"Loaded local router from {path}")
+        else:
+            _local_router = LocalRouter.train(SEED_EXAMPLES)
+            logger.info("Local router trained on seed examples")
+    return _local_router
+
+
+def route_locally(query: str, has_chat_history: bool) -> Optional[RoutingPrediction]:
+    """Return a confident local routing decision, or None to ask the LLM."""
+    config = get_router_config()
+    if not config.enabled:
+        return None
+
+    prediction = get_local_router().predict(query)
+    if prediction.confidence < config.min_confidence:
+        return None
+    # "yes" or "sure" after the assistant offered more detail is a research
+    # request, only the LLM can tell from the chat history
+    if has_chat_history and prediction.label != "conduct_research":
+        return None
+    return prediction
+
+
+def log_routing_decision(
+    query: str, has_chat_history: bool, routing_decision: str, latency_ms: float
+):
+    """Append an LLM routing decision, with the shadow local prediction, to the log.
+
+    Blocking file I/O, call it from a worker thread.
+    """
+    config = get_router_config()
+    if not config.log_decisions:
+        return
+    prediction = get_local_router().predict(query)
+    entry = {
+        "query": query,
+        "has_chat_history": has_chat_history,
+        "routing_decision": routing_decision,
+        "latency_ms": round(latency_ms, 1),
+        "local_decision": prediction.label,
+        "local_confidence": round(prediction.confidence, 4),
+        "timestamp": time.time(),
+    }
+    try:
+        append_jsonl(ROUTING_LOG_FILE, entry, config.log_max_bytes)
+    except OSError as e:
+        logger.warning(f"Failed to log routing decision: {e}")
+
+
+def load_routing_log() -> List[dict]:
+    return [
+        entry
+        for entry in read_jsonl(ROUTING_LOG_FILE)
+        if entry.get("routing_decision") in LABELS and not entry.get("has_chat_history")
+    ]
+
+
+def _is_held_out(query: str) -> bool:
+    # Stable 20% split so train and report agree on the evaluation set
+    return zlib.crc32(query.encode()) % 5 == 0
+
+
+def _split(entries: List[dict]) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+    # The latest decision for a query wins
+    labelled = {entry["query"]: entry["routing_decision"] for entry in entries}
+    train, held_out = [], []
+    for query, label in labelled.items():
+        (held_out if _is_held_out(query) else train).append((query, label))
+    return train, held_out
+
+
+def train_router() -> LocalRouter:
+    train, held_out = _split(load_routing_log())
+    router = LocalRouter.train(SEED_EXAMPLES + train)
+    path = get_data_dir() / ROUTER_MODEL_FILE
+    router.save(path)
+    logger.info(
+        f"Trained local router on {len(SEED_EXAMPLES)} seed and {len(train)} logged "
+        f"examples ({len(held_out)} held out), saved to {path}"
+    )
+    return router
+
+
+def load_eval_examples(path=EVAL_EXAMPLES_FILE) -> List[Tuple[str, str]]:
+    with open(path) as f:
+        return [
+            (entry["query"], entry["routing_decision"])
+            for entry in map(json.loads, filter(str.strip, f))
+        ]
+
+
+def report(router: LocalRouter, thresholds: List[float], examples_path=None):
+    entries = load_routing_log()
+    if examples_path is not None:
+        examples = load_eval_examples(examples_path)
+    else:
+        _, examples = _split(entries)
+        if not examples:
+            print(f"No held-out logged decisions, reporting on {EVAL_EXAMPLES_FILE.name}")
+            examples = load_eval_examples()
+
+    timings = []
+    predictions = []
+    for text, label in examples:
+        start = time.perf_counter()
+        prediction = router.predict(text)
+        timings.append(time.perf_counter() - start)
+        predictions.append((prediction, label))
+
+    print(f"{len(examples)} examples")
+    print(
+        f"local latency p50 {statistics.median(timings) * 1e6:.0f} us  "
+        f"p95 {sorted(timings)[max(0, int(len(timings) * 0.95) - 1)] * 1e6:.0f} us"
+    )
+    llm_latencies = [entry["latency_ms"] for entry in entries if "latency_ms" in entry]
+    if llm_latencies:
+        print(f"LLM routing latency p50 {statistics.median(llm_latencies):.0f} ms")
+
+    for threshold in thresholds:
+        decided = [(p, label) for p, label in predictions if p.confidence >= threshold]
+        correct = sum(1 for p, label in decided if p.label == label)
+        accuracy = correct / len(decided) if decided else float("nan")
+        print(
+            f"min_confidence {threshold:.2f}  "
+            f"coverage {len(decided) / len(predictions):6.1%}  "
+            f"accuracy {accuracy:6.1%}"
+        )
+
+    shadowed = [entry for entry in entries if "local_decision" in entry]
+    if shadowed:
+        threshold = get_router_config().min_confidence
+        decided = [e for e in shadowed if e["local_confidence"] >= threshold]
+        agreed = sum(1 for e in decided if e["local_decision"] == e["routing_decision"])
+        print(
+            f"shadow: {len(shadowed)} logged LLM decisions, {len(decided)} above "
+            f"min_confidence {threshold:.2f}, "
+            f"{agreed / len(decided) if decided else float('nan'):.1%} agree with the LLM"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("command", choices=["train", "report"])
+    parser.add_argument(
+        "--thresholds",
+        default="0,0.05,0.1,0.15,0.2,0.3",
+        help="min_confidence values to report",
+    )
+    parser.add_argument(
+        "--examples", help="JSONL of {query, routing_decision} to report on instead"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    router = train_router() if args.command == "train" else get_local_router()
+    report(router, [float(t) for t in args.thresholds.split(",")], args.examples)
+
+
+if __name__ == "__main__":
+    main()
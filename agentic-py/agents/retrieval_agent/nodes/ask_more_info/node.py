@@ -6,7 +6,7 @@ from agents.retrieval_agent.nodes.ask_more_info.prompts import ASK_FOR_MORE_INFO
 logger = logging.getLogger(__name__)
 
 
-def ask_more_info(state: RetrievalAgentState) -> RetrievalAgentState:
+async def ask_more_info(state: RetrievalAgentState) -> RetrievalAgentState:
     logger.info("Asking for more info")
     try:
         llm = get_llm(model_name="gemini-2.5-flash-lite", temperature=0.5)
@@ -18,7 +18,7 @@ def ask_more_info(state: RetrievalAgentState) -> RetrievalAgentState:
             routing_reasoning=state.routing_reasoning,
         )
 
-        response = llm.invoke(ask_for_more_info_prompt)
+        response = await llm.ainvoke(ask_for_more_info_prompt)
 
         state.answer = response
         state.citations = []
@@ -1,5 +1,8 @@
 from agents.retrieval_agent.state import RetrievalAgentState
+import asyncio
 import logging
+import time
+from typing import List
 from agents.retrieval_agent.utils.utils import format_chat_history
 from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
     ResearcherGraphInputState,
@@ -7,6 +10,12 @@ from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
 from agents.retrieval_agent.sub_graphs.researcher_graph.graph import (
     compile_researcher_graph,
 )
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
+    ProcessedVectorDocument,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.expansion import (
+    log_expansion,
+)
 from agents.embedding_agent.state import Category
 
 logger = logging.getLogger(__name__)
@@ -15,23 +24,57 @@ logger = logging.getLogger(__name__)
 researcher_graph = compile_researcher_graph()
 
 
-def conduct_research(state: RetrievalAgentState) -> RetrievalAgentState:
-    logger.info("Conducting research")
+async def research_documents(
+    state: RetrievalAgentState,
+) -> List[ProcessedVectorDocument]:
+    formatted_chat_history = format_chat_history(state.chat_history)
 
-    try:
-        formatted_chat_history = format_chat_history(state.chat_history)
-
-        researcher_graph_input_state: ResearcherGraphInputState = (
-            ResearcherGraphInputState(
-                user_message=state.query,
-                formatted_chat_history=formatted_chat_history,
-                category=state.category,
-            )
+    researcher_graph_input_state: ResearcherGraphInputState = (
+        ResearcherGraphInputState(
+            user_message=state.query,
+            formatted_chat_history=formatted_chat_history,
+            category=state.category,
+            filters=state.filters,
+            query_embedding=state.query_embedding,
+        )
+    )
+
+    start_time = time.perf_counter()
+    researcher_graph_output = await researcher_graph.ainvoke(
+        researcher_graph_input_state
+    )
+    latency_ms = (time.perf_counter() - start_time) * 1000
+
+    final_documents = researcher_graph_output["final_documents"]
+    expansion = researcher_graph_output.get("expansion")
+    if expansion is not None:
+        logger.info(
+            f"Research with query expansion {expansion.mode}/{expansion.decision} "
+            f"took {latency_ms:.0f} ms for {len(final_documents)} documents"
+        )
+        await asyncio.to_thread(
+            log_expansion,
+            state.query,
+            expansion,
+            researcher_graph_output.get("queries", []),
+            latency_ms,
+            len(final_documents),
         )
 
-        researcher_graph_output = researcher_graph.invoke(researcher_graph_input_state)
+    return final_documents
+
+
+async def conduct_research(state: RetrievalAgentState) -> RetrievalAgentState:
+    if state.research_completed:
+        # Already retrieved speculatively while the query was being routed
+        logger.info("Using speculative research results")
+        return state
+
+    logger.info("Conducting research")
 
-        state.retrieved_documents = researcher_graph_output["final_documents"]
+    try:
+        state.retrieved_documents = await research_documents(state)
+        state.research_completed = True
 
         return state
 
@@ -51,5 +94,5 @@ if __name__ == "__main__":
         routing_reasoning="General conversation",
         category=Category.OTHER,
     )
-    conduct_research(state)
+    asyncio.run(conduct_research(state))
     print(state.retrieved_documents)
@@ -0,0 +1,104 @@
+"""Compare answer prompts built from every retrieved chunk with packed context.
+
+For each query the researcher graph retrieves chunks once, then the answer
+prompt is built both ways and its token count measured. With `--llm` the
+answer is also generated from both prompts to time first token and total
+latency.
+
+Run with:
+python -m agents.retrieval_agent.nodes.construct_response.benchmark --llm
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import dotenv
+
+from agents.embedding_agent.nodes.embed_articles.utils import get_token_count
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.nodes.conduct_research.node import research_documents
+from agents.retrieval_agent.nodes.construct_response.node import (
+    fetch_missing_embeddings,
+)
+from agents.retrieval_agent.nodes.construct_response.packer import pack_context
+from agents.retrieval_agent.nodes.construct_response.prompts import (
+    ANALYZE_AND_CONSTRUCT_ANSWER_PROMPT,
+)
+from agents.retrieval_agent.nodes.construct_response.utils import (
+    format_retrieved_documents,
+)
+from agents.retrieval_agent.state import RetrievalAgentState
+from agents.retrieval_agent.utils.utils import get_llm
+
+dotenv.load_dotenv()
+
+DEFAULT_QUERIES = [
+    "What are the latest developments in the global economy?",
+    "What happened in the election results?",
+    "What did the central bank decide on interest rates?",
+    "Who won the Champions League match?",
+    "What are the findings of the latest climate research?",
+]
+
+
+async def time_answer(prompt: str) -> Dict[str, float]:
+    llm = get_llm(model_name="gemini-2.5-flash-lite", temperature=0.5)
+    start = time.perf_counter()
+    first_token = None
+    async for chunk in llm.astream(prompt):
+        if first_token is None and chunk.content:
+            first_token = time.perf_counter() - start
+    return {"ttft": first_token or 0.0, "total": time.perf_counter() - start}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--query", action="append", dest="queries")
+    parser.add_argument("--category", default=Category.OTHER.value)
+    parser.add_argument("--llm", action="store_true", help="Also time answer generation")
+    args = parser.parse_args()
+
+    tokens: Dict[str, List[int]] = {"all chunks": [], "packed": []}
+    latencies: Dict[str, List[Dict[str, float]]] = {"all chunks": [], "packed": []}
+    for query in args.queries or DEFAULT_QUERIES:
+        state = RetrievalAgentState(query=query, category=Category(args.category))
+        state.retrieved_documents = await research_documents(state)
+        if not state.retrieved_documents:
+            print(f"No documents for {query!r}, skipping")
+            continue
+
+        await fetch_missing_embeddings(state)
+        packed = pack_context(state.retrieved_documents)
+        contexts = {
+            "all chunks": format_retrieved_documents(state.retrieved_documents),
+            "packed": packed.text,
+        }
+        for name, context in contexts.items():
+            prompt = ANALYZE_AND_CONSTRUCT_ANSWER_PROMPT.format(
+                user_message=query,
+                chat_history="No previous conversation",
+                retrieved_documents=context,
+            )
+            tokens[name].append(get_token_count(prompt))
+            if args.llm:
+                latencies[name].append(await time_answer(prompt))
+
+    for name in ("all chunks", "packed"):
+        if not tokens[name]:
+            continue
+        line = f"{name:<11} prompt tokens mean {statistics.mean(tokens[name]):7.0f}"
+        if latencies[name]:
+            ttfts = [timing["ttft"] for timing in latencies[name]]
+            totals = [timing["total"] for timing in latencies[name]]
+            line += (
+                f"  ttft p50 {statistics.median(ttfts):5.2f}s"
+                f"  total p50 {statistics.median(totals):5.2f}s"
+            )
+        print(line)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,5 +1,8 @@
 from agents.retrieval_agent.state import RetrievalAgentState, Citation
+import asyncio
 import logging
+from agents.common.metrics import CHUNKS
+from agents.common.vector_store import aget_vectors_from_vector_store
 from agents.retrieval_agent.utils.utils import (
     get_llm,
     format_chat_history,
@@ -13,33 +16,55 @@ from agents.retrieval_agent.nodes.construct_response.prompts import (
 )
 from agents.retrieval_agent.nodes.construct_response.utils import (
     extract_article_ids,
-    format_retrieved_documents,
 )
+from agents.retrieval_agent.nodes.construct_response.packer import pack_context
 
 logger = logging.getLogger(__name__)
 
 
-def construct_response(state: RetrievalAgentState) -> RetrievalAgentState:
-    logger.info("Analyzing and constructing answer")
+async def fetch_missing_embeddings(state: RetrievalAgentState):
+    """Attach the stored vectors of the chunks to pack, for MMR without re-embedding."""
+    missing = {
+        doc["metadata"]["chunk_id"]: doc["metadata"]["category"]
+        for doc in state.retrieved_documents
+        if not doc.get("embedding")
+    }
+    if not missing:
+        return
     try:
-        print(f"Analyzing and constructing answer for {state.query}")
+        vectors = await aget_vectors_from_vector_store(missing)
+    except Exception as e:
+        logger.error(f"Error fetching stored vectors, packing without them: {str(e)}")
+        return
+    for doc in state.retrieved_documents:
+        vector = vectors.get(doc["metadata"]["chunk_id"])
+        if vector is not None and not doc.get("embedding"):
+            doc["embedding"] = vector
+
 
+async def construct_response(state: RetrievalAgentState) -> RetrievalAgentState:
+    logger.info(f"Analyzing and constructing answer for {state.query[:100]}")
+    try:
         llm = get_llm(model_name="gemini-2.5-flash-lite", temperature=0.5)
         formatted_chat_history = format_chat_history(state.chat_history)
 
-        formatted_retrieved_documents = format_retrieved_documents(
-            state.retrieved_documents
+        await fetch_missing_embeddings(state)
+        packed_context = pack_context(state.retrieved_documents)
+        logger.info(
+            f"Packed {packed_context.chunks}/{len(state.retrieved_documents)} chunks "
+            f"from {packed_context.articles} articles into {packed_context.tokens} tokens"
         )
+        CHUNKS.observe(packed_context.chunks, "packed")
 
         analyze_and_construct_answer_prompt = (
             ANALYZE_AND_CONSTRUCT_ANSWER_PROMPT.format(
                 user_message=state.query,
                 chat_history=formatted_chat_history,
-                retrieved_documents=formatted_retrieved_documents,
+                retrieved_documents=packed_context.text,
             )
         )
 
-        response = llm.invoke(analyze_and_construct_answer_prompt)
+        response = await llm.ainvoke(analyze_and_construct_answer_prompt)
         article_ids = extract_article_ids(response.content)
 
         retrieved_documents_dict = {
@@ -93,4 +118,4 @@ if __name__ == "__main__":
         answer="The capital of France is Paris.",
         citations=[],
     )
-    print(construct_response(state))
+    print(asyncio.run(construct_response(state)))
@@ -0,0 +1,208 @@
+import logging
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from agents.embedding_agent.nodes.embed_articles.utils import get_token_count
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
+    ProcessedVectorDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTENT_MARKER = "__Content__:"
+DOCUMENT_SEPARATOR = "\n" + "-" * 10 + "\n"
+GAP_MARKER = "\n[...]\n"
+
+# Characters of the next chunk's start looked up in the previous chunk to
+# find where the splitter overlap begins
+_OVERLAP_PROBE_CHARS = 80
+
+
+@dataclass
+class ContextPackingConfig:
+    token_budget: int = 3000  # tokens of retrieved context in the answer prompt
+    mmr_lambda: float = 0.7  # 1 ranks by relevance only, 0 by diversity only
+
+
+def _get_config_from_env() -> ContextPackingConfig:
+    config = ContextPackingConfig()
+    config.token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", config.token_budget))
+    config.mmr_lambda = float(os.getenv("CONTEXT_MMR_LAMBDA", config.mmr_lambda))
+    return config
+
+
+@dataclass
+class PackedContext:
+    text: str
+    tokens: int
+    chunks: int  # chunks that made it into the prompt
+    articles: int
+
+
+def chunk_body(doc: ProcessedVectorDocument) -> str:
+    """Chunk text without the title/description header added by enhance_chunks."""
+    content = doc["content"]
+    if CONTENT_MARKER in content:
+        content = content.split(CONTENT_MARKER, 1)[1]
+    return content.strip()
+
+
+def merge_overlapping(previous: str, following: str) -> str:
+    """Join two consecutive chunks of an article, dropping the splitter overlap."""
+    probe = following[:_OVERLAP_PROBE_CHARS]
+    start = previous.find(probe) if probe else -1
+    if start == -1:
+        return f"{previous}\n{following}"
+    return previous[:start] + following
+
+
+def _article_header(doc: ProcessedVectorDocument) -> str:
+    metadata = doc["metadata"]
+    return (
+        f"Article ID: {metadata['article_id']}\n"
+        f"Title: {metadata['title']}\n"
+        f"Description: {metadata['description']}\n"
+        f"Source: {metadata['source']}\n"
+        f"Published Date: {metadata['published_date']}\n"
+        f"Authors: {metadata['authors']}\n"
+    )
+
+
+def select_mmr(
+    documents: List[ProcessedVectorDocument],
+    embeddings: Optional[np.ndarray],
+    costs: List[int],
+    header_costs: Dict[str, int],
+    token_budget: int,
+    mmr_lambda: float,
+) -> List[int]:
+    """Greedy maximal marginal relevance under a token budget.
+
+    Documents come in fusion/rerank order, so relevance falls linearly with
+    the rank (vector similarity is 0 for BM25-only hits). Redundancy is the
+    highest cosine similarity to an already selected chunk. An article's
+    header is paid for once, by its first selected chunk.
+    """
+    relevance = 1 - np.arange(len(documents)) / len(documents)
+    redundancy = np.zeros(len(documents))
+    remaining = set(range(len(documents)))
+    selected: List[int] = []
+    paid_articles = set()
+    used = 0
+
+    while remaining:
+        candidates = sorted(remaining)
+        scores = mmr_lambda * relevance[candidates] - (1 - mmr_lambda) * redundancy[
+            candidates
+        ]
+        best = candidates[int(np.argmax(scores))]
+        remaining.discard(best)
+
+        article_id = documents[best]["metadata"]["article_id"]
+        cost = costs[best]
+        if article_id not in paid_articles:
+            cost += header_costs[article_id]
+        if used + cost > token_budget:
+            continue
+
+        used += cost
+        paid_articles.add(article_id)
+        selected.append(best)
+        if embeddings is not None:
+            redundancy = np.maximum(redundancy, embeddings @ embeddings[best])
+
+    return selected
+
+
+def _embedding_matrix(documents: List[ProcessedVectorDocument]) -> Optional[np.ndarray]:
+    """Normalized stored vectors, zero rows for documents without one."""
+    dimension = next(
+        (len(doc["embedding"]) for doc in documents if doc.get("embedding")), None
+    )
+    if dimension is None:
+        return None
+    matrix = np.zeros((len(documents), dimension), dtype=np.float32)
+    for i, doc in enumerate(documents):
+        if doc.get("embedding"):
+            matrix[i] = doc["embedding"]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def pack_context(
+    documents: List[ProcessedVectorDocument],
+    config: Optional[ContextPackingConfig] = None,
+) -> PackedContext:
+    """Format retrieved chunks for the answer prompt within the token budget.
+
+    Chunks are picked by MMR over the vectors returned by the search, then
+    grouped per article under a single header, in chunk order, with
+    consecutive chunks merged.
+    """
+    if config is None:
+        config = _get_config_from_env()
+    # Several queries can return the same chunk, keep its best-ranked hit
+    unique: Dict[str, ProcessedVectorDocument] = {}
+    for doc in documents:
+        unique.setdefault(doc["metadata"]["chunk_id"], doc)
+    documents = list(unique.values())
+    if not documents:
+        return PackedContext(text="", tokens=0, chunks=0, articles=0)
+
+    bodies = [chunk_body(doc) for doc in documents]
+    costs = [get_token_count(body) for body in bodies]
+    headers: Dict[str, str] = {}
+    for doc in documents:
+        headers.setdefault(doc["metadata"]["article_id"], _article_header(doc))
+    header_costs = {
+        article_id: get_token_count(header) for article_id, header in headers.items()
+    }
+
+    selected = select_mmr(
+        documents,
+        _embedding_matrix(documents),
+        costs,
+        header_costs,
+        config.token_budget,
+        config.mmr_lambda,
+    )
+
+    # Articles in order of their best chunk, chunks in article order; chunks
+    # without a chunk_index follow in selection order
+    articles: Dict[str, List[Tuple[int, int, int]]] = {}
+    for position, i in enumerate(selected):
+        chunk_index = documents[i]["metadata"].get("chunk_index")
+        articles.setdefault(documents[i]["metadata"]["article_id"], []).append(
+            (0, chunk_index, i) if chunk_index is not None else (1, position, i)
+        )
+
+    sections = []
+    for article_id, chunks in articles.items():
+        chunks.sort()
+        passages = []
+        previous_index = None
+        for unindexed, chunk_index, i in chunks:
+            # Only chunks known to be neighbours share their splitter overlap
+            if (
+                not unindexed
+                and previous_index is not None
+                and chunk_index == previous_index + 1
+            ):
+                passages[-1] = merge_overlapping(passages[-1], bodies[i])
+            else:
+                passages.append(bodies[i])
+            previous_index = None if unindexed else chunk_index
+        sections.append(
+            f"{headers[article_id]}Content: {GAP_MARKER.join(passages)}\n"
+        )
+
+    text = DOCUMENT_SEPARATOR.join(sections)
+    return PackedContext(
+        text=text,
+        tokens=get_token_count(text),
+        chunks=len(selected),
+        articles=len(articles),
+    )
@@ -0,0 +1,135 @@
+from typing import List, Optional
+
+import pytest
+
+from agents.retrieval_agent.nodes.construct_response import packer
+from agents.retrieval_agent.nodes.construct_response.packer import (
+    GAP_MARKER,
+    ContextPackingConfig,
+    pack_context,
+)
+
+
+@pytest.fixture(autouse=True)
+def token_count(monkeypatch):
+    # ~4 characters per token, without loading the tokenizer
+    monkeypatch.setattr(packer, "get_token_count", lambda text: len(text) // 4)
+
+
+def make_doc(
+    article_id: str,
+    chunk_id: str,
+    text: str,
+    chunk_index: Optional[int] = None,
+    embedding: Optional[List[float]] = None,
+    similarity_score: float = 0.5,
+) -> dict:
+    metadata = {
+        "authors": ["a"],
+        "description": f"D {article_id}",
+        "title": f"T {article_id}",
+        "url": "https://example.com",
+        "published_date": "2026-10-01",
+        "date_download": "",
+        "similarity_score": similarity_score,
+        "chunk_id": chunk_id,
+        "category": "news",
+        "article_id": article_id,
+        "source": "s",
+    }
+    if chunk_index is not None:
+        metadata["chunk_index"] = chunk_index
+    doc = {"content": f"__Title__: t\n__Content__: {text}", "metadata": metadata}
+    if embedding is not None:
+        doc["embedding"] = embedding
+    return doc
+
+
+def config(token_budget: int = 10_000) -> ContextPackingConfig:
+    return ContextPackingConfig(token_budget=token_budget, mmr_lambda=0.7)
+
+
+def test_chunks_without_chunk_index_are_all_packed():
+    docs = [
+        make_doc("art_old", "old-a", "first legacy passage"),
+        make_doc("art_old", "old-b", "second legacy passage"),
+        make_doc("art_old", "old-c", "third legacy passage"),
+    ]
+    packed = pack_context(docs, config())
+    assert packed.chunks == 3
+    assert packed.articles == 1
+    assert packed.text.count("Article ID: art_old") == 1
+    # Not known to be neighbours, so kept as separate passages in rank order
+    assert packed.text.count(GAP_MARKER) == 2
+    assert (
+        packed.text.index("first")
+        < packed.text.index("second")
+        < packed.text.index("third")
+    )
+
+
+def test_duplicate_hits_are_packed_once():
+    docs = [
+        make_doc("art_a", "a0", "shared passage", chunk_index=0),
+        make_doc("art_a", "a0", "shared passage", chunk_index=0),
+        make_doc("art_b", "b-legacy", "legacy passage"),
+        make_doc("art_b", "b-legacy", "legacy passage"),
+    ]
+    packed = pack_context(docs, config())
+    assert packed.chunks == 2
+    assert packed.text.count("shared passage") == 1
+    assert packed.text.count("legacy passage") == 1
+
+
+def test_consecutive_chunks_merge_overlap():
+    # Overlap longer than the merge probe, like the splitter's
+    words = " ".join(f"w{i}" for i in range(100))
+    first = " ".join(words.split()[:60])
+    second = " ".join(words.split()[30:])
+    docs = [
+        make_doc("art_a", "a1", second, chunk_index=1),
+        make_doc("art_a", "a0", first, chunk_index=0),
+        make_doc("art_a", "a5", "far away passage", chunk_index=5),
+        make_doc("art_a", "a-legacy", "legacy passage"),
+    ]
+    packed = pack_context(docs, config())
+    assert words in packed.text
+    assert packed.text.count("w45 ") == 1
+    # Merged pair, then the gap to chunk 5, then the chunk without an index
+    assert packed.text.count(GAP_MARKER) == 2
+    text = packed.text
+    assert text.index(words) < text.index("far away") < text.index("legacy")
+
+
+def test_relevance_follows_rank_not_similarity_score():
+    # A BM25-only hit ranked first has no vector similarity
+    docs = [
+        make_doc("art_lex", "lex", "bm25 hit " * 30, similarity_score=0.0),
+        make_doc("art_vec", "vec", "vector hit " * 30, similarity_score=0.9),
+    ]
+    packed = pack_context(docs, config(token_budget=110))
+    assert packed.chunks == 1
+    assert "Article ID: art_lex" in packed.text
+
+
+def test_mmr_prefers_diverse_chunks():
+    docs = [
+        make_doc("art_a", "a", "alpha " * 30, embedding=[1.0, 0.0]),
+        make_doc("art_b", "b", "bravo " * 30, embedding=[1.0, 0.0]),
+        make_doc("art_c", "c", "charlie " * 30, embedding=[0.0, 1.0]),
+        make_doc("art_d", "d", "delta " * 30),
+    ]
+    packed = pack_context(docs, config(token_budget=200))
+    assert packed.chunks == 2
+    assert "Article ID: art_a" in packed.text
+    assert "Article ID: art_c" in packed.text
+
+
+def test_budget_counts_each_header_once():
+    docs = [
+        make_doc("art_a", f"a{i}", f"passage {i} " * 10, chunk_index=i * 2)
+        for i in range(3)
+    ]
+    packed = pack_context(docs, config())
+    assert packed.text.count("Article ID: art_a") == 1
+    assert pack_context([], config()).chunks == 0
@@ -8,7 +8,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 
-def general_conversation(state: RetrievalAgentState) -> RetrievalAgentState:
+async def general_conversation(state: RetrievalAgentState) -> RetrievalAgentState:
     logger.info("Responding to general conversation")
     try:
         llm = get_llm(model_name="gemini-2.5-flash-lite", temperature=1)
@@ -21,7 +21,7 @@ def general_conversation(state: RetrievalAgentState) -> RetrievalAgentState:
             routing_reasoning=state.routing_reasoning,
         )
 
-        response = llm.invoke(general_conversation_prompt)
+        response = await llm.ainvoke(general_conversation_prompt)
 
         state.answer = response
         state.citations = []
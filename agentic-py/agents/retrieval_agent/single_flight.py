@@ -0,0 +1,163 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from agents.retrieval_agent.state import InputState
+from agents.retrieval_agent.utils.utils import format_chat_history
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+
+class _Flight:
+    """One in-flight graph run whose events are replayed to every subscriber."""
+
+    def __init__(self):
+        self.events: List[dict] = []
+        self.done = False
+        self.subscribers = 0
+        self.changed = asyncio.Condition()
+        self.task: Optional[asyncio.Task] = None
+
+    async def publish(self, event: Optional[dict]):
+        async with self.changed:
+            if event is None:
+                self.done = True
+            else:
+                self.events.append(event)
+            self.changed.notify_all()
+
+
+class SingleFlight:
+    """Coalesces concurrent identical chat requests onto one graph run."""
+
+    def __init__(self):
+        self.flights = 0
+        self.coalesced = 0
+        self.peak_subscribers = 0
+        self._in_flight: Dict[str, _Flight] = {}
+
+    @staticmethod
+    def make_key(state: InputState) -> str:
+        query = " ".join(state.query.lower().split())
+        category = getattr(state.category, "value", state.category)
+        # The graph only sees the history format_chat_history keeps
+        history = format_chat_history(state.chat_history) if state.chat_history else ""
+        payload = json.dumps(
+            [query, category, state.filters, history], sort_keys=True, default=str
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _remove(self, key: str, flight: _Flight):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+    async def _run(
+        self,
+        key: str,
+        flight: _Flight,
+        run: Callable[[InputState], AsyncIterator[dict]],
+        state: InputState,
+    ):
+        try:
+            async for event in run(state):
+                await flight.publish(event)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in coalesced graph run: {str(e)}")
+            await flight.publish(
+                {
+                    "event": "error",
+                    "data": {
+                        "error": str(e),
+                        "message": "An error occurred during processing",
+                        "timestamp": time.time(),
+                    },
+                }
+            )
+        finally:
+            self._remove(key, flight)
+            await flight.publish(None)
+
+    async def stream(
+        self, state: InputState, run: Callable[[InputState], AsyncIterator[dict]]
+    ) -> AsyncIterator[dict]:
+        key = self.make_key(state)
+        flight = self._in_flight.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._in_flight[key] = flight
+            flight.task = asyncio.create_task(self._run(key, flight, run, state))
+            self.flights += 1
+        else:
+            self.coalesced += 1
+            logger.info(f"Joined in-flight run for query: {state.query}")
+
+        flight.subscribers += 1
+        self.peak_subscribers = max(self.peak_subscribers, flight.subscribers)
+        try:
+            sent = 0
+            while True:
+                async with flight.changed:
+                    await flight.changed.wait_for(
+                        lambda: flight.done or len(flight.events) > sent
+                    )
+                    pending = flight.events[sent:]
+                    done = flight.done
+                for event in pending:
+                    yield event
+                sent += len(pending)
+                if done and sent == len(flight.events):
+                    return
+        finally:
+            flight.subscribers -= 1
+            # Nobody is listening anymore, stop spending LLM calls on it
+            if flight.subscribers == 0 and not flight.done:
+                flight.task.cancel()
+                self._remove(key, flight)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "flights": self.flights,
+            "coalesced_requests": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "peak_subscribers": self.peak_subscribers,
+        }
+
+
+# Global coalescer instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
+
+
+async def coalesced_stream(
+    state: InputState, run: Callable[[InputState], AsyncIterator[dict]]
+) -> AsyncIterator[dict]:
+    """Stream run(state), sharing one run between concurrent identical requests."""
+    if not SINGLE_FLIGHT_ENABLED:
+        async for event in run(state):
+            yield event
+        return
+
+    async for event in get_single_flight().stream(state, run):
+        yield event
+
+
+def get_single_flight_stats() -> Dict[str, int]:
+    return get_single_flight().stats()
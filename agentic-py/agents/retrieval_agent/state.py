@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from langchain_core.messages import ChatMessage
 from agents.embedding_agent.state import Category
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
@@ -19,6 +19,9 @@ class InputState(BaseModel):
     query: str = ""
     chat_history: List[ChatMessage] = []
     category: Optional[Category] = "other"
+    filters: Dict[str, Union[str, List[str]]] = {}
+    # Set by the answer cache, reused by research for the raw query
+    query_embedding: Optional[List[float]] = None
 
 
 class OutputState(BaseModel):
@@ -30,3 +33,4 @@ class RetrievalAgentState(InputState, OutputState):
     routing_decision: str = ""
     routing_reasoning: str = ""
     retrieved_documents: List[ProcessedVectorDocument] = []
+    research_completed: bool = False
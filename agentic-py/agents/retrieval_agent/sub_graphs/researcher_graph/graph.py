@@ -7,15 +7,22 @@ from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.node import (
     generate_queries,
 )
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.embed_queries.node import (
+    embed_queries,
+)
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.node import (
     run_retrieval,
 )
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.filter_chunks.node import (
     filter_chunks,
 )
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.rerank_chunks.node import (
+    rerank_chunks,
+)
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
     parallel_retriever_router,
 )
+from agents.common.metrics import timed_node
 
 
 def create_graph() -> StateGraph:
@@ -25,14 +32,18 @@ def create_graph() -> StateGraph:
         output_schema=ResearcherGraphOutputState,
     )
 
-    graph.add_node("generate_queries", generate_queries)
-    graph.add_node("run_retrieval", run_retrieval)
-    graph.add_node("filter_chunks", filter_chunks)
+    graph.add_node("generate_queries", timed_node("researcher", generate_queries))
+    graph.add_node("embed_queries", timed_node("researcher", embed_queries))
+    graph.add_node("run_retrieval", timed_node("researcher", run_retrieval))
+    graph.add_node("filter_chunks", timed_node("researcher", filter_chunks))
+    graph.add_node("rerank_chunks", timed_node("researcher", rerank_chunks))
 
     graph.add_edge(START, "generate_queries")
-    graph.add_conditional_edges("generate_queries", parallel_retriever_router)
+    graph.add_edge("generate_queries", "embed_queries")
+    graph.add_conditional_edges("embed_queries", parallel_retriever_router)
     graph.add_edge("run_retrieval", "filter_chunks")
-    graph.add_edge("filter_chunks", END)
+    graph.add_edge("filter_chunks", "rerank_chunks")
+    graph.add_edge("rerank_chunks", END)
     return graph
 
 
@@ -0,0 +1,36 @@
+from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
+    ResearcherGraphState,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
+    get_retrieval_vector_store,
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def embed_queries(state: ResearcherGraphState) -> ResearcherGraphState:
+    """Embed every generated query in one request before the retrieval fan-out."""
+    if not state.queries:
+        return state
+
+    # The raw message (searched as written) may already be embedded
+    known = {}
+    if state.query_embedding is not None:
+        known[state.user_message] = state.query_embedding
+    missing = list(dict.fromkeys(query for query in state.queries if query not in known))
+
+    logger.info(f"Embedding {len(missing)} of {len(state.queries)} queries")
+    try:
+        if missing:
+            vector_store = get_retrieval_vector_store()
+            embedded = await vector_store.embeddings.aembed_documents(missing)
+            known.update(zip(missing, embedded))
+        state.query_embeddings = [known[query] for query in state.queries]
+        return state
+
+    except Exception as e:
+        # run_retrieval embeds each query itself when this is empty
+        logger.error(f"Error in embedding queries: {str(e)}")
+        state.query_embeddings = []
+        return state
@@ -3,20 +3,35 @@ from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
 )
 from typing import List
 import heapq
+import os
 import logging
+from agents.common.metrics import CHUNKS
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
     ProcessedVectorDocument,
 )
 
 
 THRESHOLD_SCORE = 0.5
-MAX_CHUNKS_TO_RETURN = 5
+# Candidate pool handed to rerank_chunks, which trims it to RERANK_TOP_K
+MAX_CHUNKS_TO_RETURN = int(os.getenv("RERANK_CANDIDATES", 20))
 
 logger = logging.getLogger(__name__)
 
 
-def filter_chunks(state: ResearcherGraphState) -> ResearcherGraphState:
-    print("Filtering chunks")
+def _rank_score(chunk: ProcessedVectorDocument) -> float:
+    # Fused rank when hybrid retrieval is on, vector similarity otherwise
+    metadata = chunk["metadata"]
+    return metadata.get("fusion_score", metadata["similarity_score"])
+
+
+def _is_relevant(chunk: ProcessedVectorDocument) -> bool:
+    # BM25 matches are kept even when their vector similarity is low
+    metadata = chunk["metadata"]
+    return metadata["similarity_score"] > THRESHOLD_SCORE or "lexical_score" in metadata
+
+
+async def filter_chunks(state: ResearcherGraphState) -> ResearcherGraphState:
+    logger.info("Filtering chunks")
 
     try:
         chunks = state.retrieved_documents
@@ -26,11 +41,8 @@ def filter_chunks(state: ResearcherGraphState) -> ResearcherGraphState:
             if not chunk_id:
                 continue
 
-            current_score = chunk["metadata"]["similarity_score"]
-            if (
-                chunk_id not in unique_chunks
-                or current_score
-                > unique_chunks[chunk_id]["metadata"]["similarity_score"]
+            if chunk_id not in unique_chunks or _rank_score(chunk) > _rank_score(
+                unique_chunks[chunk_id]
             ):
                 unique_chunks[chunk_id] = chunk
 
@@ -39,12 +51,13 @@ def filter_chunks(state: ResearcherGraphState) -> ResearcherGraphState:
             for c in heapq.nlargest(
                 MAX_CHUNKS_TO_RETURN,
                 unique_chunks.values(),
-                key=lambda x: x["metadata"]["similarity_score"],
+                key=_rank_score,
             )
-            if c["metadata"]["similarity_score"] > THRESHOLD_SCORE
+            if _is_relevant(c)
         ]
 
-        print(f"Filtered {len(final_documents)} chunks")
+        logger.info(f"Filtered {len(final_documents)} chunks")
+        CHUNKS.observe(len(final_documents), "filtered")
 
         state.final_documents = final_documents
 
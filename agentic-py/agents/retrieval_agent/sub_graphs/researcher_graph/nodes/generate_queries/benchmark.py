@@ -0,0 +1,87 @@
+"""Compare recall@k and research latency of the query expansion modes.
+
+Uses the labelled query file of the rerank benchmark, one JSON per line:
+    {"query": "...", "relevant_article_ids": ["art_...", ...], "category": "sports"}
+
+Every query runs through the researcher graph once per mode, and recall
+counts the relevant articles among the final documents.
+
+Run with:
+python -m agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.benchmark \
+    --labels data/rerank_labels.jsonl
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from collections import Counter
+from typing import Dict, List
+
+import dotenv
+
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.nodes.conduct_research.node import researcher_graph
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.expansion import (
+    MODES,
+    get_expansion_config,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.rerank_chunks.rerankers import (
+    get_rerank_config,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
+    ResearcherGraphInputState,
+)
+from agents.retrieval_agent.utils.utils import format_chat_history
+
+dotenv.load_dotenv()
+
+
+def percentile(timings: List[float], q: float) -> float:
+    return sorted(timings)[max(0, int(len(timings) * q) - 1)]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", required=True)
+    parser.add_argument("--modes", default=",".join(MODES), help="Comma-separated")
+    args = parser.parse_args()
+
+    with open(args.labels) as f:
+        labels = [json.loads(line) for line in f if line.strip()]
+
+    k = get_rerank_config().top_k
+    config = get_expansion_config()
+    config.log_decisions = False
+    for mode in args.modes.split(","):
+        config.mode = mode
+        recalls: List[float] = []
+        timings: List[float] = []
+        decisions: Dict[str, int] = Counter()
+        for label in labels:
+            start = time.perf_counter()
+            output = await researcher_graph.ainvoke(
+                ResearcherGraphInputState(
+                    user_message=label["query"],
+                    formatted_chat_history=format_chat_history([]),
+                    category=Category(label.get("category", Category.OTHER.value)),
+                )
+            )
+            timings.append(time.perf_counter() - start)
+            if output.get("expansion"):
+                decisions[output["expansion"].decision] += 1
+            found = {doc["metadata"]["article_id"] for doc in output["final_documents"]}
+            relevant = set(label["relevant_article_ids"])
+            recalls.append(len(found & relevant) / len(relevant))
+
+        print(
+            f"{mode:<9} recall@{k} {statistics.mean(recalls):.3f}  "
+            f"research p50 {percentile(timings, 0.5) * 1000:7.0f} ms  "
+            f"p95 {percentile(timings, 0.95) * 1000:7.0f} ms  "
+            f"decisions {dict(decisions)}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,200 @@
+"""Decide how many LLM query expansions a research request needs.
+
+In "always" mode every request gets `max_queries` generated queries. In
+"adaptive" mode a cheap specificity heuristic sends precise, headline-style
+questions straight to retrieval with the raw user message, and gives vague
+ones between 1 and `max_queries` expansions, more the vaguer they are.
+
+Each request's decision and research latency can be appended to a log.
+It stores raw user queries, so it is opt-in (QUERY_EXPANSION_LOG_ENABLED=true)
+and rotated at QUERY_EXPANSION_LOG_MAX_BYTES.
+    python -m agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.expansion
+reports request counts and latency per decision.
+"""
+
+import logging
+import math
+import os
+import re
+import statistics
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import dotenv
+
+from agents.common.bm25 import tokenize
+from agents.common.storage import append_jsonl, read_jsonl
+
+dotenv.load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+QUERY_EXPANSION_LOG_FILE = "query_expansion_log.jsonl"
+
+MODES = ("always", "adaptive")
+
+# Content words at which a query counts as fully specific on length alone
+_SPECIFIC_WORD_COUNT = 8
+
+# Words that ask for "something" rather than name it
+_VAGUE_WORDS = frozenset(
+    """
+    news latest update updates happening happened going anything everything
+    something stuff things info information recent recently current today
+    """.split()
+)
+
+# Relative time periods, which only the expansion call turns into a publish window
+_TIME_PERIOD_RE = re.compile(
+    r"\b(today|tonight|yesterday|tomorrow|this (morning|week|month|year|weekend)"
+    r"|last (night|week|month|year|weekend)|past (few )?(days|weeks|months)"
+    r"|january|february|march|april|may|june|july|august|september|october"
+    r"|november|december)\b",
+    re.IGNORECASE,
+)
+_ENTITY_RE = re.compile(r"(?<!^)(?<![.?!] )\b[A-Z][\w'-]+")
+_NUMBER_OR_QUOTE_RE = re.compile(r"\d|\"[^\"]+\"")
+
+
+@dataclass
+class QueryExpansionConfig:
+    mode: str = "always"  # "always" or "adaptive"
+    max_queries: int = 3
+    min_specificity: float = 0.6  # adaptive: at or above this the raw message is searched
+    log_decisions: bool = False  # append decisions (raw queries) with research latency
+    log_max_bytes: int = 10_000_000  # the log is rotated once past this size
+
+
+def _get_config_from_env() -> QueryExpansionConfig:
+    config = QueryExpansionConfig()
+    config.mode = os.getenv("QUERY_EXPANSION_MODE", config.mode).lower()
+    if config.mode not in MODES:
+        raise ValueError(
+            f"QUERY_EXPANSION_MODE must be 'always' or 'adaptive', got {config.mode!r}"
+        )
+    config.max_queries = int(
+        os.getenv("QUERY_EXPANSION_MAX_QUERIES", config.max_queries)
+    )
+    config.min_specificity = float(
+        os.getenv("QUERY_EXPANSION_MIN_SPECIFICITY", config.min_specificity)
+    )
+    config.log_decisions = os.getenv(
+        "QUERY_EXPANSION_LOG_ENABLED", "false"
+    ).lower() in ("1", "true", "yes")
+    config.log_max_bytes = int(
+        os.getenv("QUERY_EXPANSION_LOG_MAX_BYTES", config.log_max_bytes)
+    )
+    return config
+
+
+@dataclass
+class ExpansionDecision:
+    mode: str
+    decision: str  # "direct" (raw message only) or "expand"
+    query_count: int  # LLM queries to generate, 0 when direct
+    specificity: Optional[float] = None
+
+
+def specificity(query: str) -> float:
+    """0 for vague queries up to 1 for long ones naming entities, numbers or quotes."""
+    words = tokenize(query)
+    content_words = [word for word in words if word not in _VAGUE_WORDS]
+    vague_words = len(words) - len(content_words)
+
+    score = 0.5 * min(len(content_words) / _SPECIFIC_WORD_COUNT, 1.0)
+    score += 0.3 * min(len(_ENTITY_RE.findall(query.strip())) / 2, 1.0)
+    score += 0.2 if _NUMBER_OR_QUOTE_RE.search(query) else 0.0
+    score -= 0.15 * vague_words
+    return max(0.0, min(score, 1.0))
+
+
+def decide_expansion(
+    user_message: str, has_chat_history: bool, config: QueryExpansionConfig
+) -> ExpansionDecision:
+    if config.mode == "always":
+        return ExpansionDecision("always", "expand", config.max_queries)
+
+    score = specificity(user_message)
+    # Follow-ups need rewriting with the chat history, and time periods need the
+    # publish window the expansion call extracts, so both keep at least one call
+    needs_llm = has_chat_history or _TIME_PERIOD_RE.search(user_message)
+    if score >= config.min_specificity and not needs_llm:
+        return ExpansionDecision("adaptive", "direct", 0, score)
+
+    vagueness = 1 - min(score / config.min_specificity, 1.0)
+    query_count = max(1, math.ceil(vagueness * config.max_queries))
+    return ExpansionDecision("adaptive", "expand", query_count, score)
+
+
+# Global config instance
+_expansion_config: Optional[QueryExpansionConfig] = None
+
+
+def get_expansion_config() -> QueryExpansionConfig:
+    global _expansion_config
+    if _expansion_config is None:
+        _expansion_config = _get_config_from_env()
+        logger.info(f"Query expansion mode: {_expansion_config.mode}")
+    return _expansion_config
+
+
+def log_expansion(
+    query: str,
+    decision: ExpansionDecision,
+    queries: List[str],
+    latency_ms: float,
+    document_count: int,
+):
+    """Append one request's expansion decision and research latency.
+
+    Blocking file I/O, call it from a worker thread.
+    """
+    config = get_expansion_config()
+    if not config.log_decisions:
+        return
+    entry = {
+        "query": query,
+        "mode": decision.mode,
+        "decision": decision.decision,
+        "specificity": (
+            round(decision.specificity, 3) if decision.specificity is not None else None
+        ),
+        "queries": len(queries),
+        "latency_ms": round(latency_ms, 1),
+        "documents": document_count,
+        "timestamp": time.time(),
+    }
+    try:
+        append_jsonl(QUERY_EXPANSION_LOG_FILE, entry, config.log_max_bytes)
+    except OSError as e:
+        logger.warning(f"Failed to log query expansion decision: {e}")
+
+
+def load_expansion_log() -> List[dict]:
+    return read_jsonl(QUERY_EXPANSION_LOG_FILE)
+
+
+def report():
+    groups = defaultdict(list)
+    for entry in load_expansion_log():
+        groups[(entry["mode"], entry["decision"])].append(entry)
+    if not groups:
+        print("No logged research requests")
+        return
+
+    total = sum(len(entries) for entries in groups.values())
+    for (mode, decision), entries in sorted(groups.items()):
+        latencies = sorted(entry["latency_ms"] for entry in entries)
+        print(
+            f"{mode:<9} {decision:<7} {len(entries):6d} requests ({len(entries) / total:6.1%})  "
+            f"queries {statistics.mean(entry['queries'] for entry in entries):.1f}  "
+            f"research p50 {statistics.median(latencies):7.0f} ms  "
+            f"p95 {latencies[max(0, int(len(latencies) * 0.95) - 1)]:7.0f} ms  "
+            f"documents {statistics.mean(entry['documents'] for entry in entries):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    report()
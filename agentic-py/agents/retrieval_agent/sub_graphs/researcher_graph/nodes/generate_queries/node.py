@@ -1,21 +1,59 @@
 from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
     ResearcherGraphState,
 )
-from agents.retrieval_agent.utils.utils import get_llm
+from agents.retrieval_agent.utils.utils import format_chat_history, get_llm
 import logging
+from datetime import date, datetime, time, timezone
+from typing import Optional
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.schemas import (
     RetrievalQueriesOutputType,
 )
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.prompts import (
     GENERATE_DIVERSE_QUERIES_PROMPT,
 )
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.expansion import (
+    decide_expansion,
+    get_expansion_config,
+)
 
 logger = logging.getLogger(__name__)
 
 
-def generate_queries(state: ResearcherGraphState) -> ResearcherGraphState:
+def parse_date_bound(value: Optional[str], end_of_day: bool = False) -> Optional[int]:
+    """Epoch seconds of the start (or end) of a YYYY-MM-DD day, in UTC."""
+    if not value:
+        return None
+    try:
+        day = date.fromisoformat(value[:10])
+    except ValueError:
+        logger.warning(f"Ignoring invalid date from query generation: {value}")
+        return None
+    bound = datetime.combine(day, time.max if end_of_day else time.min, timezone.utc)
+    return int(bound.timestamp())
+
+
+async def generate_queries(state: ResearcherGraphState) -> ResearcherGraphState:
     logger.info("Generating queries")
     try:
+        state.expansion = decide_expansion(
+            state.user_message,
+            has_chat_history=state.formatted_chat_history != format_chat_history([]),
+            config=get_expansion_config(),
+        )
+        logger.info(
+            f"Query expansion: {state.expansion.mode}/{state.expansion.decision}, "
+            f"{state.expansion.query_count} queries"
+            + (
+                f", specificity {state.expansion.specificity:.2f}"
+                if state.expansion.specificity is not None
+                else ""
+            )
+        )
+        if state.expansion.decision == "direct":
+            # Precise enough to search as written, no expansion call
+            state.queries = [state.user_message]
+            return state
+
         llm = get_llm(model_name="gemini-2.5-flash-lite", temperature=0.7)
         structured_llm = llm.with_structured_output(RetrievalQueriesOutputType)
 
@@ -23,15 +61,27 @@ def generate_queries(state: ResearcherGraphState) -> ResearcherGraphState:
             user_message=state.user_message,
             chat_history=state.formatted_chat_history,
             category=state.category,
+            current_date=datetime.now(timezone.utc).date().isoformat(),
+            query_count=state.expansion.query_count,
         )
 
         logger.info("User query: " + state.user_message)
 
-        queries_result: RetrievalQueriesOutputType = structured_llm.invoke(prompt)
-        queries = queries_result.chunk_queries[:3]
+        queries_result: RetrievalQueriesOutputType = await structured_llm.ainvoke(prompt)
+        queries = queries_result.chunk_queries[: state.expansion.query_count]
 
         state.queries = queries
 
+        # Time window extracted in the same call, pushed down as a range filter
+        state.published_after = parse_date_bound(queries_result.published_after)
+        state.published_before = parse_date_bound(
+            queries_result.published_before, end_of_day=True
+        )
+        if state.published_after or state.published_before:
+            logger.info(
+                f"Time window: {queries_result.published_after} - {queries_result.published_before}"
+            )
+
         return state
 
     except Exception as e:
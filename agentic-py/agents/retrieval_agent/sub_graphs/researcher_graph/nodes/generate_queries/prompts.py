@@ -2,27 +2,38 @@ from langchain_core.prompts import PromptTemplate
 
 
 GENERATE_DIVERSE_QUERIES_PROMPT = PromptTemplate(
-    input_variables=["user_message", "chat_history", "category"],
+    input_variables=[
+        "user_message",
+        "chat_history",
+        "category",
+        "current_date",
+        "query_count",
+    ],
     template="""
     Role: Expert News Analyst and Query Generator
     Task: Query Expansion for RAG Retrieval on News Articles
     
-    Analyze the user's message and the chat history, and generate 3 diverse queries optimized for retrieving from vector db.
+    Analyze the user's message and the chat history, and generate {query_count} diverse queries optimized for retrieving from vector db.
     You are given the user's message, the chat history, and the category.
     You have extensive knowledge of news articles and you are able to generate queries that will retrieve the most relevant news articles.
     
     Hard Constraints:
-    - Exactly 3 queries.
+    - Exactly {query_count} queries.
     - Each query 5–12 words.
     - No numbering, bullets, quotes, labels, or extra text.
     - No punctuation except spaces.
-    - Queries must be complementary, not redundant.
+    - When there is more than one, queries must be complementary, not redundant.
     - Queries must be in the same language as the user's message.
     
+    Time Period:
+    - If the user's message (or the chat history it follows up on) refers to a time period, such as "today", "this week", "last month" or "in March", set published_after and published_before to its first and last day (YYYY-MM-DD), relative to the current date.
+    - Leave both empty when no time period is mentioned.
+    
+    Current Date: {current_date}
     User Message: {user_message}
     Chat History: {chat_history}
     Category: {category}
     
-    Return the 3 diverse queries optimized for retrieving from vector db.
+    Return the {query_count} diverse queries optimized for retrieving from vector db, and the time period if any.
     """,
 )
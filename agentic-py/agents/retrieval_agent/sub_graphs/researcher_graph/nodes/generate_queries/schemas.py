@@ -1,10 +1,17 @@
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 
 class RetrievalQueriesOutputType(BaseModel):
     chunk_queries: List[str] = Field(
-        description="Exactly 3 diverse queries optimized for retrieving from vector db",
-        min_length=3,
-        max_length=3,
+        description="The requested number of diverse queries optimized for retrieving from vector db",
+        min_length=1,
+    )
+    published_after: Optional[str] = Field(
+        default=None,
+        description="Start date (YYYY-MM-DD) of the time period the user asks about, if any",
+    )
+    published_before: Optional[str] = Field(
+        default=None,
+        description="End date (YYYY-MM-DD) of the time period the user asks about, if any",
     )
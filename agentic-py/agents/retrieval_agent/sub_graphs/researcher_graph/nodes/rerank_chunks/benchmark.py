@@ -0,0 +1,102 @@
+"""Measure recall@k and added latency of each reranker.
+
+Needs a JSONL file of labelled queries, one per line:
+    {"query": "...", "relevant_article_ids": ["art_...", ...], "category": "sports"}
+
+Each query retrieves `--candidates` chunks once. Every reranker then picks
+the top-k from that pool, and recall@k counts the relevant articles among
+them. "none" is the vector ranking filter_chunks used on its own.
+
+Run with:
+python -m agents.retrieval_agent.sub_graphs.researcher_graph.nodes.rerank_chunks.benchmark \
+    --labels data/rerank_labels.jsonl
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+import dotenv
+
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.rerank_chunks.rerankers import (
+    Reranker,
+    create_reranker,
+    get_rerank_config,
+    rerank,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
+    build_search_filter,
+    get_retrieval_vector_store,
+    process_chunk_document,
+)
+
+dotenv.load_dotenv()
+
+
+def percentile(timings: List[float], q: float) -> float:
+    return sorted(timings)[max(0, int(len(timings) * q) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--labels", required=True)
+    parser.add_argument("--candidates", type=int, default=30)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument(
+        "--rerankers", default="none,bm25,cross_encoder", help="Comma-separated"
+    )
+    args = parser.parse_args()
+
+    with open(args.labels) as f:
+        labels = [json.loads(line) for line in f if line.strip()]
+
+    config = get_rerank_config()
+    rerankers: Dict[str, Reranker] = {}
+    for name in args.rerankers.split(","):
+        if name == "cross_encoder":
+            try:
+                from sentence_transformers import CrossEncoder  # noqa: F401
+            except ImportError:
+                print("sentence-transformers is not installed, skipping cross_encoder")
+                continue
+        config.reranker = name
+        rerankers[name] = create_reranker(config)
+
+    recalls: Dict[str, List[float]] = {name: [] for name in rerankers}
+    timings: Dict[str, List[float]] = {name: [] for name in rerankers}
+    for label in labels:
+        category = Category(label.get("category", Category.OTHER.value))
+        vector_store = get_retrieval_vector_store(category)
+        embedding = vector_store.embeddings.embed_query(label["query"])
+        results = vector_store.similarity_search_by_vector_with_score(
+            embedding, k=args.candidates, filter=build_search_filter(category)
+        )
+        candidates = [
+            candidate
+            for candidate in (process_chunk_document(doc, score) for doc, score in results)
+            if candidate is not None
+        ]
+        relevant = set(label["relevant_article_ids"])
+
+        for name, reranker in rerankers.items():
+            start = time.perf_counter()
+            # No budget, to measure what the full pass costs
+            top = rerank(label["query"], candidates, reranker, args.k, float("inf"))
+            timings[name].append(time.perf_counter() - start)
+            found = {doc["metadata"]["article_id"] for doc in top}
+            recalls[name].append(len(found & relevant) / len(relevant))
+
+    print(f"{len(labels)} queries, {args.candidates} candidates, k={args.k}")
+    for name in rerankers:
+        print(
+            f"{name:<14} recall@{args.k} {statistics.mean(recalls[name]):.3f}  "
+            f"added p50 {percentile(timings[name], 0.5) * 1000:7.2f} ms  "
+            f"p95 {percentile(timings[name], 0.95) * 1000:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
+    ResearcherGraphState,
+)
+import asyncio
+import logging
+import time
+from agents.common.metrics import CHUNKS
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.rerank_chunks.rerankers import (
+    get_rerank_config,
+    get_reranker,
+    rerank,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def rerank_chunks(state: ResearcherGraphState) -> ResearcherGraphState:
+    candidates = state.final_documents or []
+    config = get_rerank_config()
+
+    try:
+        start_time = time.perf_counter()
+        # CPU-bound scoring runs off the event loop
+        state.final_documents = await asyncio.to_thread(
+            rerank,
+            state.user_message,
+            candidates,
+            get_reranker(),
+            config.top_k,
+            config.budget_ms,
+        )
+        CHUNKS.observe(len(state.final_documents), "reranked")
+        logger.info(
+            f"Reranked {len(candidates)} candidates to {len(state.final_documents)} "
+            f"in {(time.perf_counter() - start_time) * 1000:.1f} ms"
+        )
+        return state
+
+    except Exception as e:
+        logger.error(f"Error in reranking chunks: {str(e)}")
+        # filter_chunks ordered the candidates best first
+        state.final_documents = candidates[: config.top_k]
+        return state
@@ -0,0 +1,156 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from agents.common.bm25 import bm25_scores
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
+    ProcessedVectorDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RerankConfig:
+    reranker: str = "bm25"  # "bm25", "cross_encoder" or "none"
+    top_k: int = 5
+    budget_ms: float = 50  # candidates not scored in time keep their retrieval rank
+    bm25_weight: float = 0.5  # blend with the vector similarity score
+    cross_encoder_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    batch_size: int = 16
+
+
+def _get_config_from_env() -> RerankConfig:
+    config = RerankConfig()
+    config.reranker = os.getenv("RERANKER", config.reranker).lower()
+    config.top_k = int(os.getenv("RERANK_TOP_K", config.top_k))
+    config.budget_ms = float(os.getenv("RERANK_BUDGET_MS", config.budget_ms))
+    config.bm25_weight = float(os.getenv("RERANK_BM25_WEIGHT", config.bm25_weight))
+    config.cross_encoder_model = os.getenv(
+        "RERANK_CROSS_ENCODER_MODEL", config.cross_encoder_model
+    )
+    config.batch_size = int(os.getenv("RERANK_BATCH_SIZE", config.batch_size))
+    return config
+
+
+class Reranker:
+    """Scores candidates for a query, returning None for ones not scored by the deadline."""
+
+    name = "none"
+
+    def score(
+        self, query: str, documents: List[ProcessedVectorDocument], deadline: float
+    ) -> List[Optional[float]]:
+        return [None] * len(documents)
+
+
+class BM25Reranker(Reranker):
+    """Lexical BM25 over the candidate texts blended with the vector score."""
+
+    name = "bm25"
+
+    def __init__(self, bm25_weight: float):
+        self.bm25_weight = bm25_weight
+
+    def score(self, query, documents, deadline):
+        lexical = bm25_scores(query, [doc["content"] for doc in documents])
+        top = max(lexical, default=0) or 1.0
+        return [
+            self.bm25_weight * score / top
+            + (1 - self.bm25_weight) * doc["metadata"]["similarity_score"]
+            for score, doc in zip(lexical, documents)
+        ]
+
+
+class CrossEncoderReranker(Reranker):
+    """Small cross-encoder run on CPU in batches, best retrieved candidates first."""
+
+    name = "cross_encoder"
+
+    def __init__(self, model_name: str, batch_size: int):
+        # Optional dependency, only needed when this reranker is configured
+        from sentence_transformers import CrossEncoder
+
+        self.model = CrossEncoder(model_name, device="cpu")
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+
+    def score(self, query, documents, deadline):
+        scores: List[Optional[float]] = [None] * len(documents)
+        for start in range(0, len(documents), self.batch_size):
+            if time.perf_counter() >= deadline:
+                break
+            batch = range(start, min(start + self.batch_size, len(documents)))
+            with self._lock:
+                predictions = self.model.predict(
+                    [(query, documents[i]["content"]) for i in batch]
+                )
+            for i, prediction in zip(batch, predictions):
+                scores[i] = float(prediction)
+        return scores
+
+
+# Global reranker instance
+_reranker: Optional[Reranker] = None
+_rerank_config: Optional[RerankConfig] = None
+
+
+def get_rerank_config() -> RerankConfig:
+    global _rerank_config
+    if _rerank_config is None:
+        _rerank_config = _get_config_from_env()
+    return _rerank_config
+
+
+def create_reranker(config: RerankConfig) -> Reranker:
+    if config.reranker == "cross_encoder":
+        try:
+            return CrossEncoderReranker(config.cross_encoder_model, config.batch_size)
+        except ImportError:
+            logger.warning(
+                "sentence-transformers is not installed, falling back to BM25 reranking"
+            )
+            return BM25Reranker(config.bm25_weight)
+    if config.reranker == "bm25":
+        return BM25Reranker(config.bm25_weight)
+    if config.reranker != "none":
+        raise ValueError(
+            f"RERANKER must be 'bm25', 'cross_encoder' or 'none', got {config.reranker!r}"
+        )
+    return Reranker()
+
+
+def get_reranker() -> Reranker:
+    global _reranker
+    if _reranker is None:
+        _reranker = create_reranker(get_rerank_config())
+        logger.info(f"Reranker initialized: {_reranker.name}")
+    return _reranker
+
+
+def rerank(
+    query: str,
+    documents: List[ProcessedVectorDocument],
+    reranker: Reranker,
+    top_k: int,
+    budget_ms: float,
+) -> List[ProcessedVectorDocument]:
+    """Top-k documents by reranker score; unscored ones follow in retrieval order.
+
+    `documents` come best first from filter_chunks.
+    """
+    deadline = time.perf_counter() + budget_ms / 1000
+    scores = reranker.score(query, documents, deadline)
+    ranked = sorted(
+        range(len(documents)),
+        key=lambda i: (
+            scores[i] is not None,
+            scores[i] if scores[i] is not None else 0.0,
+            -i,
+        ),
+        reverse=True,
+    )
+    return [documents[i] for i in ranked[:top_k]]
@@ -0,0 +1,100 @@
+"""Measure search latency and recall with and without the category filter.
+
+The reference result for a query is the category's top-k taken from a wide
+unfiltered search (`--candidates`), i.e. what post-filtering would find.
+Without pushdown the plain top-k often holds other categories' chunks, so its
+recall against that reference is what requests got before the filter.
+
+Run with:
+python -m agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.benchmark \
+    --category sports --query "transfer window deadline day signings"
+"""
+
+import argparse
+import statistics
+import time
+from typing import List
+
+import dotenv
+
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.node import (
+    MAX_RESULTS_PER_QUERY,
+)
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
+    build_search_filter,
+    get_retrieval_vector_store,
+)
+
+dotenv.load_dotenv()
+
+DEFAULT_QUERIES = [
+    "latest election results and reactions",
+    "central bank interest rate decision",
+    "new smartphone launch and reviews",
+    "champions league match report",
+    "climate change research findings",
+]
+
+
+def percentile(timings: List[float], q: float) -> float:
+    return sorted(timings)[max(0, int(len(timings) * q) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--category", required=True, choices=[c.value for c in Category])
+    parser.add_argument("--query", action="append", dest="queries")
+    parser.add_argument("--k", type=int, default=MAX_RESULTS_PER_QUERY)
+    parser.add_argument("--candidates", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    queries = args.queries or DEFAULT_QUERIES
+    category = Category(args.category)
+    search_filter = build_search_filter(category)
+
+    vector_store = get_retrieval_vector_store(category)
+    embeddings = vector_store.embeddings.embed_documents(queries)
+
+    timings = {"unfiltered": [], "filtered": []}
+    recalls = {"unfiltered": [], "filtered": []}
+    for embedding in embeddings:
+        # Category's top-k out of a wide unfiltered search
+        wide = vector_store.similarity_search_by_vector_with_score(
+            embedding, k=args.candidates
+        )
+        in_category = [
+            doc
+            for doc, _ in wide
+            if search_filter is None or doc.metadata.get("category") == category.value
+        ]
+        reference = {doc.metadata.get("chunk_id") for doc in in_category[: args.k]}
+
+        for name, kwargs in (
+            ("unfiltered", {}),
+            ("filtered", {"filter": search_filter}),
+        ):
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                results = vector_store.similarity_search_by_vector_with_score(
+                    embedding, k=args.k, **kwargs
+                )
+                timings[name].append(time.perf_counter() - start)
+            if reference:
+                found = {doc.metadata.get("chunk_id") for doc, _ in results}
+                recalls[name].append(len(found & reference) / len(reference))
+
+    print(f"{len(queries)} queries, category {category.value}, k={args.k}")
+    for name in ("unfiltered", "filtered"):
+        recall = statistics.mean(recalls[name]) if recalls[name] else float("nan")
+        print(
+            f"{name:<12} "
+            f"p50 {percentile(timings[name], 0.5) * 1000:8.2f} ms  "
+            f"p95 {percentile(timings[name], 0.95) * 1000:8.2f} ms  "
+            f"recall@{args.k} {recall:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,79 @@
 from agents.retrieval_agent.sub_graphs.researcher_graph.state import (
     ResearcherGraphState,
 )
+import asyncio
 import logging
-from agents.common.vector_store import get_vector_store
+import os
+from typing import List, Optional
+from agents.common.metrics import CHUNKS
+from agents.embedding_agent.state import Category
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
+    ProcessedVectorDocument,
+)
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
-    process_chunk_document,
+    build_search_filter,
+    get_retrieval_vector_store,
+    asearch_by_vector,
+    asearch_lexical,
+    fuse_results,
 )
-from agents.common.vector_store import VectorStoreConfig
 
 logger = logging.getLogger(__name__)
 
-INDEX_NAME = "voosh-foods"
-EMBEDDING_DIMENSION = 1024
-EMBEDDING_MODEL_NAME = "jina-embeddings-v3"
-MAX_RESULTS_PER_QUERY = 5
+# Over-fetched per query, rerank_chunks picks the final top-k
+MAX_RESULTS_PER_QUERY = int(os.getenv("RETRIEVAL_RESULTS_PER_QUERY", 10))
+
+
+async def _search(
+    query: str,
+    query_embedding: List[float],
+    category: Optional[Category],
+    search_filter: Optional[dict],
+) -> List[ProcessedVectorDocument]:
+    # Dense and BM25 search run side by side and are fused by rank
+    vector_documents, lexical_documents = await asyncio.gather(
+        asearch_by_vector(query_embedding, category, MAX_RESULTS_PER_QUERY, search_filter),
+        asearch_lexical(query, MAX_RESULTS_PER_QUERY, search_filter),
+    )
+    return fuse_results(vector_documents, lexical_documents, MAX_RESULTS_PER_QUERY)
 
 
-def run_retrieval(state: dict) -> ResearcherGraphState:
+async def run_retrieval(state: dict) -> ResearcherGraphState:
     try:
         query = state["query"]
         category = state["category"]
 
         logger.info(f"Retrieving chunks for query: {query[:100]}...")
 
-        vector_store_config = VectorStoreConfig(
-            index_name=INDEX_NAME,
-            dimension=EMBEDDING_DIMENSION,
-            embedding_model=EMBEDDING_MODEL_NAME,
+        # Narrow the search server-side instead of filtering the top-k
+        published_after = state.get("published_after")
+        published_before = state.get("published_before")
+        search_filter = build_search_filter(
+            category, state.get("filters"), published_after, published_before
         )
 
-        vector_store = get_vector_store(vector_store_config)
-
-        documents = vector_store.similarity_search_with_score(
-            query=query, k=MAX_RESULTS_PER_QUERY
-        )
+        # Queries are embedded together by embed_queries
+        query_embedding = state.get("query_embedding")
+        if query_embedding is None:
+            query_embedding = await get_retrieval_vector_store().embeddings.aembed_query(
+                query
+            )
 
-        processed_documents = []
+        processed_documents = await _search(query, query_embedding, category, search_filter)
 
-        for doc, score in documents:
-            processed_doc = process_chunk_document(doc, score)
-            if processed_doc:
-                processed_documents.append(processed_doc)
+        if not processed_documents and (published_after or published_before):
+            # Nothing in the time window (e.g. "today" just after midnight UTC, or
+            # chunks stored before published_ts existed), widen to any time
+            logger.info("No chunks in the time window, searching without it")
+            processed_documents = await _search(
+                query,
+                query_embedding,
+                category,
+                build_search_filter(category, state.get("filters")),
+            )
 
         logger.info(f"Retrieved {len(processed_documents)} chunk documents")
+        CHUNKS.observe(len(processed_documents), "retrieved")
 
         return {"retrieved_documents": processed_documents}
 
@@ -1,4 +1,4 @@
-from typing import TypedDict, List
+from typing import TypedDict, List, NotRequired
 
 
 class VectorDocumentMetadata(TypedDict):
@@ -13,8 +13,14 @@ class VectorDocumentMetadata(TypedDict):
     category: str
     article_id: str
     source: str
+    chunk_index: NotRequired[int]
+    # Set by hybrid retrieval
+    lexical_score: NotRequired[float]
+    fusion_score: NotRequired[float]
 
 
 class ProcessedVectorDocument(TypedDict):
     content: str
     metadata: VectorDocumentMetadata
+    # Stored vector, fetched by construct_response for context packing
+    embedding: NotRequired[List[float]]
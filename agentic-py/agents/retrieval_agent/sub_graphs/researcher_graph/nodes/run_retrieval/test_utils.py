@@ -0,0 +1,41 @@
+from langchain_core.documents import Document
+
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.utils import (
+    fuse_results,
+    process_chunk_document,
+)
+
+
+def hit(chunk_id: str, **metadata) -> Document:
+    return Document(
+        page_content=f"text {chunk_id}",
+        metadata={"chunk_id": chunk_id, "article_id": f"art_{chunk_id}", **metadata},
+    )
+
+
+def test_missing_metadata_defaults_to_empty():
+    # Pinecone drops metadata fields stored as None
+    processed = process_chunk_document(hit("a", title="T", chunk_index=2.0), 0.5)
+    metadata = processed["metadata"]
+    assert metadata["title"] == "T"
+    assert metadata["authors"] == []
+    assert metadata["published_date"] == "" and metadata["source"] == ""
+    assert metadata["chunk_index"] == 2
+    assert "chunk_index" not in process_chunk_document(hit("b"), 0.5)["metadata"]
+
+
+def test_chunk_id_falls_back_to_document_id():
+    doc = Document(id="pc-1", page_content="x", metadata={"article_id": "art"})
+    assert process_chunk_document(doc, 0.1)["metadata"]["chunk_id"] == "pc-1"
+
+
+def test_fusion_skips_only_unusable_hits():
+    no_article = Document(page_content="x", metadata={"chunk_id": "orphan"})
+    no_ids = Document(page_content="y", metadata={"title": "T"})
+    vector = [(hit("a"), 0.9), (no_article, 0.8), (no_ids, 0.7), (hit("b"), 0.6)]
+    lexical = [(hit("b"), 3.0), (no_ids, 2.0), (hit("c"), 1.0)]
+
+    fused = fuse_results(vector, lexical, k=10)
+    assert [doc["metadata"]["chunk_id"] for doc in fused] == ["b", "a", "c"]
+    assert fused[0]["metadata"]["lexical_score"] == 3.0
+    assert fused[2]["metadata"]["similarity_score"] == 0.0
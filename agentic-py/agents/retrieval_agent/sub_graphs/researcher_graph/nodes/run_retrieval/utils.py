@@ -7,23 +7,161 @@ from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.sche
     VectorDocumentMetadata,
 )
 from langchain_core.documents import Document
+from langchain_core.vectorstores import VectorStore
+from agents.common.vector_store import (
+    get_vector_store,
+    get_vector_store_config,
+    asearch_shards,
+    asimilarity_search_by_vector,
+)
+from agents.common.lexical_index import get_lexical_index
+from agents.embedding_agent.state import Category
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
+# Rank offset of reciprocal-rank fusion, larger values flatten the rank weights
+RRF_K = int(os.getenv("RRF_K", 60))
+
+# Metadata fields a request may filter on besides category
+FILTERABLE_FIELDS = {
+    field.strip()
+    for field in os.getenv(
+        "RETRIEVAL_FILTER_FIELDS", "source,article_id,authors"
+    ).split(",")
+    if field.strip()
+}
+
+
+def get_retrieval_vector_store(category: Optional[Category] = None) -> VectorStore:
+    """Vector store of the category's shard, the default shard without one."""
+    vector_store_config = get_vector_store_config()
+    shard = vector_store_config.get_shard(Category(category).value if category else None)
+    return get_vector_store(vector_store_config, shard)
+
+
+async def asearch_by_vector(
+    embedding: List[float],
+    category: Optional[Category],
+    k: int,
+    search_filter: Optional[dict] = None,
+) -> List[Tuple[Document, float]]:
+    """Search the category's shard, or every shard for OTHER."""
+    vector_store_config = get_vector_store_config()
+    if vector_store_config.shards and (
+        category is None or Category(category) == Category.OTHER
+    ):
+        return await asearch_shards(
+            embedding, k, vector_store_config, filter=search_filter
+        )
+    return await asimilarity_search_by_vector(
+        get_retrieval_vector_store(category), embedding, k, search_filter
+    )
+
+
+async def asearch_lexical(
+    query: str, k: int, search_filter: Optional[dict] = None
+) -> List[Tuple[Document, float]]:
+    """BM25 search of the local lexical index, empty when hybrid retrieval is off."""
+    lexical_index = get_lexical_index()
+    if lexical_index is None:
+        return []
+    return await asyncio.to_thread(lexical_index.search, query, k, search_filter)
+
+
+def fuse_results(
+    vector_results: List[Tuple[Document, float]],
+    lexical_results: List[Tuple[Document, float]],
+    k: int,
+) -> List[ProcessedVectorDocument]:
+    """Reciprocal-rank fusion of the vector and lexical rankings."""
+    fused: Dict[str, Dict[str, Any]] = {}
+    for rank, (doc, score) in enumerate(vector_results):
+        entry = fused.setdefault(_chunk_id(doc), {"doc": doc, "fusion": 0.0})
+        entry["vector_score"] = score
+        entry["fusion"] += 1 / (RRF_K + rank + 1)
+    for rank, (doc, score) in enumerate(lexical_results):
+        entry = fused.setdefault(_chunk_id(doc), {"doc": doc, "fusion": 0.0})
+        entry["lexical_score"] = score
+        entry["fusion"] += 1 / (RRF_K + rank + 1)
+    # Unidentifiable chunks can't be fused, cited or packed
+    fused.pop(None, None)
+
+    processed_documents = []
+    for entry in sorted(fused.values(), key=lambda e: e["fusion"], reverse=True)[:k]:
+        # Lexical-only hits have no vector similarity
+        processed_doc = process_chunk_document(entry["doc"], entry.get("vector_score", 0.0))
+        if processed_doc is None:
+            continue
+        if "lexical_score" in entry:
+            processed_doc["metadata"]["lexical_score"] = entry["lexical_score"]
+        processed_doc["metadata"]["fusion_score"] = entry["fusion"]
+        processed_documents.append(processed_doc)
+    return processed_documents
+
+
+def build_search_filter(
+    category: Optional[Category],
+    filters: Optional[Dict[str, Any]] = None,
+    published_after: Optional[int] = None,
+    published_before: Optional[int] = None,
+) -> Optional[dict]:
+    """Metadata filter for the vector search, None searches the whole index."""
+    conditions = []
+    if category is not None:
+        category = Category(category)
+        # OTHER means no particular category
+        if category != Category.OTHER:
+            conditions.append({"category": {"$eq": category.value}})
+
+    for field, value in (filters or {}).items():
+        if field not in FILTERABLE_FIELDS:
+            logger.warning(f"Ignoring filter on non-filterable field: {field}")
+            continue
+        if isinstance(value, list):
+            conditions.append({field: {"$in": value}})
+        else:
+            conditions.append({field: {"$eq": value}})
+
+    published_range = {}
+    if published_after is not None:
+        published_range["$gte"] = published_after
+    if published_before is not None:
+        published_range["$lte"] = published_before
+    if published_range:
+        conditions.append({"published_ts": published_range})
+
+    if not conditions:
+        return None
+    if len(conditions) == 1:
+        return conditions[0]
+    return {"$and": conditions}
+
 
 def parallel_retriever_router(state: ResearcherGraphState):
-    print("Parallel retrieval")
+    logger.info(f"Parallel retrieval for {len(state.queries)} queries")
     try:
+        # Branches without a precomputed embedding embed their own query
+        query_embeddings = state.query_embeddings
+        if len(query_embeddings) != len(state.queries):
+            query_embeddings = [None] * len(state.queries)
+
         return [
             Send(
                 "run_retrieval",
                 {
                     "query": query,
+                    "query_embedding": query_embedding,
                     "category": state.category,
+                    "filters": state.filters,
+                    "published_after": state.published_after,
+                    "published_before": state.published_before,
                 },
             )
-            for query in state.queries
+            for query, query_embedding in zip(state.queries, query_embeddings)
         ]
 
     except Exception as e:
@@ -32,27 +170,47 @@ def parallel_retriever_router(state: ResearcherGraphState):
         return state
 
 
-def process_chunk_document(doc: Document, score: float) -> ProcessedVectorDocument:
+def _chunk_id(doc: Document) -> Optional[str]:
+    return doc.metadata.get("chunk_id") or doc.id
+
+
+def process_chunk_document(
+    doc: Document, score: float
+) -> Optional[ProcessedVectorDocument]:
+    """Search hit as a ProcessedVectorDocument, None when it can't be cited.
+
+    Pinecone drops None metadata values, so descriptive fields may be
+    missing and default to empty; only hits without a chunk or article ID
+    are skipped.
+    """
     logger.info(f"Processing chunk document: {doc.metadata}")
-    try:
-        metadata = VectorDocumentMetadata(
-            authors=doc.metadata["authors"],
-            description=doc.metadata["description"],
-            title=doc.metadata["title"],
-            url=doc.metadata["url"],
-            published_date=doc.metadata["published_date"],
-            date_download=doc.metadata["date_download"],
-            similarity_score=score,
-            chunk_id=doc.metadata["chunk_id"],
-            category=doc.metadata["category"],
-            article_id=doc.metadata["article_id"],
-            source=doc.metadata["source"],
+    chunk_id = _chunk_id(doc)
+    article_id = doc.metadata.get("article_id")
+    if not chunk_id or not article_id:
+        logger.warning(
+            f"Skipping chunk document without chunk or article ID: {doc.metadata}"
         )
+        return None
 
-        return ProcessedVectorDocument(
-            content=doc.page_content,
-            metadata=metadata,
-        )
-    except Exception as e:
-        logger.error(f"Error processing chunk document: {str(e)}")
-        raise e
+    metadata = VectorDocumentMetadata(
+        authors=doc.metadata.get("authors") or [],
+        description=doc.metadata.get("description", ""),
+        title=doc.metadata.get("title", ""),
+        url=doc.metadata.get("url", ""),
+        published_date=doc.metadata.get("published_date", ""),
+        date_download=doc.metadata.get("date_download", ""),
+        similarity_score=score,
+        chunk_id=chunk_id,
+        category=doc.metadata.get("category", ""),
+        article_id=article_id,
+        source=doc.metadata.get("source", ""),
+    )
+    # Chunks ingested before chunk_index existed don't have one
+    if doc.metadata.get("chunk_index") is not None:
+        # Pinecone returns numeric metadata as floats
+        metadata["chunk_index"] = int(doc.metadata["chunk_index"])
+
+    return ProcessedVectorDocument(
+        content=doc.page_content,
+        metadata=metadata,
+    )
@@ -1,21 +1,32 @@
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from agents.embedding_agent.state import Category
 from typing import Annotated
 import operator
 from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.run_retrieval.schemas import (
     ProcessedVectorDocument,
 )
+from agents.retrieval_agent.sub_graphs.researcher_graph.nodes.generate_queries.expansion import (
+    ExpansionDecision,
+)
 
 
 class ResearcherGraphInputState(BaseModel):
     user_message: str
     formatted_chat_history: str
     category: Optional[Category]
+    filters: Dict[str, Union[str, List[str]]] = {}
+    # Embedding of user_message when the caller already computed it
+    query_embedding: Optional[List[float]] = None
 
 
 class ResearcherGraphState(ResearcherGraphInputState):
     queries: List[str] = []
+    expansion: Optional[ExpansionDecision] = None
+    query_embeddings: List[List[float]] = []
+    # Publish time window in epoch seconds, from generate_queries
+    published_after: Optional[int] = None
+    published_before: Optional[int] = None
 
     retrieved_documents: Annotated[List[ProcessedVectorDocument], operator.add] = []
     completed_tasks: Annotated[List[str], operator.add] = []
@@ -26,3 +37,5 @@ class ResearcherGraphState(ResearcherGraphInputState):
 
 class ResearcherGraphOutputState(BaseModel):
     final_documents: List[ProcessedVectorDocument] = []
+    queries: List[str] = []
+    expansion: Optional[ExpansionDecision] = None
@@ -0,0 +1,201 @@
+import asyncio
+from typing import AsyncIterator, List
+
+from agents.retrieval_agent.single_flight import SingleFlight
+from agents.retrieval_agent.state import InputState
+
+
+class FakeRun:
+    """Graph run that yields one event per release() and records its lifecycle."""
+
+    def __init__(self, events: int = 3):
+        self.events = events
+        self.started = 0
+        self.cancelled = 0
+        self.finished = 0
+        self._steps = asyncio.Queue()
+
+    def release(self, steps: int = 1):
+        for _ in range(steps):
+            self._steps.put_nowait(None)
+
+    async def __call__(self, state: InputState) -> AsyncIterator[dict]:
+        self.started += 1
+        try:
+            for i in range(self.events):
+                await self._steps.get()
+                yield {"event": "chunk", "data": {"index": i, "query": state.query}}
+            self.finished += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+async def collect(stream: AsyncIterator[dict], into: List[dict]):
+    async for event in stream:
+        into.append(event)
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def indexes(events: List[dict]) -> List[int]:
+    return [event["data"]["index"] for event in events]
+
+
+def test_identical_requests_share_one_run():
+    async def main():
+        single_flight, run = SingleFlight(), FakeRun()
+        first, second = [], []
+        tasks = [
+            asyncio.create_task(collect(single_flight.stream(InputState(query="Q"), run), first)),
+            asyncio.create_task(
+                collect(single_flight.stream(InputState(query="  q "), run), second)
+            ),
+        ]
+        await settle()
+        run.release(3)
+        await asyncio.gather(*tasks)
+
+        assert run.started == 1 and run.finished == 1
+        assert indexes(first) == indexes(second) == [0, 1, 2]
+        assert single_flight.stats() == {
+            "flights": 1,
+            "coalesced_requests": 1,
+            "in_flight": 0,
+            "peak_subscribers": 2,
+        }
+
+    asyncio.run(main())
+
+
+def test_late_subscriber_gets_replayed_events():
+    async def main():
+        single_flight, run = SingleFlight(), FakeRun()
+        first, late = [], []
+        first_task = asyncio.create_task(
+            collect(single_flight.stream(InputState(query="q"), run), first)
+        )
+        await settle()
+        run.release(2)
+        await settle()
+        late_task = asyncio.create_task(
+            collect(single_flight.stream(InputState(query="q"), run), late)
+        )
+        await settle()
+        run.release()
+        await asyncio.gather(first_task, late_task)
+        assert indexes(late) == [0, 1, 2]
+
+    asyncio.run(main())
+
+
+def test_cancelling_one_subscriber_keeps_the_run():
+    async def main():
+        single_flight, run = SingleFlight(), FakeRun()
+        cancelled, kept = [], []
+        cancelled_task = asyncio.create_task(
+            collect(single_flight.stream(InputState(query="q"), run), cancelled)
+        )
+        kept_task = asyncio.create_task(
+            collect(single_flight.stream(InputState(query="q"), run), kept)
+        )
+        await settle()
+        run.release()
+        await settle()
+
+        cancelled_task.cancel()
+        await asyncio.gather(cancelled_task, return_exceptions=True)
+        run.release(2)
+        await kept_task
+
+        assert indexes(cancelled) == [0]
+        assert indexes(kept) == [0, 1, 2]
+        assert run.cancelled == 0 and run.finished == 1
+
+    asyncio.run(main())
+
+
+def test_cancelling_every_subscriber_cancels_the_run():
+    async def main():
+        single_flight, run = SingleFlight(), FakeRun()
+        tasks = [
+            asyncio.create_task(collect(single_flight.stream(InputState(query="q"), run), []))
+            for _ in range(2)
+        ]
+        await settle()
+        run.release()
+        await settle()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await settle()
+
+        assert run.cancelled == 1 and run.finished == 0
+        assert single_flight.stats()["in_flight"] == 0
+
+        # The next identical request starts a fresh run instead of joining the dead one
+        events = []
+        task = asyncio.create_task(
+            collect(single_flight.stream(InputState(query="q"), run), events)
+        )
+        await settle()
+        run.release(3)
+        await task
+        assert run.started == 2
+        assert indexes(events) == [0, 1, 2]
+
+    asyncio.run(main())
+
+
+def test_closing_the_stream_early_cancels_the_run():
+    async def main():
+        single_flight, run = SingleFlight(), FakeRun()
+        stream = single_flight.stream(InputState(query="q"), run)
+        run.release()
+        assert (await anext(stream))["data"]["index"] == 0
+        await stream.aclose()
+        await settle()
+        assert run.cancelled == 1
+        assert single_flight.stats()["in_flight"] == 0
+
+    asyncio.run(main())
+
+
+def test_run_error_reaches_every_subscriber():
+    async def failing_run(state: InputState) -> AsyncIterator[dict]:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+        yield
+
+    async def main():
+        single_flight = SingleFlight()
+        results = await asyncio.gather(
+            *[
+                asyncio.create_task(
+                    _collect_all(single_flight.stream(InputState(query="q"), failing_run))
+                )
+                for _ in range(2)
+            ]
+        )
+        for events in results:
+            assert [event["event"] for event in events] == ["error"]
+            assert events[0]["data"]["error"] == "boom"
+        assert single_flight.stats()["flights"] == 1
+
+    asyncio.run(main())
+
+
+async def _collect_all(stream: AsyncIterator[dict]) -> List[dict]:
+    events = []
+    await collect(stream, events)
+    return events
+
+
+def test_key_separates_category_and_filters():
+    key = SingleFlight.make_key
+    assert key(InputState(query="Rain  today")) == key(InputState(query="rain today"))
+    assert key(InputState(query="q", category="sports")) != key(InputState(query="q"))
+    assert key(InputState(query="q", filters={"source": "bbc"})) != key(InputState(query="q"))
@@ -1,9 +1,10 @@
 from typing import Literal
-from langchain_google_genai import ChatGoogleGenerativeAI
 from typing import List
 from langchain_core.messages import ChatMessage
 import dotenv
 
+from agents.common.llm_registry import get_llm_registry
+
 
 dotenv.load_dotenv()
 
@@ -14,20 +15,13 @@ def get_llm(
         "gemini-2.0-flash",
         "gemini-2.0-flash-lite",
         "gemini-2.5-flash",
+        "gemini-2.5-flash-lite",
     ] = "gemini-1.5-flash",
     temperature: float = 0.0,
     max_tokens: int | None = None,
 ):
-    # Build kwargs for Gemini models
-    kwargs: dict = {
-        "model": model_name,
-        "temperature": float(temperature),
-    }
-
-    if max_tokens is not None:
-        kwargs["max_tokens"] = max_tokens
-
-    return ChatGoogleGenerativeAI(**kwargs)
+    # Shared client from the process-wide registry, not a new one per call
+    return get_llm_registry().get(model_name, temperature, max_tokens)
 
 
 def format_chat_history(chat_history: List[ChatMessage], n: int = 5) -> str:
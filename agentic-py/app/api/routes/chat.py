@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from app.models.chat import ChatRequest, StreamEvent
 from agents.retrieval_agent.graph import stream_graph
+from agents.retrieval_agent.answer_cache import get_answer_cache_stats
+from agents.retrieval_agent.single_flight import get_single_flight_stats
 from agents.retrieval_agent.state import InputState
 from agents.embedding_agent.state import Category
 from langchain_core.messages import ChatMessage
@@ -35,6 +37,7 @@ async def stream_chat(request: ChatRequest):
             query=request.query,
             chat_history=chat_history,
             category=request.category or Category.OTHER,
+            filters=request.filters,
         )
 
         async def generate_events():
@@ -81,6 +84,7 @@ async def query_chat(request: ChatRequest):
             query=request.query,
             chat_history=chat_history,
             category=request.category or Category.OTHER,
+            filters=request.filters,
         )
 
         final_response = None
@@ -104,3 +108,13 @@ async def query_chat(request: ChatRequest):
     except Exception as e:
         logger.error(f"Error in query_chat endpoint: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cache/stats")
+async def answer_cache_stats():
+    return get_answer_cache_stats()
+
+
+@router.get("/coalescing/stats")
+async def coalescing_stats():
+    return get_single_flight_stats()
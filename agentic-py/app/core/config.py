@@ -18,6 +18,8 @@ class Settings(BaseSettings):
     # Scheduler settings
     ENABLE_SCHEDULER: bool = True
     EMBEDDING_CRON_HOURS: int = 12  # Run every 12 hours
+    ENABLE_RETENTION: bool = False  # deletes vectors, opt in once TTLs are set
+    RETENTION_CRON_HOURS: int = 24  # Run once a day
 
     class Config:
         env_file = ".env"
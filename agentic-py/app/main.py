@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import articles, chat
 from app.services.scheduler_service import (
@@ -7,6 +8,13 @@ from app.services.scheduler_service import (
     get_scheduler_status,
 )
 from app.core.config import settings
+from agents.embedding_agent.nodes.extract_articles.fetcher import close_fetcher
+from agents.common.executors import shutdown_cpu_executor
+from agents.common.llm_registry import get_llm_registry, get_llm_pool_stats
+from agents.common.embedding_cache import get_embedding_cache_stats
+from agents.common.metrics import render_metrics
+from agents.retrieval_agent.answer_cache import get_answer_cache_stats
+from agents.retrieval_agent.single_flight import get_single_flight_stats
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -30,12 +38,15 @@ app.include_router(chat.router)
 async def startup_event():
     logger.info("Starting up Agentic API...")
     start_scheduler()
+    get_llm_registry().warm_up()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Agentic API...")
     stop_scheduler()
+    await close_fetcher()
+    shutdown_cpu_executor()
 
 
 @app.get("/scheduler/status")
@@ -43,6 +54,27 @@ async def scheduler_status():
     return get_scheduler_status()
 
 
+@app.get("/llm/status")
+async def llm_status():
+    return get_llm_pool_stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    # Prometheus text format; sync so the SQLite-backed stats run off the event loop
+    return PlainTextResponse(
+        render_metrics(
+            {
+                "answer_cache": get_answer_cache_stats(),
+                "llm_pool": get_llm_pool_stats(),
+                "single_flight": get_single_flight_stats(),
+                "embedding_cache": get_embedding_cache_stats(),
+            }
+        ),
+        media_type="text/plain; version=0.0.4",
+    )
+
+
 @app.get("/")
 def read_root():
     return {"message": "Hello Render!"}
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 from langchain_core.messages import ChatMessage
 from agents.embedding_agent.state import Category
 
@@ -17,6 +17,10 @@ class ChatRequest(BaseModel):
     category: Optional[Category] = Field(
         description="The category of the query", default=Category.OTHER
     )
+    filters: Dict[str, Union[str, List[str]]] = Field(
+        description="Metadata filters for the search, e.g. {'source': 'BBC News'}",
+        default={},
+    )
 
 
 class StreamEvent(BaseModel):
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
@@ -5,12 +6,16 @@ from app.services.embedding_service import _process_embedding_task
 from app.core.config import settings
 from agents.embedding_agent.state import InputState, Category
 from app.core.constant import DEFAULT_RSS_FEEDS
+from agents.embedding_agent.retention import run_retention
 
 logger = logging.getLogger(__name__)
 
 # Global scheduler instance
 scheduler = AsyncIOScheduler()
 
+# Result of the most recent retention run, reported by get_scheduler_status
+_last_retention_result = None
+
 
 async def scheduled_embedding_task():
     """Scheduled task that runs every 12 hours to process embeddings"""
@@ -44,6 +49,23 @@ async def scheduled_embedding_task():
         logger.error(f"Error in scheduled embedding task: {e}")
 
 
+async def scheduled_retention_task():
+    """Scheduled task that deletes expired and superseded chunks"""
+    global _last_retention_result
+    logger.info("Starting scheduled retention task")
+
+    try:
+        _last_retention_result = await asyncio.to_thread(run_retention)
+
+        logger.info(
+            f"Scheduled retention task completed. Reclaimed "
+            f"{_last_retention_result.get('reclaimed_vectors', 0)} vectors"
+        )
+
+    except Exception as e:
+        logger.error(f"Error in scheduled retention task: {e}")
+
+
 def start_scheduler():
     """Start the scheduler with cron jobs"""
     if not settings.ENABLE_SCHEDULER:
@@ -61,6 +83,17 @@ def start_scheduler():
             replace_existing=True,
         )
 
+        # Retention runs off the hour and skips itself while ingestion is running
+        if settings.ENABLE_RETENTION:
+            retention_hours = settings.RETENTION_CRON_HOURS
+            scheduler.add_job(
+                scheduled_retention_task,
+                trigger=CronTrigger(hour=f"*/{retention_hours}", minute=30),
+                id="retention_task",
+                name="Scheduled Vector Retention",
+                replace_existing=True,
+            )
+
         # Start the scheduler
         scheduler.start()
         logger.info(
@@ -96,4 +129,5 @@ def get_scheduler_status():
             }
             for job in jobs
         ],
+        "last_retention": _last_retention_result,
     }